@@ -17,6 +17,7 @@
 
 You should have received a copy of the SSPL along with this program.
 If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+from .breaker import CircuitOpenError
 from .client import BaseApiClient
-from .models import Record, Results, sort_dict
+from .models import ColumnarResults, CompactResults, Pagination, Record, Response, Results, sort_dict
 from .utils import bprint, tprint
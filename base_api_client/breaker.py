@@ -0,0 +1,261 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Circuit Breaker
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import logging
+from collections import deque
+from time import monotonic
+from typing import Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp as aio
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+
+class CircuitOpenError(aio.ClientError):
+    """Raised instead of sending a request to a host whose circuit is open; never retried"""
+
+
+class CircuitBreaker(object):
+    """Circuit Breaker
+
+    Closed: requests flow; `failures` consecutive failures (connection errors, timeouts, 5xx) open the circuit.
+    Open: requests fail fast with CircuitOpenError for `recovery` seconds.
+    Half-Open: up to `probes` requests are let through; a success closes the circuit, a failure re-opens it.
+    Probes that never report (e.g. cancelled) are re-admitted after another `recovery` seconds.
+
+    Args:
+        failures (int): Consecutive failures that open the circuit
+        recovery (float): Seconds to stay open before probing
+        probes (int): Requests admitted while half-open"""
+
+    def __init__(self, failures: int = 5, recovery: float = 30.0, probes: int = 1):
+        self.failures: int = failures
+        self.recovery: float = recovery
+        self.probes: int = probes
+        self.state: str = CLOSED
+        self.consecutive: int = 0
+        self.changed: float = monotonic()
+        self.admitted: int = 0
+
+    def _transition(self, state: str, now: float) -> None:
+        if state != self.state:
+            logger.warning(f'Circuit {self.state} -> {state}')
+        self.state, self.changed, self.admitted = state, now, 0
+
+    def allow(self) -> bool:
+        """
+        Returns:
+            (bool): Whether a request may be sent now"""
+        now = monotonic()
+
+        if self.state == OPEN:
+            if now - self.changed < self.recovery:
+                return False
+            self._transition(HALF_OPEN, now)
+
+        if self.state == HALF_OPEN:
+            if now - self.changed >= self.recovery:  # Lost probes
+                self.changed, self.admitted = now, 0
+
+            if self.admitted >= self.probes:
+                return False
+            self.admitted += 1
+
+        return True
+
+    def success(self) -> None:
+        self.consecutive = 0
+        if self.state != CLOSED:
+            self._transition(CLOSED, monotonic())
+
+    def failure(self) -> None:
+        self.consecutive += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.consecutive >= self.failures):
+            self._transition(OPEN, monotonic())
+
+
+class CircuitBreakers(object):
+    """A CircuitBreaker per host
+
+    Args:
+        failures (int):
+        recovery (float):
+        probes (int):"""
+
+    def __init__(self, failures: int = 5, recovery: float = 30.0, probes: int = 1):
+        self.failures: int = failures
+        self.recovery: float = recovery
+        self.probes: int = probes
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Optional['CircuitBreakers']:
+        """
+        Args:
+            cfg (dict):
+
+        Returns:
+            breakers (Optional[CircuitBreakers]): None if not enabled"""
+        try:
+            cfg = cfg['CircuitBreaker']
+        except (KeyError, TypeError):
+            return None
+
+        try:
+            if not cfg['Enabled']:
+                return None
+        except KeyError:
+            return None
+
+        try:
+            failures = int(cfg['Failures'])
+        except (KeyError, TypeError):
+            failures = 5
+
+        try:
+            recovery = float(cfg['Recovery'])
+        except (KeyError, TypeError):
+            recovery = 30.0
+
+        try:
+            probes = int(cfg['Probes'])
+        except (KeyError, TypeError):
+            probes = 1
+
+        return cls(failures=failures, recovery=recovery, probes=probes)
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """
+        Args:
+            url (str):
+
+        Returns:
+            breaker (CircuitBreaker)"""
+        key = urlsplit(url).netloc
+        try:
+            return self.breakers[key]
+        except KeyError:
+            self.breakers[key] = breaker = CircuitBreaker(failures=self.failures, recovery=self.recovery, probes=self.probes)
+            return breaker
+
+    def check(self, url: str) -> None:
+        """
+        Args:
+            url (str):
+
+        Raises:
+            CircuitOpenError"""
+        if not self.breaker(url).allow():
+            raise CircuitOpenError(f'Circuit open for {urlsplit(url).netloc}')
+
+    def success(self, url: str) -> None:
+        self.breaker(url).success()
+
+    def failure(self, url: str) -> None:
+        self.breaker(url).failure()
+
+
+class RetryBudget(object):
+    """Retry Budget
+
+    Retries (across all requests) are allowed while the retries made in the last `window` seconds stay below
+    `minimum` + `ratio` * successful responses in that window; an outage then costs a bounded number of retries
+    instead of every queued request retrying independently.
+
+    Args:
+        ratio (float): Retries allowed per successful response
+        minimum (int): Retries always allowed per window, so low-volume clients can still retry
+        window (float): Seconds"""
+
+    def __init__(self, ratio: float = 0.1, minimum: int = 10, window: float = 10.0):
+        self.ratio: float = ratio
+        self.minimum: int = minimum
+        self.window: float = window
+        self.successes: Deque[float] = deque()
+        self.retries: Deque[float] = deque()
+        self.exhausted: int = 0  # Retries denied
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Optional['RetryBudget']:
+        """
+        Args:
+            cfg (dict):
+
+        Returns:
+            budget (Optional[RetryBudget]): None if not enabled"""
+        try:
+            cfg = cfg['RetryBudget']
+        except (KeyError, TypeError):
+            return None
+
+        try:
+            if not cfg['Enabled']:
+                return None
+        except KeyError:
+            return None
+
+        try:
+            ratio = float(cfg['Ratio'])
+        except (KeyError, TypeError):
+            ratio = 0.1
+
+        try:
+            minimum = int(cfg['Minimum'])
+        except (KeyError, TypeError):
+            minimum = 10
+
+        try:
+            window = float(cfg['Window'])
+        except (KeyError, TypeError):
+            window = 10.0
+
+        return cls(ratio=ratio, minimum=minimum, window=window)
+
+    def _expire(self, now: float) -> None:
+        for events in (self.successes, self.retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def deposit(self) -> None:
+        """Record a successful response"""
+        now = monotonic()
+        self._expire(now)
+        self.successes.append(now)
+
+    def withdraw(self) -> bool:
+        """Spend a retry if the budget allows
+
+        Returns:
+            (bool): Whether to retry"""
+        now = monotonic()
+        self._expire(now)
+
+        if len(self.retries) >= self.minimum + self.ratio * len(self.successes):
+            self.exhausted += 1
+            return False
+
+        self.retries.append(now)
+        return True
+
+
+if __name__ == '__main__':
+    print(__doc__)
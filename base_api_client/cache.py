@@ -0,0 +1,371 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Cache
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from email.utils import parsedate_to_datetime
+from hashlib import sha256
+from os.path import join, realpath
+from time import time
+from typing import Dict, List, Mapping, Optional, Tuple, TYPE_CHECKING, Union
+
+import aiohttp as aio
+import rapidjson
+from multidict import CIMultiDict
+
+from .models import Response
+from .utils import open_async
+
+if TYPE_CHECKING:
+    from multidict import CIMultiDictProxy
+
+logger = logging.getLogger(__name__)
+
+NOT_STORABLE = -1.0
+HOP_BY_HOP = frozenset(('connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'proxy-connection', 'te',
+                        'trailer', 'transfer-encoding', 'upgrade'))
+
+
+def parse_http_date(value: Optional[str]) -> Optional[float]:
+    """
+    Args:
+        value (Optional[str]): HTTP-date
+
+    Returns:
+        timestamp (Optional[float])"""
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def expiration(headers: Mapping[str, str]) -> Optional[float]:
+    """Compute when a response stops being fresh (Cache-Control max-age, else Expires)
+
+    Args:
+        headers (Mapping[str, str]):
+
+    Returns:
+        expires (Optional[float]): Timestamp; None if it must be revalidated; NOT_STORABLE if no-store"""
+    now = time()
+    directives = {}
+    for directive in headers.get('Cache-Control', '').split(','):
+        k, _, v = directive.strip().partition('=')
+        directives[k.lower()] = v.strip('"')
+
+    vary = headers.getall('Vary', []) if hasattr(headers, 'getall') else [headers.get('Vary', '')]
+    if 'no-store' in directives or '*' in {n.strip() for v in vary for n in v.split(',')}:
+        return NOT_STORABLE
+
+    if 'no-cache' in directives:
+        return None
+
+    if 'max-age' in directives:
+        try:
+            age = float(headers.get('Age', 0))
+        except ValueError:
+            age = 0.0
+
+        try:
+            return now + float(directives['max-age']) - age
+        except ValueError:
+            return None
+
+    if expires := parse_http_date(headers.get('Expires')):
+        date = parse_http_date(headers.get('Date')) or now
+        return now + expires - date
+
+    return None
+
+
+@dataclass
+class CacheEntry:
+    """Cached Response"""
+    url: str
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    reason: Optional[str] = None
+    expires: Optional[float] = None
+    vary: Dict[str, Optional[str]] = field(default_factory=dict)  # Request header (lower-case) -> value sent
+
+    @staticmethod
+    def varied(response_headers: 'CIMultiDictProxy', request_headers: Mapping[str, str]) -> Dict[str, Optional[str]]:
+        """The request headers named by the response's Vary header(s), with the values that were sent
+
+        Args:
+            response_headers (CIMultiDictProxy):
+            request_headers (Mapping[str, str]): Case-insensitive
+
+        Returns:
+            vary (Dict[str, Optional[str]])"""
+        names = {n.strip().lower() for v in response_headers.getall('Vary', []) for n in v.split(',')}
+
+        return {n: request_headers.get(n) for n in sorted(names) if n}
+
+    def matches(self, request_headers: Mapping[str, str]) -> bool:
+        """Whether a request selects this entry; see Vary
+
+        Args:
+            request_headers (Mapping[str, str]): Case-insensitive
+
+        Returns:
+            (bool)"""
+        return all(request_headers.get(k) == v for k, v in self.vary.items())
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers)
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires is not None and time() < self.expires
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers"""
+        hdrs = {}
+        for k, v in self.headers:
+            if k.lower() == 'etag':
+                hdrs['If-None-Match'] = v
+            elif k.lower() == 'last-modified':
+                hdrs['If-Modified-Since'] = v
+
+        return hdrs
+
+    def response(self) -> Response:
+        return Response(method='GET', url=self.url, status=self.status, headers=self.headers, body=self.body,
+                        reason=self.reason)
+
+    def dumps(self) -> bytes:
+        meta = {'url': self.url, 'status': self.status, 'headers': self.headers, 'reason': self.reason,
+                'expires': self.expires, 'vary': self.vary}
+
+        return rapidjson.dumps(meta).encode('utf-8') + b'\n' + self.body
+
+    @classmethod
+    def loads(cls, data: bytes) -> 'CacheEntry':
+        meta, _, body = data.partition(b'\n')
+        meta = rapidjson.loads(meta)
+
+        return cls(url=meta['url'], status=meta['status'], headers=[tuple(h) for h in meta['headers']], body=body,
+                   reason=meta['reason'], expires=meta['expires'], vary=meta.get('vary') or {})
+
+
+class MemoryCache(object):
+    """In-Memory LRU Cache bounded by size in bytes
+
+    Args:
+        max_bytes (int):"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 ** 2):
+        self.max_bytes: int = max_bytes
+        self.size: int = 0
+        self.evictions: int = 0
+        self.entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        except KeyError:
+            return None
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        await self.delete(key)
+
+        if entry.size > self.max_bytes:
+            return
+
+        self.entries[key] = entry
+        self.size += entry.size
+
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= evicted.size
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        if entry := self.entries.pop(key, None):
+            self.size -= entry.size
+
+
+class DiskCache(object):
+    """On-Disk Cache; one file per entry, survives restarts
+
+    Args:
+        path (str): Directory; created if missing"""
+
+    def __init__(self, path: str):
+        self.path: str = realpath(path)
+        os.makedirs(self.path, exist_ok=True)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            async with open_async(join(self.path, key), 'rb') as f:
+                return CacheEntry.loads(await f.read())
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError) as e:
+            logger.warning(f'Discarding corrupt cache entry {key}: {e}')
+            await self.delete(key)
+            return None
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        tmp = join(self.path, f'{key}.tmp')
+        async with open_async(tmp, 'wb') as f:
+            await f.write(entry.dumps())
+
+        os.replace(tmp, join(self.path, key))
+
+    async def delete(self, key: str) -> None:
+        try:
+            os.remove(join(self.path, key))
+        except FileNotFoundError:
+            pass
+
+
+@dataclass
+class ResponseCache:
+    """HTTP Response Cache (GET)
+
+    Serves fresh entries (Cache-Control max-age / Expires) without a request, revalidates stale entries
+    with If-None-Match / If-Modified-Since and serves 304s from cache. Entries live in a size-bounded
+    in-memory LRU, written through to an optional DiskCache. An entry is only served to requests that send
+    the same values for the headers its response Varies on (Vary: * is never stored)."""
+    memory: MemoryCache = field(default_factory=MemoryCache)
+    disk: Optional[DiskCache] = None
+    stats: Dict[str, int] = field(default_factory=lambda: {'hits':         0,
+                                                           'misses':       0,
+                                                           'revalidated':  0,
+                                                           'stored':       0,
+                                                           'bytes_served': 0,
+                                                           'bytes_stored': 0})
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Optional['ResponseCache']:
+        """
+        Args:
+            cfg (dict):
+
+        Returns:
+            cache (Optional[ResponseCache]): None if not enabled"""
+        try:
+            cfg = cfg['ResponseCache']
+        except (KeyError, TypeError):
+            return None
+
+        try:
+            if not cfg['Enabled']:
+                return None
+        except KeyError:
+            return None
+
+        try:
+            max_bytes = int(cfg['Max_Bytes'])
+        except (KeyError, TypeError):
+            max_bytes = 64 * 1024 ** 2
+
+        try:
+            path = cfg['Path']
+        except KeyError:
+            path = None
+
+        return cls(memory=MemoryCache(max_bytes=max_bytes), disk=DiskCache(path) if path else None)
+
+    @staticmethod
+    def key(*parts) -> str:
+        return sha256(repr(parts).encode('utf-8')).hexdigest()
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        if entry := await self.memory.get(key):
+            return entry
+
+        if self.disk and (entry := await self.disk.get(key)):
+            await self.memory.set(key, entry)
+            return entry
+
+        return None
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        await self.memory.set(key, entry)
+
+        if self.disk:
+            await self.disk.set(key, entry)
+
+    def hit(self, entry: CacheEntry) -> Response:
+        """Serve a fresh entry"""
+        self.stats['hits'] += 1
+        self.stats['bytes_served'] += len(entry.body)
+
+        return entry.response()
+
+    async def revalidate(self, key: str, entry: CacheEntry, response: aio.ClientResponse) -> Response:
+        """Serve an entry after a 304 Not Modified, refreshing its headers/expiry
+
+        Only the 304's end-to-end headers are merged; Content-* describe the stored body and are kept as stored.
+        The stored entry is replaced, not modified; MemoryCache accounts for it by its size when stored."""
+        response.release()
+        skip = HOP_BY_HOP | {n.strip().lower() for v in response.headers.getall('Connection', []) for n in v.split(',')}
+        fresh = [(k, v) for k, v in response.headers.items()
+                 if (n := k.lower()) not in skip and not n.startswith('content-')]
+        updated = {k.lower() for k, _ in fresh}
+        headers = [(k, v) for k, v in entry.headers if k.lower() not in updated] + fresh
+        entry = replace(entry, headers=headers, expires=expiration(CIMultiDict(headers)))
+        await self.set(key, entry)
+
+        self.stats['revalidated'] += 1
+        self.stats['bytes_served'] += len(entry.body)
+
+        return entry.response()
+
+    async def store(self, key: str, response: aio.ClientResponse,
+                    request_headers: Optional[Mapping[str, str]] = None) -> Union[aio.ClientResponse, Response]:
+        """Store a 200 response if cacheable
+
+        Args:
+            key (str):
+            response (aio.ClientResponse):
+            request_headers (Optional[Mapping[str, str]]): As sent (case-insensitive); recorded for Vary
+
+        Returns:
+            response (Union[aio.ClientResponse, Response]): Read Response if stored, else the original"""
+        self.stats['misses'] += 1
+        expires = expiration(response.headers)
+
+        if response.status != 200 or expires == NOT_STORABLE or \
+                (expires is None and 'ETag' not in response.headers and 'Last-Modified' not in response.headers):
+            return response
+
+        response = await Response.from_response(response)
+        entry = CacheEntry(url=str(response.url), status=response.status, headers=list(response.headers.items()),
+                           body=response.body, reason=response.reason, expires=expires,
+                           vary=CacheEntry.varied(response.headers, request_headers or {}))
+        await self.set(key, entry)
+
+        self.stats['stored'] += 1
+        self.stats['bytes_stored'] += len(entry.body)
+
+        return response
+
+
+if __name__ == '__main__':
+    print(__doc__)
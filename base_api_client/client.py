@@ -18,39 +18,105 @@
 You should have received a copy of the SSPL along with this program.
 If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
 import asyncio
+import hashlib
 import logging
 from asyncio import Semaphore
+from collections import deque
 from json.decoder import JSONDecodeError
-from os import getenv
-from os.path import realpath
+from os import cpu_count, getenv, remove, replace
+from os.path import basename, exists, getsize, realpath
 from ssl import create_default_context, Purpose, SSLContext
-from typing import List, NoReturn, Optional, Union
+from time import perf_counter, process_time
+from typing import (Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Mapping, NoReturn, Optional,
+                    Tuple, TYPE_CHECKING, Union)
 from uuid import uuid4
 
-import aiofiles
 import aiohttp as aio
 import rapidjson
-import toml
-from multidict import MultiDict
-from tenacity import after_log, before_sleep_log, retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
-
-from .models import Results
+from multidict import CIMultiDict
+from tenacity import after_log, before_sleep_log, retry, RetryCallState, stop_after_attempt, wait_random_exponential
+
+from .breaker import CircuitBreakers, CircuitOpenError, RetryBudget
+from .cache import ResponseCache
+from .compression import Compression
+from .concurrency import AdaptiveSemaphore
+from .decoders import decode_json, decode_ndjson, Decoder, DECODERS, find_decoder
+from .hedging import Hedger
+from .metrics import Metrics
+from .models import CompactResults, Pagination, Response, Results
+from .offload import cleanup_records, Offload
+from .ratelimit import RateLimiter
+from .recorder import FlightRecorder
+from .runner import executor_workers, run as run_loop, set_default_executor
+from .sharding import chunked, init_worker, run_chunk, worker_config
+from .streaming import iter_json_array, iter_ndjson
+from .transport import Transport
+from .utils import mmap_file, open_async
+
+if TYPE_CHECKING:
+    from multidict import MultiDict
 
 logger = logging.getLogger(__name__)
 
 
+def retry_allowed(retry_state: RetryCallState) -> bool:
+    """Retry aio.ClientError (incl. 5xx), except CircuitOpenError, while the client's RetryBudget allows
+
+    Args:
+        retry_state (RetryCallState): args[0] is the BaseApiClient
+
+    Returns:
+        (bool)"""
+    if not isinstance(exc := retry_state.outcome.exception(), aio.ClientError) or isinstance(exc, CircuitOpenError):
+        return False
+
+    client = retry_state.args[0]
+    if client.retry_budget and not client.retry_budget.withdraw():
+        return False
+
+    if client.metrics:
+        client.metrics.retry(retry_state.args[2] if len(retry_state.args) > 2 else retry_state.kwargs['url'])
+
+    return True
+
+
 class BaseApiClient(object):
     """ Base API Client """
     HDR: dict = {'Content-Type': 'application/json; charset=utf-8'}
     SEM: int = 15  # This defines the number of parallel requests to make.
+    CHUNK_SIZE: int = 64 * 1024  # Bytes read per chunk when streaming response bodies
+    DECODERS: Dict[str, Decoder] = DECODERS  # Content-Type -> decoder; see register_decoder
+    ENV_OVERRIDES: bool = True  # Apply OS environment variables over the config; see __load_config_data
+    PRELOAD_HEADERS: Optional[Tuple[str, ...]] = ('Age', 'Cache-Control', 'Content-Encoding', 'Content-Length',
+                                                  'Content-Type', 'Date', 'ETag', 'Expires', 'Last-Modified', 'Link',
+                                                  'Location', 'Retry-After', 'Vary')  # + RateLimit; None keeps all
 
     def __init__(self, cfg: Optional[Union[str, dict]] = None):
         self.debug: bool = False
+        self.decoders: Dict[str, Decoder] = dict(self.DECODERS)
         self.cfg: Union[dict, None] = None
         self.proxy: Union[str, None] = None
         self.proxy_auth: Union[aio.BasicAuth, None] = None
-        self.sem: Union[Semaphore, None] = None
-        self.session: Union[aio.ClientSession, None] = None
+        self.rate_limiter: Union[RateLimiter, None] = None
+        self.cache: Union[ResponseCache, None] = None  # ResponseCache.stats exposes hit/miss/byte counters
+        self.compression: Union[Compression, None] = None  # Compression.stats exposes ratio/CPU counters
+        self.breakers: Union[CircuitBreakers, None] = None
+        self.retry_budget: Union[RetryBudget, None] = None
+        self.hedger: Union[Hedger, None] = None  # Hedger.stats exposes hedged/won/capped counters
+        self.metrics: Union[Metrics, None] = None  # Metrics.summary() / Metrics.openmetrics()
+        self.recorder: Union[FlightRecorder, None] = None  # FlightRecorder.dump()
+        self.transport: Union[Transport, None] = None  # Record/replay; None for live traffic
+        self.offload: Union[Offload, None] = None  # Large-body decode/cleanup pool; None decodes on the loop
+        self.coalesce: bool = False
+        self.preload: bool = False
+        self.upload_chunk_size: int = 256 * 1024
+        self.download_chunk_size: int = 1024 * 1024
+        self.inflight: Dict[tuple, asyncio.Task] = {}
+        self.sem: Union[Semaphore, AdaptiveSemaphore, None] = None  # AdaptiveSemaphore.limit exposes the current limit
+        self.concurrency: int = self.SEM  # Configured (maximum) number of parallel requests
+        self.session_kwargs: dict = {}  # aio.ClientSession auth, cookies and headers; see session_config
+        self.session_cfg: Union[dict, None] = None  # Connector, timeouts and cookie jar; built with the session
+        self._session: Union[aio.ClientSession, None] = None
         self.ssl: Union[SSLContext, None] = None
 
         cfg = self.__load_config_data(cfg)
@@ -61,7 +127,45 @@ async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.session.close()
+        if self._session:
+            await self._session.close()
+
+        if self.transport:
+            await self.transport.close()
+
+        if self.offload:
+            self.offload.close()
+
+    @classmethod
+    def run(cls, main: Union[Awaitable, Callable[['BaseApiClient'], Awaitable]],
+            cfg: Optional[Union[str, dict]] = None,
+            use_uvloop: bool = True,
+            debug: bool = False) -> Any:
+        """Run on a new event loop (uvloop when installed) with the default executor sized for the client's concurrency
+
+        Given a coroutine, the executor is sized from cls.SEM. Given a callable, a client is created from `cfg`
+        inside the loop, passed to it and closed afterwards; the executor is sized from its configuration.
+
+            records = SomeApiClient.run(lambda bac: bac.get_records(), cfg='config.toml')
+
+        Args:
+            main (Union[Awaitable, Callable[[BaseApiClient], Awaitable]]):
+            cfg (Optional[Union[str, dict]]): See __init__; callable main only
+            use_uvloop (bool): Falls back to asyncio's event loop when uvloop isn't installed
+            debug (bool): Event loop debug mode
+
+        Returns:
+            result (Any): main's"""
+        if not callable(main):
+            return run_loop(main, use_uvloop=use_uvloop, workers=executor_workers(cls.SEM), debug=debug)
+
+        async def with_client() -> Any:
+            async with cls(cfg=cfg) as bac:
+                set_default_executor(executor_workers(bac.concurrency))  # Shut down by run_loop
+
+                return await main(bac)
+
+        return run_loop(with_client(), use_uvloop=use_uvloop, debug=debug)
 
     def __load_config_data(self, cfg_data: Union[str, dict]) -> dict:
         """
@@ -79,6 +183,8 @@ def __load_config_data(self, cfg_data: Union[str, dict]) -> dict:
             cfg = cfg_data
         elif type(cfg_data) is str:
             if cfg_data.endswith('.toml'):
+                import toml
+
                 cfg = toml.load(cfg_data)
             elif cfg_data.endswith('.json'):
                 cfg = rapidjson.loads(open(cfg_data).read(), ensure_ascii=False)
@@ -88,6 +194,10 @@ def __load_config_data(self, cfg_data: Union[str, dict]) -> dict:
         else:
             cfg = None
 
+        if not self.ENV_OVERRIDES:
+            self.cfg = cfg
+            return cfg
+
         if env_auth_user := getenv('Auth_Username'):
             cfg['Auth']['Username'] = env_auth_user
 
@@ -115,6 +225,159 @@ def __load_config_data(self, cfg_data: Union[str, dict]) -> dict:
         if env_opt_sem := getenv('Options_SEM'):
             cfg['Options']['SEM'] = env_opt_sem
 
+        if env_opt_sem_adaptive := getenv('Options_SEM_Adaptive'):
+            cfg['Options']['SEM_Adaptive'] = env_opt_sem_adaptive.lower() in ('1', 'true', 'yes')
+
+        if env_opt_sem_min := getenv('Options_SEM_Min'):
+            cfg['Options']['SEM_Min'] = env_opt_sem_min
+
+        if env_opt_sem_max := getenv('Options_SEM_Max'):
+            cfg['Options']['SEM_Max'] = env_opt_sem_max
+
+        if env_rl_rate := getenv('RateLimit_Rate'):
+            cfg['RateLimit']['Rate'] = env_rl_rate
+
+        if env_rl_burst := getenv('RateLimit_Burst'):
+            cfg['RateLimit']['Burst'] = env_rl_burst
+
+        if env_rl_retry := getenv('RateLimit_Retry'):
+            cfg['RateLimit']['Retry'] = env_rl_retry
+
+        if env_con_limit := getenv('Connection_Limit'):
+            cfg['Connection']['Limit'] = env_con_limit
+
+        if env_con_limit_per_host := getenv('Connection_Limit_Per_Host'):
+            cfg['Connection']['Limit_Per_Host'] = env_con_limit_per_host
+
+        if env_con_force_close := getenv('Connection_Force_Close'):
+            cfg['Connection']['Force_Close'] = env_con_force_close.lower() in ('1', 'true', 'yes')
+
+        if env_con_keepalive_timeout := getenv('Connection_Keepalive_Timeout'):
+            cfg['Connection']['Keepalive_Timeout'] = env_con_keepalive_timeout
+
+        if env_con_use_dns_cache := getenv('Connection_Use_DNS_Cache'):
+            cfg['Connection']['Use_DNS_Cache'] = env_con_use_dns_cache.lower() in ('1', 'true', 'yes')
+
+        if env_con_ttl_dns_cache := getenv('Connection_TTL_DNS_Cache'):
+            cfg['Connection']['TTL_DNS_Cache'] = env_con_ttl_dns_cache
+
+        if env_con_async_dns := getenv('Connection_Async_DNS'):
+            cfg['Connection']['Async_DNS'] = env_con_async_dns.lower() in ('1', 'true', 'yes')
+
+        if env_con_timeout_total := getenv('Connection_Timeout_Total'):
+            cfg['Connection']['Timeout_Total'] = env_con_timeout_total
+
+        if env_con_timeout_connect := getenv('Connection_Timeout_Connect'):
+            cfg['Connection']['Timeout_Connect'] = env_con_timeout_connect
+
+        if env_con_timeout_sock_connect := getenv('Connection_Timeout_Sock_Connect'):
+            cfg['Connection']['Timeout_Sock_Connect'] = env_con_timeout_sock_connect
+
+        if env_con_timeout_sock_read := getenv('Connection_Timeout_Sock_Read'):
+            cfg['Connection']['Timeout_Sock_Read'] = env_con_timeout_sock_read
+
+        if env_rc_enabled := getenv('ResponseCache_Enabled'):
+            cfg['ResponseCache']['Enabled'] = env_rc_enabled.lower() in ('1', 'true', 'yes')
+
+        if env_rc_max_bytes := getenv('ResponseCache_Max_Bytes'):
+            cfg['ResponseCache']['Max_Bytes'] = env_rc_max_bytes
+
+        if env_rc_path := getenv('ResponseCache_Path'):
+            cfg['ResponseCache']['Path'] = env_rc_path
+
+        if env_cmp_enabled := getenv('Compression_Enabled'):
+            cfg['Compression']['Enabled'] = env_cmp_enabled.lower() in ('1', 'true', 'yes')
+
+        if env_cmp_encoding := getenv('Compression_Encoding'):
+            cfg['Compression']['Encoding'] = env_cmp_encoding
+
+        if env_cmp_threshold := getenv('Compression_Threshold'):
+            cfg['Compression']['Threshold'] = env_cmp_threshold
+
+        if env_cmp_level := getenv('Compression_Level'):
+            cfg['Compression']['Level'] = env_cmp_level
+
+        if env_cmp_requests := getenv('Compression_Compress_Requests'):
+            cfg['Compression']['Compress_Requests'] = env_cmp_requests.lower() in ('1', 'true', 'yes')
+
+        if env_cmp_negotiate := getenv('Compression_Negotiate_Responses'):
+            cfg['Compression']['Negotiate_Responses'] = env_cmp_negotiate.lower() in ('1', 'true', 'yes')
+
+        if env_cb_enabled := getenv('CircuitBreaker_Enabled'):
+            cfg['CircuitBreaker']['Enabled'] = env_cb_enabled.lower() in ('1', 'true', 'yes')
+
+        if env_cb_failures := getenv('CircuitBreaker_Failures'):
+            cfg['CircuitBreaker']['Failures'] = env_cb_failures
+
+        if env_cb_recovery := getenv('CircuitBreaker_Recovery'):
+            cfg['CircuitBreaker']['Recovery'] = env_cb_recovery
+
+        if env_cb_probes := getenv('CircuitBreaker_Probes'):
+            cfg['CircuitBreaker']['Probes'] = env_cb_probes
+
+        if env_rb_enabled := getenv('RetryBudget_Enabled'):
+            cfg['RetryBudget']['Enabled'] = env_rb_enabled.lower() in ('1', 'true', 'yes')
+
+        if env_rb_ratio := getenv('RetryBudget_Ratio'):
+            cfg['RetryBudget']['Ratio'] = env_rb_ratio
+
+        if env_rb_minimum := getenv('RetryBudget_Minimum'):
+            cfg['RetryBudget']['Minimum'] = env_rb_minimum
+
+        if env_rb_window := getenv('RetryBudget_Window'):
+            cfg['RetryBudget']['Window'] = env_rb_window
+
+        if env_hdg_enabled := getenv('Hedging_Enabled'):
+            cfg['Hedging']['Enabled'] = env_hdg_enabled.lower() in ('1', 'true', 'yes')
+
+        if env_hdg_percentile := getenv('Hedging_Percentile'):
+            cfg['Hedging']['Percentile'] = env_hdg_percentile
+
+        if env_hdg_max_ratio := getenv('Hedging_Max_Ratio'):
+            cfg['Hedging']['Max_Ratio'] = env_hdg_max_ratio
+
+        if env_met_enabled := getenv('Metrics_Enabled'):
+            cfg['Metrics']['Enabled'] = env_met_enabled.lower() in ('1', 'true', 'yes')
+
+        if env_fr_enabled := getenv('FlightRecorder_Enabled'):
+            cfg['FlightRecorder']['Enabled'] = env_fr_enabled.lower() in ('1', 'true', 'yes')
+
+        if env_fr_sample := getenv('FlightRecorder_Sample'):
+            cfg['FlightRecorder']['Sample'] = env_fr_sample
+
+        if env_fr_path := getenv('FlightRecorder_Path'):
+            cfg['FlightRecorder']['Path'] = env_fr_path
+
+        if env_tr_mode := getenv('Transport_Mode'):
+            cfg['Transport']['Mode'] = env_tr_mode
+
+        if env_tr_path := getenv('Transport_Path'):
+            cfg['Transport']['Path'] = env_tr_path
+
+        if env_tr_latency := getenv('Transport_Latency'):
+            cfg['Transport']['Latency'] = env_tr_latency
+
+        if env_off_enabled := getenv('Offload_Enabled'):
+            cfg['Offload']['Enabled'] = env_off_enabled.lower() in ('1', 'true', 'yes')
+
+        if env_off_threshold := getenv('Offload_Threshold'):
+            cfg['Offload']['Threshold'] = env_off_threshold
+
+        if env_off_executor := getenv('Offload_Executor'):
+            cfg['Offload']['Executor'] = env_off_executor
+
+        if env_opt_coalesce := getenv('Options_Coalesce'):
+            cfg['Options']['Coalesce'] = env_opt_coalesce.lower() in ('1', 'true', 'yes')
+
+        if env_opt_upload_chunk := getenv('Options_Upload_Chunk_Size'):
+            cfg['Options']['Upload_Chunk_Size'] = env_opt_upload_chunk
+
+        if env_opt_download_chunk := getenv('Options_Download_Chunk_Size'):
+            cfg['Options']['Download_Chunk_Size'] = env_opt_download_chunk
+
+        if env_opt_preload := getenv('Options_Preload'):
+            cfg['Options']['Preload'] = env_opt_preload.lower() in ('1', 'true', 'yes')
+
         if env_prxy_uri := getenv('Proxy_URI'):
             cfg['Proxy']['URI'] = env_prxy_uri
 
@@ -172,11 +435,31 @@ def process_config(self, cfg_data: dict) -> NoReturn:
             self.proxy_auth = aio.BasicAuth(login=proxy_user, password=proxy_pass)
 
         try:
-            sem = cfg_data['Options']['SEM']
+            sem = int(cfg_data['Options']['SEM'])
         except (KeyError, TypeError):
             sem = self.SEM
 
-        self.sem = asyncio.Semaphore(sem)
+        try:
+            sem_adaptive = cfg_data['Options']['SEM_Adaptive']
+        except (KeyError, TypeError):
+            sem_adaptive = False
+
+        if sem_adaptive:
+            try:
+                sem_min = int(cfg_data['Options']['SEM_Min'])
+            except (KeyError, TypeError):
+                sem_min = 1
+
+            try:
+                sem_max = int(cfg_data['Options']['SEM_Max'])
+            except (KeyError, TypeError):
+                sem_max = sem * 4
+
+            self.sem = AdaptiveSemaphore(initial=sem, minimum=sem_min, maximum=sem_max)
+            self.concurrency = self.sem.maximum
+        else:
+            self.sem = asyncio.Semaphore(sem)
+            self.concurrency = sem
 
         try:
             ca_key = cfg_data['Options']['CAPath']
@@ -193,6 +476,115 @@ def process_config(self, cfg_data: dict) -> NoReturn:
         else:
             self.ssl = verify_ssl
 
+        try:
+            self.coalesce = bool(cfg_data['Options']['Coalesce'])
+        except (KeyError, TypeError):
+            self.coalesce = False
+
+        try:
+            self.preload = bool(cfg_data['Options']['Preload'])
+        except (KeyError, TypeError):
+            self.preload = False
+
+        try:
+            self.upload_chunk_size = int(cfg_data['Options']['Upload_Chunk_Size'])
+        except (KeyError, TypeError):
+            self.upload_chunk_size = 256 * 1024
+
+        try:
+            self.download_chunk_size = int(cfg_data['Options']['Download_Chunk_Size'])
+        except (KeyError, TypeError):
+            self.download_chunk_size = 1024 * 1024
+
+        self.rate_limiter = RateLimiter.from_config(cfg_data)
+        self.cache = ResponseCache.from_config(cfg_data)
+        self.compression = Compression.from_config(cfg_data)
+        self.breakers = CircuitBreakers.from_config(cfg_data)
+        self.hedger = Hedger.from_config(cfg_data)
+        self.metrics = Metrics.from_config(cfg_data)
+        self.recorder = FlightRecorder.from_config(cfg_data)
+        self.transport = Transport.from_config(cfg_data)
+        self.offload = Offload.from_config(cfg_data)
+        self.retry_budget = RetryBudget.from_config(cfg_data)
+
+    @staticmethod
+    def connection_config(cfg: dict) -> Tuple[aio.TCPConnector, aio.ClientTimeout]:
+        """Connection Configuration
+
+        Connection pool, DNS cache and timeouts; see [Connection] in examples/config.toml
+
+        Args:
+            cfg (dict):
+
+        Returns:
+            connector, timeout (Tuple[aio.TCPConnector, aio.ClientTimeout])"""
+        try:
+            con = cfg['Connection']
+        except (KeyError, TypeError):
+            con = {}
+
+        try:
+            limit = int(con['Limit'])
+        except (KeyError, TypeError):
+            limit = 100
+
+        try:
+            limit_per_host = int(con['Limit_Per_Host'])
+        except (KeyError, TypeError):
+            limit_per_host = 0
+
+        try:
+            force_close = con['Force_Close']
+        except (KeyError, TypeError):
+            force_close = False
+
+        try:
+            keepalive_timeout = float(con['Keepalive_Timeout'])
+        except (KeyError, TypeError):
+            keepalive_timeout = 15.0
+
+        try:
+            use_dns_cache = con['Use_DNS_Cache']
+        except (KeyError, TypeError):
+            use_dns_cache = True
+
+        try:
+            ttl_dns_cache = int(con['TTL_DNS_Cache'])
+        except (KeyError, TypeError):
+            ttl_dns_cache = 10
+
+        try:
+            async_dns = con['Async_DNS']
+        except (KeyError, TypeError):
+            async_dns = False
+
+        resolver = None
+        if async_dns:
+            try:
+                resolver = aio.AsyncResolver()
+            except (ImportError, RuntimeError) as e:  # aiodns unavailable
+                logger.warning(f'Async_DNS requested but unavailable, using threaded resolver: {e}')
+
+        timeouts = {}
+        for key, arg, default in (('Timeout_Total', 'total', 300.0),
+                                  ('Timeout_Connect', 'connect', None),
+                                  ('Timeout_Sock_Connect', 'sock_connect', None),
+                                  ('Timeout_Sock_Read', 'sock_read', None)):
+            try:
+                timeouts[arg] = float(con[key]) or None
+            except (KeyError, TypeError):
+                timeouts[arg] = default
+
+        connector = aio.TCPConnector(limit=limit,
+                                     limit_per_host=limit_per_host,
+                                     force_close=force_close,
+                                     keepalive_timeout=None if force_close else keepalive_timeout,
+                                     use_dns_cache=use_dns_cache,
+                                     ttl_dns_cache=ttl_dns_cache,
+                                     resolver=resolver)
+
+        return connector, aio.ClientTimeout(**timeouts)
+
     def session_config(self, cfg: dict) -> NoReturn:
         """Session Configuration
 
@@ -223,12 +615,6 @@ def session_config(self, cfg: dict) -> NoReturn:
         except (KeyError, TypeError):
             cookies = None
 
-        # Cookie Jar
-        try:
-            cookie_jar_unsafe = cfg['Options']['CookieJar_Unsafe']
-        except (KeyError, TypeError):
-            cookie_jar_unsafe = False
-
         # Headers
         try:
             auth_hdr = cfg['Auth']['Header']
@@ -250,12 +636,37 @@ def session_config(self, cfg: dict) -> NoReturn:
         else:
             hdrs = self.HDR
 
-        self.session = aio.ClientSession(auth=auth,
-                                         cookies=cookies,
-                                         cookie_jar=aio.CookieJar(unsafe=cookie_jar_unsafe),
-                                         headers=hdrs,
-                                         json_serialize=rapidjson.dumps,
-                                         timeout=aio.ClientTimeout(total=300))
+        if self.compression and self.compression.negotiate:
+            hdrs = {**hdrs, 'Accept-Encoding': self.compression.accept}
+
+        # The connector and cookie jar need a running event loop; see session
+        self.session_kwargs = {'auth': auth, 'cookies': cookies, 'headers': hdrs}
+        self.session_cfg = cfg
+
+    @property
+    def session(self) -> aio.ClientSession:
+        """Created on first use, inside the running event loop; see session_config"""
+        if self._session is None:
+            # Cookie Jar
+            try:
+                cookie_jar_unsafe = self.session_cfg['Options']['CookieJar_Unsafe']
+            except (KeyError, TypeError):
+                cookie_jar_unsafe = False
+
+            connector, timeout = self.connection_config(self.session_cfg)
+
+            self._session = aio.ClientSession(connector=connector,
+                                              cookie_jar=aio.CookieJar(unsafe=cookie_jar_unsafe),
+                                              json_serialize=rapidjson.dumps,
+                                              timeout=timeout,
+                                              trace_configs=[self.metrics.trace_config()] if self.metrics else None,
+                                              **self.session_kwargs)
+
+        return self._session
+
+    @session.setter
+    def session(self, session: Union[aio.ClientSession, None]) -> NoReturn:
+        self._session = session
 
     @staticmethod
     async def request_debug(response: aio.ClientResponse) -> str:
@@ -280,7 +691,141 @@ async def request_debug(response: aio.ClientResponse) -> str:
                f'\n\tResponse-JSON: \n\t\t{j}\n' \
                f'\n\tResponse-TEXT: \n\t\t{t}\n'
 
-    async def process_results(self, results: Results,
+    def register_decoder(self, content_type: str, decoder: Decoder) -> NoReturn:
+        """Register a Content-Type decoder for this client
+
+        Subclasses can instead extend the class attribute; e.g. DECODERS = {**BaseApiClient.DECODERS, ...}
+
+        Args:
+            content_type (str): Media type; e.g. application/xml
+            decoder (Decoder): async (response) -> Union[dict, list]
+
+        Returns:
+            N/A (NoReturn)"""
+        self.decoders[content_type.lower()] = decoder
+
+    async def decode_response(self, response: Union[aio.ClientResponse, Response],
+                              data_key: Optional[str] = None) -> Union[dict, list]:
+        """Decode a response body according to its Content-Type; see self.decoders
+
+        Args:
+            response (Union[aio.ClientResponse, Response]):
+            data_key (Optional[str]): Lets an offloaded JSON decode yield between records; see offload
+
+        Raises:
+            NotImplementedError
+
+        Returns:
+            response (Union[dict, list])"""
+        if isinstance(response, Response) and response.payload is not None:  # Preloaded
+            return response.payload
+
+        try:
+            content_type = response.headers['Content-Type']
+        except KeyError as ke:  # fixme: (improve this note) This shouldn't happen too often.
+            logger.warning(ke)
+            return {'text_plain': await response.text(encoding='utf-8')}
+
+        if not (decoder := find_decoder(self.decoders, content_type)):
+            logger.error(f'Content-Type: {content_type}, not currently handled.')
+            raise NotImplementedError
+
+        ts = perf_counter()
+        if self.offload and decoder is decode_json and len(body := await response.read()) >= self.offload.threshold:
+            decoded = await self.offload.decode(body, data_key)
+        else:
+            decoded = await decoder(response)
+        if self.metrics:
+            self.metrics.observe(response.url, 'decode', perf_counter() - ts)
+
+        # This is for when the 'Content-Type' is specified as JSON but is actually returned as a string by the API.
+        if type(decoded) == str:
+            decoded = {'text_plain': await response.text(encoding='utf-8')}
+
+        return decoded
+
+    @staticmethod
+    def parse_result(response: Union[dict, list], status: int, request_id: str,
+                     data_key: Optional[str] = None,
+                     tag: bool = True) -> Tuple[List[dict], List[dict]]:
+        """Parse a decoded response into request_id tagged records
+
+        Args:
+            response (Union[dict, list]): Decoded response; see decode_response
+            status (int): HTTP Status
+            request_id (str):
+            data_key (Optional[str]):
+            tag (bool): Copy each successful record to add request_id; False returns them as decoded
+
+        Returns:
+            success, failure (Tuple[List[dict], List[dict]])"""
+        rid = {'request_id': request_id}
+
+        if 200 <= status <= 299:
+            if not tag:
+                d = response[data_key] if type(response) is dict and type(response.get(data_key)) is list else response
+                return (d if type(d) is list else [d]), []
+
+            try:
+                d = response[data_key]
+                if type(d) is list:
+                    data = [{**r, **rid} for r in d]
+                else:
+                    data = response
+            except (KeyError, TypeError):
+                if type(response) is list:
+                    data = [{**r, **rid} for r in response]
+                else:
+                    data = {**response, **rid}
+
+            return (data if type(data) is list else [data]), []
+        elif status > 299:
+            return [], [{**response, **rid}]
+
+        return [], []
+
+    async def process_result(self, result: dict, data_key: Optional[str] = None) -> Tuple[List[dict], List[dict]]:
+        """Process a single Result from BaseApiClient.request
+
+        Args:
+            result (dict): {'request_id': str, 'response': aio.ClientResponse}
+            data_key (Optional[str]):
+
+        Returns:
+            success, failure (Tuple[List[dict], List[dict]])"""
+        response = await self.decode_response(result['response'], data_key)
+
+        return self.parse_result(response, result['response'].status, result['request_id'], data_key)
+
+    async def iter_result(self, result: dict,
+                          data_key: Optional[str] = None,
+                          incremental: bool = False) -> AsyncIterator[Tuple[List[dict], List[dict]]]:
+        """Iterate a single Result from BaseApiClient.request
+
+        Args:
+            result (dict): {'request_id': str, 'response': aio.ClientResponse}
+            data_key (Optional[str]):
+            incremental (bool): Decode successful JSON/NDJSON bodies as they stream off the socket, yielding one
+                record at a time (see streaming); peak memory stays near one record.
+
+        Returns:
+            success, failure (AsyncIterator[Tuple[List[dict], List[dict]]])"""
+        response = result['response']
+        decoder = find_decoder(self.decoders, response.headers.get('Content-Type', ''))
+
+        if incremental and isinstance(response, aio.ClientResponse) and 200 <= response.status <= 299 and \
+                decoder in (decode_json, decode_ndjson):
+            rid = {'request_id': result['request_id']}
+            chunks = response.content.iter_chunked(self.CHUNK_SIZE)
+            try:
+                async for rec in iter_json_array(chunks, data_key) if decoder is decode_json else iter_ndjson(chunks):
+                    yield [{**rec, **rid}], []
+            finally:
+                response.release()
+        else:
+            yield await self.process_result(result, data_key)
+
+    async def process_results(self, results: Union[Results, CompactResults],
                               data_key: Optional[str] = None,
                               cleanup: bool = False,
                               sort_field: Optional[str] = None,
@@ -299,61 +844,39 @@ async def process_results(self, results: Results,
             Performs generic sort if sort_field not specified.
 
         Returns:
-            results (Results): """
-        for result in results.data:
-            rid = {'request_id': result['request_id']}
-            status = result['response'].status
-
-            try:
-                if result['response'].headers['Content-Type'].startswith('application/jwt'):
-                    response = {'token': await result['response'].text(encoding='utf-8'), 'token_type': 'Bearer'}
-                elif result['response'].headers['Content-Type'].startswith('application/json'):
-                    response = await result['response'].json(encoding='utf-8', loads=rapidjson.loads)
-                elif result['response'].headers['Content-Type'].startswith('application/javascript'):
-                    response = await result['response'].json(encoding='utf-8', loads=rapidjson.loads,
-                                                             content_type='application/javascript')
-                elif result['response'].headers['Content-Type'].startswith('text/javascript'):
-                    response = await result['response'].json(encoding='utf-8', loads=rapidjson.loads,
-                                                             content_type='text/javascript')
-                elif result['response'].headers['Content-Type'].startswith('text/plain'):
-                    response = {'text_plain': await result['response'].text(encoding='utf-8')}
-                elif result['response'].headers['Content-Type'].startswith('text/html'):
-                    response = {'text_html': await result['response'].text(encoding='utf-8')}
+            results (Union[Results, CompactResults]):
+                CompactResults/ColumnarResults store records without per-record copies. """
+        if isinstance(results, CompactResults):
+            for result in results.data:
+                response = await self.decode_response(result['response'], data_key)
+                success, failure = self.parse_result(response, result['response'].status, result['request_id'], data_key,
+                                                     tag=False)
+                results.add(success, result['request_id'])
+                results.failure.extend(failure)
+
+            if cleanup:
+                del results.data
+                if self.offload and len(results) >= self.offload.records:
+                    await self.offload.run(results.cleanup, 'asc', True)
                 else:
-                    logger.error(f'Content-Type: {result["response"].headers["Content-Type"]}, not currently handled.')
-                    raise NotImplementedError
-            except KeyError as ke:  # fixme: (improve this note) This shouldn't happen too often.
-                logger.warning(ke)
-                response = {'text_plain': await result['response'].text(encoding='utf-8')}
+                    results.cleanup(keep_request_id=True)
 
-            # This is for when the 'Content-Type' is specified as JSON but is actually returned as a string by the API.
-            if type(response) == str:
-                response = {'text_plain': await result['response'].text(encoding='utf-8')}
+            if sort_field or sort_order:
+                results.sort(key=sort_field, reverse=True if (sort_order or '').lower() == 'desc' else False)
 
-            if 200 <= status <= 299:
-                try:
-                    d = response[data_key]
-                    if type(d) is list:
-                        data = [{**r, **rid} for r in d]
-                    else:
-                        data = response
-                except (KeyError, TypeError):
-                    if type(response) is list:
-                        data = [{**r, **rid} for r in response]
-                    else:
-                        data = {**response, **rid}
-
-                if type(data) is list:
-                    results.success.extend(data)
-                else:
-                    results.success.append(data)
+            return results
 
-            elif status > 299:
-                results.failure.append({**response, **rid})
+        for result in results.data:
+            success, failure = await self.process_result(result, data_key)
+            results.success.extend(success)
+            results.failure.extend(failure)
 
         if cleanup:
             del results.data
-            results.success = [dict(sorted({k: v for k, v in rec.items() if v is not None}.items())) for rec in results.success]
+            if self.offload:
+                results.success = await self.offload.cleanup(results.success)
+            else:
+                results.success = cleanup_records(results.success)
 
         if sort_order:
             sort_order = sort_order.lower()
@@ -365,43 +888,660 @@ async def process_results(self, results: Results,
 
         return results
 
+    async def stream_results(self, tasks: Iterable[Awaitable[dict]],
+                             data_key: Optional[str] = None,
+                             cleanup: bool = False,
+                             failure: Optional[list] = None,
+                             incremental: bool = False) -> AsyncIterator[dict]:
+        """Stream Results from aio.ClientRequest(s) as they complete
+
+        Streaming counterpart to process_results; records are decoded and yielded in completion order
+        instead of waiting on the slowest request, so nothing is retained beyond what the consumer keeps.
+        Pending tasks are cancelled if the consumer stops iterating early.
+
+        Args:
+            tasks (Iterable[Awaitable[dict]]): Tasks/coroutines of BaseApiClient.request
+            data_key (Optional[str]):
+            cleanup (Optional[bool]): Removes empty (None) keys and Sorts Keys of each record.
+            failure (Optional[list]): If provided, failed results are appended here; otherwise they are dropped.
+            incremental (bool): Decode JSON bodies incrementally; see iter_result
+
+        Returns:
+            record (AsyncIterator[dict])"""
+        futures = [asyncio.ensure_future(t) for t in tasks]
+
+        try:
+            for future in asyncio.as_completed(futures):
+                async for success, failed in self.iter_result(await future, data_key, incremental):
+                    if failure is not None:
+                        failure.extend(failed)
+
+                    for rec in success:
+                        if cleanup:
+                            rec = dict(sorted({k: v for k, v in rec.items() if v is not None}.items()))
+
+                        yield rec
+        finally:
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+                elif not future.cancelled() and not future.exception():
+                    future.result()['response'].release()
+
+    async def request_many(self, requests: Union[Iterable[dict], AsyncIterable[dict]],
+                           data_key: Optional[str] = None,
+                           cleanup: bool = False,
+                           failure: Optional[list] = None,
+                           workers: Optional[int] = None,
+                           incremental: bool = False) -> AsyncIterator[dict]:
+        """Bulk Request
+
+        Consumes `requests` lazily through a bounded pool of workers and yields decoded records as they complete;
+        only ~2x workers requests/pages are held at any time, regardless of how many requests are submitted.
+        An exception (from a request or from `requests`) is raised to the consumer; the remaining workers are
+        cancelled, as they are when the consumer stops iterating early.
+
+        Args:
+            requests (Union[Iterable[dict], AsyncIterable[dict]]): Keyword arguments for BaseApiClient.request
+                e.g. ({'method': 'get', 'end_point': f'/devices/{i}'} for i in ids)
+            data_key (Optional[str]):
+            cleanup (Optional[bool]): Removes empty (None) keys and Sorts Keys of each record.
+            failure (Optional[list]): If provided, failed results are appended here; otherwise they are dropped.
+            workers (Optional[int]): Default: self.concurrency
+            incremental (bool): Decode JSON bodies incrementally; see iter_result
+
+        Returns:
+            record (AsyncIterator[dict])"""
+        workers = workers or self.concurrency
+        pending = asyncio.Queue(maxsize=workers)
+        done = asyncio.Queue(maxsize=workers)
+
+        async def feed() -> NoReturn:
+            try:
+                if isinstance(requests, AsyncIterable):
+                    async for spec in requests:
+                        await pending.put(spec)
+                else:
+                    for spec in requests:
+                        await pending.put(spec)
+            except Exception as e:  # Surfaced by the consumer, which then stops the workers
+                await done.put(e)
+                return
+
+            for _ in range(workers):
+                await pending.put(None)
+
+        async def work() -> NoReturn:
+            while (spec := await pending.get()) is not None:
+                try:
+                    async for item in self.iter_result(await self.request(**spec), data_key, incremental):
+                        await done.put(item)
+                except Exception as e:
+                    await done.put(e)
+
+            await done.put(None)
+
+        tasks = [asyncio.create_task(feed())] + [asyncio.create_task(work()) for _ in range(workers)]
+
+        try:
+            finished = 0
+            while finished < workers:
+                if (item := await done.get()) is None:
+                    finished += 1
+                    continue
+                elif isinstance(item, Exception):
+                    raise item
+
+                success, failed = item
+                if failure is not None:
+                    failure.extend(failed)
+
+                for rec in success:
+                    if cleanup:
+                        rec = dict(sorted({k: v for k, v in rec.items() if v is not None}.items()))
+
+                    yield rec
+        finally:
+            # Early exit or an error; nothing may stay blocked on the bounded queues
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stream_shards(self, requests: Iterable[dict],
+                            data_key: Optional[str] = None,
+                            cleanup: bool = False,
+                            failure: Optional[list] = None,
+                            processes: Optional[int] = None,
+                            chunk_size: int = 1000) -> AsyncIterator[List[dict]]:
+        """Sharded Bulk Request
+
+        Spreads `requests` over a pool of worker processes so decoding and record processing use every core. Each
+        worker owns an event loop, session and client (type(self), built from self.cfg) whose SEM, connection and
+        rate limits are its share of this client's (see sharding.worker_config). Requests are sent in chunks of
+        chunk_size (via request_many); at most 2 chunks per worker are in flight, and each chunk's records are
+        yielded as soon as it completes. Requests and records are pickled between processes; the client class must
+        be importable by the workers (spawned, not forked).
+
+        Args:
+            requests (Iterable[dict]): Keyword arguments for BaseApiClient.request
+            data_key (Optional[str]):
+            cleanup (Optional[bool]): Removes empty (None) keys and Sorts Keys of each record.
+            failure (Optional[list]): If provided, failed results are appended here; otherwise they are dropped.
+            processes (Optional[int]): Default: os.cpu_count()
+            chunk_size (int): Requests per chunk
+
+        Returns:
+            records (AsyncIterator[List[dict]])"""
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import get_context
+
+        processes = processes or cpu_count() or 1
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(max_workers=processes,
+                                   mp_context=get_context('spawn'),
+                                   initializer=init_worker,
+                                   initargs=(type(self), worker_config(self.cfg, self.concurrency, processes)))
+        inflight = set()
+
+        try:
+            for chunk in chunked(requests, chunk_size):
+                inflight.add(loop.run_in_executor(pool, run_chunk, chunk, data_key, cleanup))
+                if len(inflight) < processes * 2:
+                    continue
+
+                done, inflight = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    success, failed = future.result()
+                    if failure is not None:
+                        failure.extend(failed)
+                    yield success
+
+            for future in asyncio.as_completed(inflight):
+                success, failed = await future
+                if failure is not None:
+                    failure.extend(failed)
+                yield success
+        finally:
+            for future in inflight:
+                future.cancel()
+            await loop.run_in_executor(None, pool.shutdown)
+
+    async def shard(self, requests: Iterable[dict],
+                    data_key: Optional[str] = None,
+                    cleanup: bool = False,
+                    processes: Optional[int] = None,
+                    chunk_size: int = 1000) -> Results:
+        """Sharded Bulk Request; see stream_shards
+
+        Args:
+            requests (Iterable[dict]): Keyword arguments for BaseApiClient.request
+            data_key (Optional[str]):
+            cleanup (Optional[bool]):
+            processes (Optional[int]): Default: os.cpu_count()
+            chunk_size (int): Requests per chunk
+
+        Returns:
+            results (Results): success & failure merged from every worker"""
+        results = Results(data=[])
+        async for records in self.stream_shards(requests, data_key, cleanup, results.failure, processes, chunk_size):
+            results.success.extend(records)
+
+        return results
+
+    async def paginate(self, end_point: str,
+                       pagination: Optional[Pagination] = None,
+                       data_key: Optional[str] = None,
+                       method: str = 'get',
+                       params: Optional[dict] = None,
+                       json: Optional[dict] = None,
+                       cleanup: bool = False,
+                       failure: Optional[list] = None) -> AsyncIterator[dict]:
+        """Paginate an End-Point
+
+        Yields the records of every page; see models.Pagination for the available strategies.
+            offset: With a known total, the remaining pages are requested concurrently (bounded by self.sem);
+                    otherwise pagination.prefetch pages are kept in flight and walking stops on a short/empty page.
+            cursor: The next page is requested as soon as its cursor is decoded, before the current page is yielded.
+            link:   The next page (RFC 5988 Link: rel="next") is requested before the current page is decoded.
+
+        Args:
+            end_point (str): REST Endpoint; e.g. /devices/query
+            pagination (Optional[Pagination]): Default: Pagination()
+            data_key (Optional[str]):
+            method (str): A valid HTTP Verb
+            params (Optional[dict]):
+            json (Optional[dict]):
+            cleanup (Optional[bool]): Removes empty (None) keys and Sorts Keys of each record.
+            failure (Optional[list]): If provided, failed results are appended here; otherwise they are dropped.
+
+        Returns:
+            record (AsyncIterator[dict])"""
+        pagination = pagination or Pagination()
+        params = params or {}
+        tasks = deque()
+
+        def page(**kwargs) -> asyncio.Task:
+            return asyncio.create_task(self.request(method=method, end_point=end_point, json=json,
+                                                    params={**params, **kwargs}))
+
+        async def fetch(result: dict) -> Tuple[Union[dict, list], List[dict]]:
+            response = await self.decode_response(result['response'], data_key)
+            success, failed = self.parse_result(response, result['response'].status, result['request_id'], data_key)
+
+            if failure is not None:
+                failure.extend(failed)
+
+            if cleanup:
+                success = await self.offload.cleanup(success) if self.offload else cleanup_records(success)
+
+            return response, success
+
+        try:
+            if pagination.strategy == 'offset':
+                limit = pagination.limit
+                tasks.append(page(**{pagination.limit_param: limit, pagination.offset_param: 0}))
+                response, success = await fetch(await tasks.popleft())
+                total = pagination.lookup(response, pagination.total_key)
+                pages = 1
+
+                if total is not None:
+                    offsets = range(limit, int(total), limit)[:(pagination.max_pages - 1) if pagination.max_pages else None]
+                    tasks.extend(page(**{pagination.limit_param: limit, pagination.offset_param: o}) for o in offsets)
+                    for rec in success:
+                        yield rec
+
+                    if success:
+                        async for rec in self.stream_results(list(tasks), data_key, cleanup, failure):
+                            yield rec
+                else:
+                    offset = limit
+                    while len(success) >= limit and (not pagination.max_pages or pages < pagination.max_pages):
+                        while len(tasks) < pagination.prefetch and \
+                                (not pagination.max_pages or pages + len(tasks) < pagination.max_pages):
+                            tasks.append(page(**{pagination.limit_param: limit, pagination.offset_param: offset}))
+                            offset += limit
+
+                        for rec in success:
+                            yield rec
+
+                        _, success = await fetch(await tasks.popleft())
+                        pages += 1
+
+                    for rec in success:
+                        yield rec
+
+            elif pagination.strategy == 'cursor':
+                tasks.append(page(**{pagination.limit_param: pagination.limit}))
+                pages = 0
+                while tasks:
+                    response, success = await fetch(await tasks.popleft())
+                    pages += 1
+                    cursor = pagination.lookup(response, pagination.cursor_key)
+
+                    if success and cursor and (not pagination.max_pages or pages < pagination.max_pages):
+                        tasks.append(page(**{pagination.limit_param: pagination.limit, pagination.cursor_param: cursor}))
+
+                    for rec in success:
+                        yield rec
+
+            elif pagination.strategy == 'link':
+                tasks.append(page(**{pagination.limit_param: pagination.limit}))
+                pages = 0
+                while tasks:
+                    result = await tasks.popleft()
+                    pages += 1
+
+                    if (nxt := result['response'].links.get('next', {}).get('url')) and \
+                            (not pagination.max_pages or pages < pagination.max_pages):
+                        tasks.append(asyncio.create_task(self.request(method=method, end_point=str(nxt), json=json)))
+
+                    _, success = await fetch(result)
+                    if not success:
+                        break
+
+                    for rec in success:
+                        yield rec
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled() and not task.exception():
+                    task.result()['response'].release()
+
     @staticmethod
-    async def file_streamer(file_path: str) -> bytes:
+    async def file_streamer(file_path: str, chunk_size: int = 256 * 1024) -> bytes:
         """File Streamer
 
         Streams a file from disk.
 
         Args:
             file_path (str):
+            chunk_size (int): Bytes per read; each read is a thread-pool hop, so larger is cheaper
 
         Returns:
             chunk (bytes)"""
 
-        async with aiofiles.open(realpath(file_path), 'rb') as f:
-            while chunk := await f.read(1024):
+        async with open_async(realpath(file_path), 'rb') as f:
+            while chunk := await f.read(chunk_size):
                 yield chunk
 
-    @retry(retry=retry_if_exception_type(aio.ClientError),
-           wait=wait_random_exponential(multiplier=1.25, min=3, max=60),
-           after=after_log(logger, logging.DEBUG),
-           stop=stop_after_attempt(5),
-           before_sleep=before_sleep_log(logger, logging.WARNING))
+    async def upload(self, end_point: str, file_path: str,
+                     method: str = 'put',
+                     field: Optional[str] = None,
+                     params: Optional[dict] = None,
+                     headers: Optional[dict] = None,
+                     use_mmap: bool = True,
+                     part_size: Optional[int] = None,
+                     part_param: str = 'partNumber',
+                     commit: Optional[Callable[[List[dict]], Awaitable[Any]]] = None) -> dict:
+        """Upload a File
+
+        The body is a memory-mapped view of the file (zero-copy) or, with use_mmap=False, streamed in
+        Options.Upload_Chunk_Size chunks; the stream is reopened for each attempt (retries, 429s). With part_size,
+        the file is split into parts uploaded concurrently (bounded by self.sem), each with params {part_param: n}
+        (1-based); `commit` is then awaited with the parts, e.g. to complete an S3-style multipart upload.
+
+        Args:
+            end_point (str): REST Endpoint
+            file_path (str):
+            method (str): A valid HTTP Verb
+            field (Optional[str]): Send as multipart/form-data under this field; Default: raw body
+            params (Optional[dict]):
+            headers (Optional[dict]):
+            use_mmap (bool):
+            part_size (Optional[int]): Bytes per part; Default: single request
+            part_param (str): Query parameter holding the part number
+            commit (Optional[Callable[[List[dict]], Awaitable[Any]]]): Called with
+                [{'part': int, 'offset': int, 'size': int, 'status': int, 'etag': Optional[str]}, ...]
+                once every part succeeded.
+
+        Returns:
+            result (dict): {'request_id', 'response' | 'parts' & 'commit', 'bytes', 'seconds', 'bytes_per_sec'}"""
+        size = getsize(file_path)
+        ts = perf_counter()
+        boundary = uuid4().hex  # Fixed, so a body rebuilt for another attempt still matches its Content-Type
+
+        def body(content: Union[bytes, memoryview, AsyncIterator[bytes]]) -> Tuple[Any, dict]:
+            if field:
+                form = aio.MultipartWriter('form-data', boundary=boundary)
+                part = form.append(content, {'Content-Type': 'application/octet-stream'})
+                part.set_content_disposition('form-data', name=field, filename=basename(file_path))
+                return form, {**(headers or {}), 'Content-Type': form.content_type}
+
+            return content, {'Content-Type': 'application/octet-stream', **(headers or {})}
+
+        if part_size and size > part_size:
+            async def upload_part(part: int, offset: int) -> dict:
+                data, hdrs = body(view[offset:offset + part_size])
+                result = await self.request(method, end_point, data=data, headers=hdrs, params={**(params or {}), part_param: part})
+                result['response'].release()
+
+                return {'part':   part,
+                        'offset': offset,
+                        'size':   min(part_size, size - offset),
+                        'status': result['response'].status,
+                        'etag':   result['response'].headers.get('ETag')}
+
+            with mmap_file(file_path) as view:
+                parts = await asyncio.gather(*[upload_part(n, o) for n, o in enumerate(range(0, size, part_size), start=1)])
+
+            result = {'request_id': uuid4().hex, 'parts': parts, 'commit': None}
+            if failed := [p for p in parts if p['status'] > 299]:
+                logger.error(f'Upload of {file_path} failed; parts: {[p["part"] for p in failed]}')
+            elif commit:
+                result['commit'] = await commit(parts)
+        elif use_mmap:
+            with mmap_file(file_path) as view:
+                data, hdrs = body(view)
+                result = await self.request(method, end_point, data=data, headers=hdrs, params=params)
+        else:
+            def stream() -> Any:  # A stream can only be sent once; see send
+                return body(self.file_streamer(file_path, self.upload_chunk_size))[0]
+
+            hdrs = body(b'')[1]
+            result = await self.request(method, end_point, data=stream, headers=hdrs, params=params)
+
+        seconds = perf_counter() - ts
+        result.update({'bytes': size, 'seconds': seconds, 'bytes_per_sec': size / seconds if seconds else 0.0})
+        logger.info(f'Uploaded {file_path}: {size} bytes in {seconds:.3f} seconds '
+                    f'({result["bytes_per_sec"] / 1024 ** 2:.2f} MiB/s)')
+
+        return result
+
+    async def fetch_range(self, url: str, part_path: str,
+                          start: int = 0,
+                          end: Optional[int] = None,
+                          params: Optional[dict] = None,
+                          headers: Optional[dict] = None,
+                          attempts: int = 3) -> Tuple[int, int, Optional[int]]:
+        """Stream bytes [start, end] (end inclusive; None = to EOF) of url into part_path at the same offset
+
+        A transfer interrupted mid-body is resumed from the last byte written with a Range request. If the server
+        ignores Range on an open-ended request the file is rewritten from the start.
+
+        Args:
+            url (str):
+            part_path (str): Must exist when writing a bounded segment
+            start (int):
+            end (Optional[int]):
+            params (Optional[dict]):
+            headers (Optional[dict]):
+            attempts (int): Interrupted transfers are resumed this many times
+
+        Raises:
+            aio.ClientResponseError
+            aio.ClientPayloadError
+
+        Returns:
+            (Tuple[int, int, Optional[int]]): (Offset the transfer began at, offset it ended at,
+                                               complete size if the server reported it)"""
+        begin = start
+        total = None
+
+        while True:
+            hdrs = dict(headers or {})
+            if start or end is not None:
+                hdrs['Range'] = f'bytes={start}-{"" if end is None else end}'
+
+            response = await self.send('get', url, params=params, headers=hdrs)
+            try:
+                if response.status == 416 and end is None:  # Nothing left to fetch
+                    if cr := response.headers.get('Content-Range'):
+                        total = int(cr.rpartition('/')[2])
+                    return begin, start, total
+
+                response.raise_for_status()
+
+                if response.status == 206:
+                    if (cr := response.headers.get('Content-Range', '*/*').rpartition('/')[2]) != '*':
+                        total = int(cr)
+                elif end is None:
+                    begin = start = 0
+                    if 'Content-Encoding' not in response.headers and response.content_length is not None:
+                        total = response.content_length
+                else:
+                    logger.error(f'Range not satisfied by {url}: {response.status}')
+                    raise aio.ClientPayloadError(f'Range not satisfied: bytes={start}-{end}')
+
+                async with open_async(realpath(part_path), 'r+b' if start or end is not None else 'wb') as f:
+                    await f.seek(start)
+                    buffer = bytearray()
+                    try:
+                        async for chunk in response.content.iter_chunked(self.download_chunk_size):
+                            buffer += chunk
+                            if len(buffer) >= self.download_chunk_size:  # Fewer, larger writes; each is a thread-pool hop
+                                await f.write(buffer)
+                                start += len(buffer)
+                                buffer.clear()
+                    finally:
+                        if buffer:
+                            await f.write(buffer)
+                            start += len(buffer)
+
+                    if end is None:
+                        await f.truncate()
+
+                return begin, start, total
+            except (aio.ClientPayloadError, aio.ServerDisconnectedError, asyncio.TimeoutError) as e:
+                if (attempts := attempts - 1) < 0 or (end is not None and start > end):
+                    raise
+
+                logger.warning(f'Download of {url} interrupted at byte {start} ({e!r}); resuming.')
+            finally:
+                response.release()
+
+    async def download(self, end_point: str, dest_path: str,
+                       params: Optional[dict] = None,
+                       headers: Optional[dict] = None,
+                       segments: int = 1,
+                       checksum: Optional[str] = None,
+                       resume: bool = True) -> dict:
+        """Download to Disk
+
+        The body is streamed into `dest_path`.part in Options.Download_Chunk_Size writes and renamed to dest_path once
+        verified. An existing .part file is resumed with a Range request. With segments > 1, and a server that
+        advertises Accept-Ranges: bytes and a Content-Length on HEAD, the file is fetched as that many concurrent
+        byte-range segments (bounded by self.sem); otherwise a single stream is used. Bypasses the response cache
+        and request coalescing.
+
+        Args:
+            end_point (str): REST Endpoint
+            dest_path (str):
+            params (Optional[dict]):
+            headers (Optional[dict]):
+            segments (int): Concurrent byte-range requests for large files
+            checksum (Optional[str]): '<hashlib algorithm>:<hex digest>', e.g. 'sha256:9f86d0...'
+            resume (bool): Continue from an existing .part file
+
+        Raises:
+            aio.ClientResponseError
+            aio.ClientPayloadError: Size or checksum mismatch
+
+        Returns:
+            result (dict): {'request_id', 'path', 'bytes', 'resumed', 'segments', 'seconds', 'bytes_per_sec'}"""
+        url = self.make_url(end_point)
+        part_path = f'{dest_path}.part'
+        ts = perf_counter()
+        size = None
+        resumed = 0
+
+        if segments > 1:
+            response = await self.send('head', url, params=params, headers=headers)
+            response.release()
+
+            if response.status < 300 \
+                    and response.headers.get('Accept-Ranges', '').lower() == 'bytes' \
+                    and 'Content-Encoding' not in response.headers:
+                size = response.content_length
+
+            if not size or size < segments * self.download_chunk_size:  # Not worth splitting
+                segments = 1
+
+        if segments > 1:
+            async with open_async(realpath(part_path), 'wb') as f:
+                await f.truncate(size)
+
+            step = -(-size // segments)
+            await asyncio.gather(*[self.fetch_range(url, part_path, start, min(start + step, size) - 1, params, headers)
+                                   for start in range(0, size, step)])
+        else:
+            if resume and exists(part_path):
+                resumed = getsize(part_path)
+
+            resumed, _, size = await self.fetch_range(url, part_path, resumed, None, params, headers)
+
+        written = getsize(part_path)
+        if size is not None and written != size:
+            logger.error(f'Download of {url} incomplete: {written} of {size} bytes in {part_path}')
+            raise aio.ClientPayloadError(f'Size mismatch: expected {size}, received {written}')
+
+        if checksum:
+            algorithm, _, expected = checksum.partition(':')
+
+            def digest() -> str:
+                h = hashlib.new(algorithm)
+                with open(realpath(part_path), 'rb') as f:
+                    while chunk := f.read(self.download_chunk_size):
+                        h.update(chunk)
+                return h.hexdigest()
+
+            if (actual := await asyncio.get_running_loop().run_in_executor(None, digest)) != expected.lower():
+                remove(part_path)  # Corrupt; a resume would only extend it
+                logger.error(f'Download of {url} failed {algorithm} verification: {actual} != {expected}')
+                raise aio.ClientPayloadError(f'Checksum mismatch: {algorithm} {actual} != {expected}')
+
+        replace(part_path, dest_path)
+
+        seconds = perf_counter() - ts
+        result = {'request_id':    uuid4().hex,
+                  'path':          dest_path,
+                  'bytes':         written,
+                  'resumed':       resumed,
+                  'segments':      segments,
+                  'seconds':       seconds,
+                  'bytes_per_sec': (written - resumed) / seconds if seconds else 0.0}
+        logger.info(f'Downloaded {url} to {dest_path}: {written} bytes in {seconds:.3f} seconds '
+                    f'({result["bytes_per_sec"] / 1024 ** 2:.2f} MiB/s)')
+
+        return result
+
+    def request_key(self, method: str, url: str,
+                    params: Optional[Union[List[tuple], dict, 'MultiDict']] = None) -> tuple:
+        """Identify a request by method, URL, params and session identity (auth/headers)
+
+        Args:
+            method (str):
+            url (str):
+            params (Optional[Union[List[tuple], dct, MultiDict]]):
+
+        Returns:
+            key (tuple)"""
+        if isinstance(params, Mapping):
+            params = params.items()
+
+        return (method.lower(), url, tuple(params or ()), tuple(sorted(self.session.headers.items())),
+                getattr(self.session, 'auth', None))
+
+    def make_url(self, end_point: str) -> str:
+        """Prefix end_point with URI.Base unless it is already absolute (e.g. pagination links)
+
+        Args:
+            end_point (str): REST Endpoint
+
+        Returns:
+            url (str)"""
+        try:
+            base = self.cfg['URI']['Base']
+        except (KeyError, TypeError):
+            base = ''
+
+        if end_point.startswith(('http://', 'https://')):
+            base = ''
+
+        return f'{base}{end_point}'
+
     async def request(self, method: str, end_point: str,
                       request_id: Optional[str] = None,
-                      data: Optional[Union[dict, aio.FormData]] = None,
+                      data: Optional[Union[dict, aio.FormData, Callable[[], Any]]] = None,
                       json: Optional[dict] = None,
-                      params: Optional[Union[List[tuple], dict, MultiDict]] = None,
+                      params: Optional[Union[List[tuple], dict, 'MultiDict']] = None,
                       file: Optional[str] = None,
+                      headers: Optional[dict] = None,
+                      preload: Optional[bool] = None,
                       debug: Optional[bool] = False) -> dict:
         """Multi-purpose aiohttp request function
         Args:
-            file (Optional[str]): A valid file-path
+            file (Optional[str]): A valid file-path; streamed as the multipart form field `file`, alongside `data`
             method (str): A valid HTTP Verb in [GET, POST]
             end_point (str): REST Endpoint; e.g. /devices/query
             request_id (str): Unique Identifier used to associate request with response
-            data (Optional[dct]):
+            data (Optional[Union[dct, aio.FormData, Callable[[], Any]]]): Pass a single-use body (e.g. a stream) as a
+                callable returning it, so each attempt (retries, 429s) gets a fresh one
             json (Optional[dct]):
             params (Optional[Union[List[tuple], dct, MultiDict]]):
+            headers (Optional[dct]): Merged over the session headers
+            preload (Optional[bool]): Read and decode the body while holding the semaphore, returning a compact
+                models.Response with the connection already released; Default: Options.Preload
             debug (Optional[bool]):
 
         References:
@@ -416,66 +1556,267 @@ async def request(self, method: str, end_point: str,
             request_id = uuid4().hex
 
         if file:
-            data = {**data, 'file': self.file_streamer(file)}
+            fields = data or {}
+            boundary = uuid4().hex  # Fixed, so a body rebuilt for another attempt still matches its Content-Type
+
+            def stream() -> aio.MultipartWriter:  # A stream can only be sent once; see send
+                form = aio.MultipartWriter('form-data', boundary=boundary)
+                for name, value in fields.items():
+                    form.append(str(value)).set_content_disposition('form-data', name=name)
+
+                part = form.append(self.file_streamer(file, self.upload_chunk_size), {'Content-Type': 'application/octet-stream'})
+                part.set_content_disposition('form-data', name='file', filename=basename(file))
+                return form
+
+            data = stream
+            headers = {**(headers or {}), 'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+        url = self.make_url(end_point)
+
+        cached = cache_key = sent = None
+        if self.cache and method == 'get':
+            cache_key = self.cache.key(*self.request_key(method, url, params))
+            sent = CIMultiDict(self.session.headers)
+            sent.update(headers or {})
+            if (cached := await self.cache.get(cache_key)) and not cached.matches(sent):  # Another Vary variant
+                cached = None
+
+            if cached:
+                if cached.fresh:
+                    return {'request_id': request_id, 'response': self.cache.hit(cached)}
+
+                headers = {**cached.validators, **(headers or {})}
+
+        if self.compression and self.compression.compress_requests and method in ('patch', 'post', 'put'):
+            if json is not None:
+                body = rapidjson.dumps(json).encode('utf-8')
+            elif isinstance(data, (bytes, bytearray, str)):
+                body = data
+            else:  # Forms, streams & views are sent as-is
+                body = None
+
+            if body is not None and (compressed := self.compression.compress(body)):
+                headers = {**(headers or {}), 'Content-Encoding': self.compression.encoding}
+                if json is not None and 'Content-Type' not in self.session.headers:
+                    headers.setdefault('Content-Type', 'application/json')
+                data, json = compressed, None
+
+        async def send(started: Optional[Callable[[], None]] = None) -> Union[aio.ClientResponse, Response]:
+            return await self.send(method, url, data=data, json=json, params=params, headers=headers,
+                                   preload=self.preload if preload is None else preload, debug=debug, started=started)
+
+        async def fetch() -> Union[aio.ClientResponse, Response]:
+            if self.hedger and method in ('get', 'head'):
+                response = await self.hedger.run(url, send, lambda loser: loser.release())
+            else:
+                response = await send()
 
-        try:
-            base = self.cfg['URI']['Base']
-        except TypeError:
-            base = ''
+            if cache_key:
+                if response.status == 304 and cached:
+                    response = await self.cache.revalidate(cache_key, cached, response)
+                else:
+                    response = await self.cache.store(cache_key, response, sent)
 
-        async with self.sem:
-            if method == 'get':
-                response = await self.session.get(url=f'{base}{end_point}',
-                                                  ssl=self.ssl,
-                                                  proxy=self.proxy,
-                                                  proxy_auth=self.proxy_auth,
-                                                  params=params)
-            elif method == 'patch':
-                response = await self.session.patch(url=f'{base}{end_point}',
-                                                    ssl=self.ssl,
-                                                    proxy=self.proxy,
-                                                    proxy_auth=self.proxy_auth,
-                                                    data=data,
-                                                    json=json,
-                                                    params=params)
-            elif method == 'post':
-                response = await self.session.post(url=f'{base}{end_point}',
-                                                   ssl=self.ssl,
-                                                   proxy=self.proxy,
-                                                   proxy_auth=self.proxy_auth,
-                                                   data=data,
-                                                   json=json,
-                                                   params=params)
-            elif method == 'put':
-                response = await self.session.put(url=f'{base}{end_point}',
-                                                  ssl=self.ssl,
-                                                  proxy=self.proxy,
-                                                  proxy_auth=self.proxy_auth,
-                                                  data=data,
-                                                  json=json,
-                                                  params=params)
-            elif method == 'delete':
-                response = await self.session.delete(url=f'{base}{end_point}',
-                                                     ssl=self.ssl,
-                                                     proxy=self.proxy,
-                                                     proxy_auth=self.proxy_auth,
-                                                     data=data,
-                                                     json=json,
-                                                     params=params)
-            else:
-                logger.error(f'Request-Method: {method}, not currently handled.')
-                raise NotImplementedError
+            return response
 
-            if self.debug or debug:
-                print(await self.request_debug(response))
+        if self.coalesce and method == 'get':
+            key = (*self.request_key(method, url, params), tuple(sorted((headers or {}).items())))
 
-            try:
-                assert not response.status > 499
-            except AssertionError:
-                logger.error(self.request_debug(response))
-                raise aio.ClientError
+            if not (flight := self.inflight.get(key)):
+                async def shared() -> Response:
+                    response = await fetch()
+                    return response if isinstance(response, Response) else await Response.from_response(response)
+
+                self.inflight[key] = flight = asyncio.create_task(shared())
+                flight.add_done_callback(lambda _: self.inflight.pop(key, None))
+
+            response = await asyncio.shield(flight)
+        else:
+            response = await fetch()
+
+        return {'request_id': request_id, 'response': response}
+
+    @retry(retry=retry_allowed,
+           wait=wait_random_exponential(multiplier=1.25, min=3, max=60),
+           after=after_log(logger, logging.DEBUG),
+           stop=stop_after_attempt(5),
+           before_sleep=before_sleep_log(logger, logging.WARNING))
+    async def send(self, method: str, url: str,
+                   data: Optional[Union[dict, aio.FormData, Callable[[], Any]]] = None,
+                   json: Optional[dict] = None,
+                   params: Optional[Union[List[tuple], dict, 'MultiDict']] = None,
+                   headers: Optional[dict] = None,
+                   preload: bool = False,
+                   debug: Optional[bool] = False,
+                   started: Optional[Callable[[], None]] = None) -> Union[aio.ClientResponse, Response]:
+        """Send a request; rate limited, bounded by self.sem and retried on aio.ClientError (incl. 5xx)
+
+        Args:
+            method (str): A valid HTTP Verb
+            url (str):
+            data (Optional[Union[dct, aio.FormData, Callable[[], Any]]]): A callable is called for each attempt
+            json (Optional[dct]):
+            params (Optional[Union[List[tuple], dct, MultiDict]]):
+            headers (Optional[dct]):
+            preload (bool): See BaseApiClient.request
+            debug (Optional[bool]):
+            started (Optional[Callable[[], None]]): Called once a concurrency slot is acquired, as the request goes out
+
+        Raises:
+            NotImplementedError
+
+        Returns:
+            response (Union[aio.ClientResponse, Response])"""
+        rate_limited = 0
+
+        while True:
+            if self.rate_limiter:
+                await self.rate_limiter.acquire(url)
+
+            waited = perf_counter()
+            async with self.sem:
+                ts = perf_counter()
+                if self.metrics:
+                    self.metrics.observe(url, 'semaphore', ts - waited)
+
+                # Checked once a slot is held, so requests queued on the semaphore don't reach a host that failed meanwhile
+                if self.breakers:
+                    self.breakers.check(url)
+                if started:
+                    started()
+
+                # Single-use bodies (streams) are passed as a factory and built for each attempt
+                content = data() if callable(data) and not isinstance(data, aio.FormData) else data
+
+                try:
+                    if self.transport and self.transport.mode == 'replay':
+                        response = await self.transport.replay(method, url, params)
+                    elif method == 'get':
+                        response = await self.session.get(url=url,
+                                                          ssl=self.ssl,
+                                                          proxy=self.proxy,
+                                                          proxy_auth=self.proxy_auth,
+                                                          headers=headers,
+                                                          params=params)
+                    elif method == 'head':
+                        response = await self.session.head(url=url,
+                                                           ssl=self.ssl,
+                                                           proxy=self.proxy,
+                                                           proxy_auth=self.proxy_auth,
+                                                           headers=headers,
+                                                           params=params)
+                    elif method == 'patch':
+                        response = await self.session.patch(url=url,
+                                                            ssl=self.ssl,
+                                                            proxy=self.proxy,
+                                                            proxy_auth=self.proxy_auth,
+                                                            headers=headers,
+                                                            data=content,
+                                                            json=json,
+                                                            params=params)
+                    elif method == 'post':
+                        response = await self.session.post(url=url,
+                                                           ssl=self.ssl,
+                                                           proxy=self.proxy,
+                                                           proxy_auth=self.proxy_auth,
+                                                           headers=headers,
+                                                           data=content,
+                                                           json=json,
+                                                           params=params)
+                    elif method == 'put':
+                        response = await self.session.put(url=url,
+                                                          ssl=self.ssl,
+                                                          proxy=self.proxy,
+                                                          proxy_auth=self.proxy_auth,
+                                                          headers=headers,
+                                                          data=content,
+                                                          json=json,
+                                                          params=params)
+                    elif method == 'delete':
+                        response = await self.session.delete(url=url,
+                                                             ssl=self.ssl,
+                                                             proxy=self.proxy,
+                                                             proxy_auth=self.proxy_auth,
+                                                             headers=headers,
+                                                             data=content,
+                                                             json=json,
+                                                             params=params)
+                    else:
+                        logger.error(f'Request-Method: {method}, not currently handled.')
+                        raise NotImplementedError
+                except asyncio.TimeoutError as te:
+                    if isinstance(self.sem, AdaptiveSemaphore):
+                        self.sem.update(perf_counter() - ts, timeout=True)
+                    if self.breakers:
+                        self.breakers.failure(url)
+                    if self.recorder:
+                        self.recorder.record(method, url, elapsed=perf_counter() - ts, error=te)
+                    raise
+                except aio.ClientError as ce:
+                    if self.breakers:
+                        self.breakers.failure(url)
+                    if self.recorder:
+                        self.recorder.record(method, url, elapsed=perf_counter() - ts, error=ce)
+                    raise
+
+                if self.transport and self.transport.mode == 'record':
+                    response = await self.transport.record(method, url, params, response, perf_counter() - ts)
+
+                if self.breakers:
+                    if response.status > 499:
+                        self.breakers.failure(url)
+                    else:
+                        self.breakers.success(url)
+
+                if self.retry_budget and response.status < 500:
+                    self.retry_budget.deposit()
+
+                if isinstance(self.sem, AdaptiveSemaphore):
+                    self.sem.update(perf_counter() - ts, response.status)
+
+                if self.rate_limiter:
+                    self.rate_limiter.update(url, response.status, response.headers)
+
+                    if response.status == 429 and rate_limited < self.rate_limiter.retries:
+                        if self.recorder:
+                            self.recorder.record(method, url, response.status, perf_counter() - ts)
+                        rate_limited += 1
+                        response.release()
+                        continue
+
+                if self.debug or debug:
+                    print(await self.request_debug(response))
+
+                try:
+                    assert not response.status > 499
+                except AssertionError:
+                    if self.recorder:
+                        self.recorder.record(method, url, response.status, perf_counter() - ts, body=await response.read())
+                    logger.error(await self.request_debug(response))
+                    raise aio.ClientError
+
+                if preload:
+                    cpu, read = process_time(), perf_counter()
+                    body = await response.read()
+                    if self.metrics:
+                        self.metrics.observe(url, 'body', perf_counter() - read)
+                    if self.compression and 'Content-Encoding' in response.headers:
+                        self.compression.record_response(response.content_length, len(body), process_time() - cpu)
+                    payload = await self.decode_response(response)
+                    if isinstance(response, Response):  # Recorded or replayed
+                        response.payload, response.elapsed = payload, perf_counter() - ts
+                    else:
+                        response = await Response.from_response(response,
+                                                                body=body if self.cache else b'',
+                                                                headers=self.PRELOAD_HEADERS,
+                                                                payload=payload,
+                                                                elapsed=perf_counter() - ts,
+                                                                dropped=not self.cache)
+
+                if self.recorder:
+                    self.recorder.record(method, url, response.status, perf_counter() - ts, body=body if preload else None)
 
-            return {'request_id': request_id, 'response': response}
+                return response
 
 
 if __name__ == '__main__':
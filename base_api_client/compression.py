@@ -0,0 +1,236 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Compression
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import gzip
+import logging
+import zlib
+from dataclasses import dataclass, field
+from time import process_time
+from typing import Callable, Dict, List, Optional, Union
+
+try:
+    from aiohttp.compression_utils import HAS_BROTLI
+except ImportError:
+    HAS_BROTLI = False
+
+try:
+    from aiohttp.compression_utils import HAS_ZSTD
+except ImportError:
+    HAS_ZSTD = False
+
+logger = logging.getLogger(__name__)
+
+
+def compress_br(body: bytes, level: Optional[int] = None) -> bytes:
+    """Brotli; requires the optional brotli package (base-api-client[brotli])"""
+    try:
+        import brotli
+    except ImportError:
+        logger.error('Content-Encoding: br requires the brotli package; pip install base-api-client[brotli]')
+        raise NotImplementedError
+
+    return brotli.compress(body, quality=11 if level is None else level)
+
+
+def compress_zstd(body: bytes, level: Optional[int] = None) -> bytes:
+    """Zstandard; requires Python 3.14+, backports.zstd (base-api-client[zstd]) or the zstandard package"""
+    try:
+        from compression import zstd
+
+        return zstd.compress(body, level=level)
+    except ImportError:
+        pass
+
+    try:
+        from backports import zstd
+
+        return zstd.compress(body, level=level)
+    except ImportError:
+        pass
+
+    try:
+        import zstandard
+    except ImportError:
+        logger.error('Content-Encoding: zstd requires backports.zstd or zstandard; pip install base-api-client[zstd]')
+        raise NotImplementedError
+
+    return zstandard.ZstdCompressor(level=3 if level is None else level).compress(body)
+
+
+ENCODERS: Dict[str, Callable[[bytes, Optional[int]], bytes]] = {
+    'gzip':    lambda body, level: gzip.compress(body, compresslevel=6 if level is None else level),
+    'deflate': lambda body, level: zlib.compress(body, -1 if level is None else level),
+    'br':      compress_br,
+    'zstd':    compress_zstd}
+
+
+def accept_encoding() -> str:
+    """Content-Encodings the installed aiohttp can decode, best first
+
+    Returns:
+        (str): Accept-Encoding header value"""
+    encodings: List[str] = []
+    if HAS_ZSTD:
+        encodings.append('zstd')
+
+    if HAS_BROTLI:
+        encodings.append('br')
+
+    return ', '.join(encodings + ['gzip', 'deflate'])
+
+
+@dataclass
+class Compression:
+    """Request-Body Compression & Response Encoding Negotiation
+
+    Request bodies (json= or bytes/str data=) of at least `threshold` bytes are sent with Content-Encoding
+    `encoding` when `compress_requests`; only enable this for servers that accept compressed requests.
+    When `negotiate`, Accept-Encoding advertises what aiohttp can decode (zstd/br need their optional packages);
+    either can be used without the other. Compression ratio and CPU time are recorded in
+    stats; response figures are only available for bodies read by the client (preload)."""
+    encoding: str = 'gzip'
+    threshold: int = 1024
+    level: Optional[int] = None
+    accept: str = field(default_factory=accept_encoding)
+    compress_requests: bool = True
+    negotiate: bool = True
+    stats: Dict[str, Union[int, float]] = field(default_factory=lambda: {'requests':             0,
+                                                                         'compressed':           0,
+                                                                         'bytes_in':             0,
+                                                                         'bytes_out':            0,
+                                                                         'cpu_seconds':          0.0,
+                                                                         'responses':            0,
+                                                                         'response_bytes_wire':  0,
+                                                                         'response_bytes':       0,
+                                                                         'response_cpu_seconds': 0.0})
+
+    def __post_init__(self):
+        if self.encoding not in ENCODERS:
+            logger.error(f'Content-Encoding: {self.encoding}, not currently handled; use one of {list(ENCODERS)}')
+            raise NotImplementedError
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Optional['Compression']:
+        """
+        Args:
+            cfg (dict):
+
+        Returns:
+            compression (Optional[Compression]): None if not enabled"""
+        try:
+            cfg = cfg['Compression']
+        except (KeyError, TypeError):
+            return None
+
+        try:
+            if not cfg['Enabled']:
+                return None
+        except KeyError:
+            return None
+
+        try:
+            encoding = cfg['Encoding'].lower()
+        except (KeyError, AttributeError):
+            encoding = 'gzip'
+
+        try:
+            threshold = int(cfg['Threshold'])
+        except (KeyError, TypeError):
+            threshold = 1024
+
+        try:
+            level = int(cfg['Level'])
+            if level < 0:  # Encoder default
+                level = None
+        except (KeyError, TypeError):
+            level = None
+
+        try:
+            accept = cfg['Accept_Encoding'] or accept_encoding()
+        except KeyError:
+            accept = accept_encoding()
+
+        try:
+            compress_requests = bool(cfg['Compress_Requests'])
+        except KeyError:
+            compress_requests = True
+
+        try:
+            negotiate = bool(cfg['Negotiate_Responses'])
+        except KeyError:
+            negotiate = True
+
+        return cls(encoding=encoding, threshold=threshold, level=level, accept=accept, compress_requests=compress_requests,
+                   negotiate=negotiate)
+
+    @property
+    def ratio(self) -> Optional[float]:
+        """Request bytes on the wire / uncompressed bytes, over compressed bodies"""
+        return self.stats['bytes_out'] / self.stats['bytes_in'] if self.stats['bytes_in'] else None
+
+    @property
+    def response_ratio(self) -> Optional[float]:
+        """Response bytes on the wire / decoded bytes, over encoded bodies"""
+        return self.stats['response_bytes_wire'] / self.stats['response_bytes'] if self.stats['response_bytes'] else None
+
+    def compress(self, body: Union[bytes, str]) -> Optional[bytes]:
+        """
+        Args:
+            body (Union[bytes, str]):
+
+        Returns:
+            body (Optional[bytes]): Compressed body; None if below threshold or not smaller"""
+        self.stats['requests'] += 1
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
+        if len(body) < self.threshold:
+            return None
+
+        ts = process_time()
+        compressed = ENCODERS[self.encoding](body, self.level)
+        self.stats['cpu_seconds'] += process_time() - ts
+
+        if len(compressed) >= len(body):
+            return None
+
+        self.stats['compressed'] += 1
+        self.stats['bytes_in'] += len(body)
+        self.stats['bytes_out'] += len(compressed)
+
+        return compressed
+
+    def record_response(self, wire_bytes: Optional[int], body_bytes: int, cpu_seconds: float) -> None:
+        """Record an encoded response body read by the client
+
+        Args:
+            wire_bytes (Optional[int]): Content-Length; unknown for chunked responses
+            body_bytes (int): Decoded length
+            cpu_seconds (float): Process time spent reading (and decompressing) the body"""
+        if wire_bytes is None:
+            return
+
+        self.stats['responses'] += 1
+        self.stats['response_bytes_wire'] += wire_bytes
+        self.stats['response_bytes'] += body_bytes
+        self.stats['response_cpu_seconds'] += cpu_seconds
+
+
+if __name__ == '__main__':
+    print(__doc__)
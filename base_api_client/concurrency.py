@@ -0,0 +1,144 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Concurrency
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import logging
+from collections import deque
+from time import monotonic
+from typing import Deque, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveSemaphore(object):
+    """Adaptive Semaphore
+
+    Drop-in replacement for asyncio.Semaphore whose limit is tuned at runtime (AIMD).
+        - Additive increase: the limit grows by ~1 per round-trip while responses are healthy.
+        - Multiplicative decrease: the limit is multiplied by backoff (at most once per round-trip) on
+          429/503, timeouts, or when short-term latency exceeds tolerance x the long-term latency (gradient).
+
+    Args:
+        initial (int): Starting limit
+        minimum (int): Lower bound of the limit
+        maximum (int): Upper bound of the limit
+        backoff (float): Multiplicative decrease factor
+        tolerance (float): Short-term latency, as a multiple of long-term latency, treated as congestion
+        window (int): Number of samples the long-term latency is averaged over"""
+
+    def __init__(self, initial: int = 15,
+                 minimum: int = 1,
+                 maximum: int = 100,
+                 backoff: float = 0.75,
+                 tolerance: float = 2.0,
+                 window: int = 100):
+        self.minimum: int = max(1, minimum)
+        self.maximum: int = max(self.minimum, maximum)
+        self.backoff: float = backoff
+        self.tolerance: float = tolerance
+        self._limit: float = float(min(max(initial, self.minimum), self.maximum))
+        self._in_flight: int = 0
+        self._alpha: float = 2 / (window + 1)
+        self._latency_long: Optional[float] = None
+        self._latency_short: Optional[float] = None
+        self._last_decrease: float = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Long-term average latency (seconds)"""
+        return self._latency_long
+
+    def locked(self) -> bool:
+        return self._in_flight >= self.limit
+
+    async def acquire(self) -> bool:
+        while self.locked():
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut in self._waiters:
+                    self._waiters.remove(fut)
+                elif fut.done() and not fut.cancelled():  # Pass the wake-up on
+                    self._wake()
+                raise
+
+        self._in_flight += 1
+
+        return True
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        free = self.limit - self._in_flight
+        while free > 0 and self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(True)
+                free -= 1
+
+    def update(self, latency: float, status: Optional[int] = None, timeout: bool = False) -> None:
+        """Feed the outcome of a request back to the limiter
+
+        Args:
+            latency (float): Seconds
+            status (Optional[int]): HTTP Status
+            timeout (bool): Request timed out"""
+        overload = timeout or status in (429, 503)
+
+        if not overload:
+            if self._latency_long is None:
+                self._latency_long = self._latency_short = latency
+            else:
+                self._latency_long += self._alpha * (latency - self._latency_long)
+                self._latency_short += 0.2 * (latency - self._latency_short)
+
+        congested = overload or self._latency_short > self._latency_long * self.tolerance
+        if congested:
+            now = monotonic()
+            if now - self._last_decrease >= latency:
+                self._last_decrease = now
+                self._limit = max(float(self.minimum), self._limit * self.backoff)
+                logger.debug(f'Concurrency limit decreased to {self.limit}')
+        else:
+            self._limit = min(float(self.maximum), self._limit + 1 / self._limit)
+            self._wake()
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Decoders
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import csv
+import logging
+from io import StringIO
+from typing import Awaitable, Callable, Dict, Optional, Union
+
+import aiohttp as aio
+import rapidjson
+
+from .models import Response
+from .streaming import iter_ndjson
+
+logger = logging.getLogger(__name__)
+
+Decoder = Callable[[Union[aio.ClientResponse, Response]], Awaitable[Union[dict, list]]]
+
+
+async def decode_jwt(response: Union[aio.ClientResponse, Response]) -> dict:
+    return {'token': await response.text(encoding='utf-8'), 'token_type': 'Bearer'}
+
+
+async def decode_json(response: Union[aio.ClientResponse, Response]) -> Union[dict, list]:
+    return await response.json(encoding='utf-8', loads=rapidjson.loads, content_type=None)
+
+
+async def decode_text_plain(response: Union[aio.ClientResponse, Response]) -> dict:
+    return {'text_plain': await response.text(encoding='utf-8')}
+
+
+async def decode_text_html(response: Union[aio.ClientResponse, Response]) -> dict:
+    return {'text_html': await response.text(encoding='utf-8')}
+
+
+async def decode_ndjson(response: Union[aio.ClientResponse, Response]) -> list:
+    """Newline delimited JSON; read line by line as the body streams in"""
+    if isinstance(response, Response):
+        return [rapidjson.loads(line) for line in response.body.splitlines() if line.strip()]
+
+    return [rec async for rec in iter_ndjson(response.content.iter_chunked(64 * 1024))]
+
+
+async def decode_csv(response: Union[aio.ClientResponse, Response]) -> list:
+    """CSV with a header row; one dict per row"""
+    return list(csv.DictReader(StringIO(await response.text(encoding='utf-8'), newline='')))
+
+
+async def decode_msgpack(response: Union[aio.ClientResponse, Response]) -> Union[dict, list]:
+    """MessagePack; requires the optional msgpack package"""
+    try:
+        import msgpack
+    except ImportError:
+        logger.error('Content-Type: application/msgpack requires the msgpack package; pip install msgpack')
+        raise NotImplementedError
+
+    return msgpack.unpackb(await response.read(), raw=False)
+
+
+DECODERS: Dict[str, Decoder] = {'application/jwt':        decode_jwt,
+                                'application/json':       decode_json,
+                                'application/javascript': decode_json,
+                                'text/javascript':        decode_json,
+                                'text/plain':             decode_text_plain,
+                                'text/html':              decode_text_html,
+                                'application/x-ndjson':   decode_ndjson,
+                                'application/ndjson':     decode_ndjson,
+                                'application/jsonl':      decode_ndjson,
+                                'text/csv':               decode_csv,
+                                'application/msgpack':    decode_msgpack,
+                                'application/x-msgpack':  decode_msgpack}
+
+
+def find_decoder(decoders: Dict[str, Decoder], content_type: str) -> Optional[Decoder]:
+    """Find the decoder for a Content-Type
+
+    Matches the media type exactly, then by prefix (e.g. application/json-seq), then +json suffixes.
+
+    Args:
+        decoders (Dict[str, Decoder]):
+        content_type (str): e.g. application/json; charset=utf-8
+
+    Returns:
+        decoder (Optional[Decoder])"""
+    media_type = content_type.split(';', 1)[0].strip().lower()
+
+    if decoder := decoders.get(media_type):
+        return decoder
+
+    for k, decoder in decoders.items():
+        if media_type.startswith(k):
+            return decoder
+
+    if media_type.endswith('+json'):
+        return decoders.get('application/json')
+
+    return None
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Request Hedging
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import logging
+from collections import deque
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyWindow(object):
+    """The most recent `size` latencies of an endpoint
+
+    Args:
+        size (int):"""
+
+    def __init__(self, size: int = 200):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def add(self, latency: float) -> None:
+        self.samples.append(latency)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Args:
+            p (float): 0-100
+
+        Returns:
+            latency (Optional[float]): Nearest-rank percentile; None without samples"""
+        if not self.samples:
+            return None
+
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+class Hedger(object):
+    """Request Hedging
+
+    When a request to an endpoint (host + path) hasn't completed within the `percentile` latency recently observed
+    for it, a duplicate is sent and whichever completes first is used; the other is cancelled. Latency is measured
+    from when the request acquires its concurrency slot, so time spent queued (rate limit, semaphore) neither
+    triggers a hedge nor skews the percentile. Hedges are capped
+    at `max_ratio` of requests so hedging can't amplify an overload. Only use for idempotent requests.
+
+    Args:
+        percentile (float): Hedge after this percentile of the endpoint's latency
+        max_ratio (float): Hedges allowed per request
+        min_samples (int): Latencies required before an endpoint is hedged
+        window (int): Latencies kept per endpoint"""
+
+    def __init__(self, percentile: float = 95.0, max_ratio: float = 0.1, min_samples: int = 20, window: int = 200):
+        self.percentile: float = percentile
+        self.max_ratio: float = max_ratio
+        self.min_samples: int = min_samples
+        self.window: int = window
+        self.latencies: Dict[str, LatencyWindow] = {}
+        self.stats: Dict[str, int] = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'capped': 0}
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Optional['Hedger']:
+        """
+        Args:
+            cfg (dict):
+
+        Returns:
+            hedger (Optional[Hedger]): None if not enabled"""
+        try:
+            cfg = cfg['Hedging']
+        except (KeyError, TypeError):
+            return None
+
+        try:
+            if not cfg['Enabled']:
+                return None
+        except KeyError:
+            return None
+
+        try:
+            percentile = float(cfg['Percentile'])
+        except (KeyError, TypeError):
+            percentile = 95.0
+
+        try:
+            max_ratio = float(cfg['Max_Ratio'])
+        except (KeyError, TypeError):
+            max_ratio = 0.1
+
+        try:
+            min_samples = int(cfg['Min_Samples'])
+        except (KeyError, TypeError):
+            min_samples = 20
+
+        try:
+            window = int(cfg['Window'])
+        except (KeyError, TypeError):
+            window = 200
+
+        return cls(percentile=percentile, max_ratio=max_ratio, min_samples=min_samples, window=window)
+
+    def window_for(self, url: str) -> LatencyWindow:
+        parts = urlsplit(url)
+        key = f'{parts.netloc}{parts.path}'
+        try:
+            return self.latencies[key]
+        except KeyError:
+            self.latencies[key] = window = LatencyWindow(self.window)
+            return window
+
+    def delay(self, url: str) -> Optional[float]:
+        """
+        Args:
+            url (str):
+
+        Returns:
+            delay (Optional[float]): Seconds to wait before hedging; None until enough latencies are known"""
+        window = self.window_for(url)
+        return window.percentile(self.percentile) if len(window) >= self.min_samples else None
+
+    async def run(self, url: str,
+                  send: Callable[[Callable[[], None]], Awaitable[Any]],
+                  release: Callable[[Any], None]) -> Any:
+        """Await send(started), hedging it with a second send(started) if it's slow
+
+        Args:
+            url (str):
+            send (Callable[[Callable[[], None]], Awaitable[Any]]): Issues the request, calling started() as it goes
+                out (once its concurrency slot is acquired; again on each retry); called at most twice
+            release (Callable[[Any], None]): Disposes of a result that lost the race
+
+        Returns:
+            result (Any)"""
+        self.stats['requests'] += 1
+        window = self.window_for(url)
+
+        async def timed(sent: Optional[asyncio.Event] = None) -> Any:
+            ts = None
+
+            def started() -> None:
+                nonlocal ts
+                ts = perf_counter()
+                if sent:
+                    sent.set()
+
+            result = await send(started)
+            if ts is not None:
+                window.add(perf_counter() - ts)
+            return result
+
+        sent = asyncio.Event()
+        primary = asyncio.ensure_future(timed(sent))
+        if (delay := self.delay(url)) is None:
+            return await primary
+
+        waiter = asyncio.ensure_future(sent.wait())
+        try:
+            await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)  # Still queued; not hedged
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        finally:
+            waiter.cancel()
+
+        if done:
+            return primary.result()
+
+        if self.stats['hedged'] >= self.max_ratio * self.stats['requests']:
+            self.stats['capped'] += 1
+            return await primary
+
+        self.stats['hedged'] += 1
+        hedge = asyncio.ensure_future(timed())
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        for other in done - {task}:  # Finished together
+                            if other.exception() is None:
+                                release(other.result())
+                        if task is hedge:
+                            self.stats['hedge_wins'] += 1
+                        return task.result()
+
+            return primary.result()  # Both failed; raise the primary's error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Metrics
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import logging
+from bisect import bisect_left
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp as aio
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS: Tuple[float, ...] = tuple(round(0.0005 * 2 ** (k / 2), 6) for k in range(36))  # 0.5ms - ~93s
+PHASES: Tuple[str, ...] = ('semaphore', 'pool', 'dns', 'connect', 'ttfb', 'request', 'body', 'decode')
+
+
+class Histogram(object):
+    """Cumulative-bucket latency histogram
+
+    Args:
+        buckets (Iterable[float]): Upper bounds in seconds"""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.bounds: Tuple[float, ...] = tuple(sorted(buckets))
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)  # Last is +Inf
+        self.count: int = 0
+        self.sum: float = 0.0
+        self.max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Interpolated within the bucket holding the rank
+
+        Args:
+            p (float): 0-100
+
+        Returns:
+            seconds (Optional[float]): None without observations"""
+        if not self.count:
+            return None
+
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+                return lower + (upper - lower) * max(0.0, rank - seen) / n
+            seen += n
+
+        return self.max
+
+
+class Metrics(object):
+    """Request Timing
+
+    Per-endpoint (host + path) histograms of, in seconds:
+        semaphore: waiting for the client's concurrency limit
+        pool:      waiting for a free connection (Connection.Limit / Limit_Per_Host)
+        dns:       resolving the host (cache misses only)
+        connect:   establishing a new connection, including the TLS handshake
+        ttfb:      request headers sent to response headers received
+        request:   request start to response headers received, including redirects
+        body:      reading the body (preload)
+        decode:    decoding the body (including the read unless preloaded)
+    plus per-endpoint retry counts. Connection phases come from aiohttp's TraceConfig signals; see trace_config().
+
+    Args:
+        buckets (Iterable[float]): Histogram upper bounds in seconds"""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.retries: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Optional['Metrics']:
+        """
+        Args:
+            cfg (dict):
+
+        Returns:
+            metrics (Optional[Metrics]): None if not enabled"""
+        try:
+            cfg = cfg['Metrics']
+        except (KeyError, TypeError):
+            return None
+
+        try:
+            if not cfg['Enabled']:
+                return None
+        except KeyError:
+            return None
+
+        try:
+            buckets = [float(b) for b in cfg['Buckets']] or DEFAULT_BUCKETS
+        except (KeyError, TypeError):
+            buckets = DEFAULT_BUCKETS
+
+        return cls(buckets=buckets)
+
+    @staticmethod
+    def endpoint(url: str) -> str:
+        parts = urlsplit(str(url))
+        return f'{parts.netloc}{parts.path}'
+
+    def observe(self, url: str, phase: str, seconds: float) -> None:
+        """
+        Args:
+            url (str):
+            phase (str): One of PHASES
+            seconds (float):"""
+        key = (self.endpoint(url), phase)
+        try:
+            histogram = self.histograms[key]
+        except KeyError:
+            self.histograms[key] = histogram = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def retry(self, url: str) -> None:
+        endpoint = self.endpoint(url)
+        self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def trace_config(self) -> aio.TraceConfig:
+        """
+        Returns:
+            trace_config (aio.TraceConfig): Records pool, dns, connect, ttfb & request; pass to aio.ClientSession"""
+
+        def started(name: str):
+            async def on_start(session: aio.ClientSession, ctx: SimpleNamespace, params) -> None:
+                setattr(ctx, name, perf_counter())
+
+            return on_start
+
+        def ended(name: str, phase: str):
+            async def on_end(session: aio.ClientSession, ctx: SimpleNamespace, params) -> None:
+                if (ts := getattr(ctx, name, None)) is not None and hasattr(ctx, 'url'):
+                    self.observe(ctx.url, phase, perf_counter() - ts)
+
+            return on_end
+
+        async def on_request_start(session: aio.ClientSession, ctx: SimpleNamespace, params: aio.TraceRequestStartParams):
+            ctx.url = str(params.url)
+            ctx.request_ts = perf_counter()
+
+        async def on_request_end(session: aio.ClientSession, ctx: SimpleNamespace, params: aio.TraceRequestEndParams):
+            now = perf_counter()
+            self.observe(ctx.url, 'ttfb', now - getattr(ctx, 'headers_ts', ctx.request_ts))
+            self.observe(ctx.url, 'request', now - ctx.request_ts)
+
+        trace_config = aio.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_headers_sent.append(started('headers_ts'))
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_connection_queued_start.append(started('pool_ts'))
+        trace_config.on_connection_queued_end.append(ended('pool_ts', 'pool'))
+        trace_config.on_dns_resolvehost_start.append(started('dns_ts'))
+        trace_config.on_dns_resolvehost_end.append(ended('dns_ts', 'dns'))
+        trace_config.on_connection_create_start.append(started('connect_ts'))
+        trace_config.on_connection_create_end.append(ended('connect_ts', 'connect'))
+
+        return trace_config
+
+    def summary(self, percentiles: Tuple[float, ...] = (50, 95, 99)) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Args:
+            percentiles (Tuple[float, ...]):
+
+        Returns:
+            summary (Dict[str, Dict[str, Dict[str, float]]]):
+                {endpoint: {phase: {'count', 'sum', 'max', 'p50', 'p95', 'p99'}, 'retries': {'count'}}}"""
+        summary: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (endpoint, phase), histogram in sorted(self.histograms.items()):
+            summary.setdefault(endpoint, {})[phase] = {'count': histogram.count,
+                                                       'sum':   histogram.sum,
+                                                       'max':   histogram.max,
+                                                       **{f'p{p:g}': histogram.percentile(p) for p in percentiles}}
+
+        for endpoint, count in self.retries.items():
+            summary.setdefault(endpoint, {})['retries'] = {'count': count}
+
+        return summary
+
+    def openmetrics(self, prefix: str = 'base_api_client') -> str:
+        """Export in OpenMetrics text format
+
+        Args:
+            prefix (str): Metric family prefix
+
+        Returns:
+            (str)"""
+
+        def label(value: str) -> str:
+            return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+        name = f'{prefix}_phase_seconds'
+        lines = [f'# TYPE {name} histogram', f'# UNIT {name} seconds', f'# HELP {name} Request phase durations.']
+        for (endpoint, phase), histogram in sorted(self.histograms.items()):
+            labels = f'endpoint="{label(endpoint)}",phase="{phase}"'
+            cumulative = 0
+            for bound, n in zip(self.buckets, histogram.counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.sum:g}')
+
+        name = f'{prefix}_retries'
+        lines += [f'# TYPE {name} counter', f'# HELP {name} Retried requests.']
+        for endpoint, count in sorted(self.retries.items()):
+            lines.append(f'{name}_total{{endpoint="{label(endpoint)}"}} {count}')
+
+        lines.append('# EOF')
+
+        return '\n'.join(lines) + '\n'
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -17,5 +17,7 @@
 
 You should have received a copy of the SSPL along with this program.
 If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+from .pagination import Pagination
 from .record import Record, sort_dict
-from .results import Results
+from .response import Response
+from .results import ColumnarResults, CompactResults, Results
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Models.Pagination
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Pagination:
+    """Pagination Strategy
+
+    Attributes:
+        strategy (str): offset | cursor | link
+        limit (int): Records per page
+        limit_param (str): Query parameter holding the page size
+        offset_param (str): Query parameter holding the record offset (offset)
+        total_key (Optional[str]): Response key holding the total record count (offset)
+            When present, all remaining pages are requested concurrently after the first.
+        prefetch (int): Pages kept in flight when the total is unknown (offset)
+        cursor_param (str): Query parameter holding the cursor (cursor)
+        cursor_key (str): Response key holding the next cursor (cursor)
+        max_pages (Optional[int]): Stop after this many pages"""
+    strategy: str = 'offset'
+    limit: int = 100
+    limit_param: str = 'limit'
+    offset_param: str = 'offset'
+    total_key: Optional[str] = None
+    prefetch: int = 4
+    cursor_param: str = 'cursor'
+    cursor_key: str = 'next'
+    max_pages: Optional[int] = None
+
+    def __post_init__(self):
+        self.strategy = self.strategy.lower()
+
+        if self.strategy not in ('offset', 'cursor', 'link'):
+            logger.error(f'Pagination-Strategy: {self.strategy}, not currently handled.')
+            raise NotImplementedError
+
+    @staticmethod
+    def lookup(response: Union[dict, list], key: Optional[str]) -> Any:
+        """Lookup a (dot separated) key in a decoded response
+
+        Args:
+            response (Union[dict, list]):
+            key (Optional[str]): e.g. meta.next_cursor
+
+        Returns:
+            value (Any): None if not found"""
+        if not key:
+            return None
+
+        value = response
+        for k in key.split('.'):
+            try:
+                value = value[k]
+            except (KeyError, TypeError, IndexError):
+                return None
+
+        return value
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Models.Response
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import json
+import logging
+import re
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Tuple, Union
+
+import aiohttp as aio
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+logger = logging.getLogger(__name__)
+
+CHARSET_RE = re.compile(r'charset="?([^";\s]+)', re.IGNORECASE)
+LINK_RE = re.compile(r'<([^>]*)>\s*((?:;\s*[^;,]+)*)')
+
+
+class BodyReader(object):
+    """An in-memory body read like aio.ClientResponse.content (aio.StreamReader)
+
+    Args:
+        body (bytes):"""
+    __slots__ = ('body', 'position')
+
+    def __init__(self, body: bytes):
+        self.body: bytes = body
+        self.position: int = 0
+
+    def at_eof(self) -> bool:
+        return self.position >= len(self.body)
+
+    async def read(self, n: int = -1) -> bytes:
+        end = len(self.body) if n < 0 else self.position + n
+        chunk, self.position = self.body[self.position:end], min(end, len(self.body))
+
+        return chunk
+
+    async def readany(self) -> bytes:
+        return await self.read()
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        while chunk := await self.read(n):
+            yield chunk
+
+    async def iter_any(self) -> AsyncIterator[bytes]:
+        while chunk := await self.read():
+            yield chunk
+
+
+class Response(object):
+    """Response
+
+    A fully read, connection-free stand-in for aio.ClientResponse; supports the subset used by
+    BaseApiClient (status, headers, content_length, content, read, text, json, links, raise_for_status,
+    release). When preloaded, `payload` holds the decoded body and `elapsed` the seconds from send to decoded.
+    A preloaded body not kept for the cache is `dropped`; only payload/json() are valid then, and read(),
+    text() and content raise RuntimeError instead of returning an empty body."""
+    __slots__ = ('method', 'url', 'status', 'reason', 'headers', 'version', 'body', 'payload', 'elapsed', 'dropped',
+                 '_content')
+
+    def __init__(self, method: str,
+                 url: Union[str, URL],
+                 status: int,
+                 headers: Union[CIMultiDictProxy, Iterable[Tuple[str, str]]],
+                 body: bytes,
+                 reason: Optional[str] = None,
+                 version: aio.HttpVersion = aio.HttpVersion11,
+                 payload: Any = None,
+                 elapsed: Optional[float] = None,
+                 dropped: bool = False):
+        self.method: str = method.upper()
+        self.url: URL = URL(url)
+        self.status: int = status
+        self.reason: Optional[str] = reason
+        self.headers: CIMultiDictProxy = headers if isinstance(headers, CIMultiDictProxy) \
+            else CIMultiDictProxy(CIMultiDict(headers))
+        self.version: aio.HttpVersion = version
+        self.body: bytes = body
+        self.payload: Any = payload
+        self.elapsed: Optional[float] = elapsed
+        self.dropped: bool = dropped
+        self._content: Optional[BodyReader] = None
+
+    def __repr__(self) -> str:
+        return f'<Response({self.url}) [{self.status} {self.reason}]>'
+
+    @classmethod
+    async def from_response(cls, response: Union[aio.ClientResponse, 'Response'],
+                            body: Optional[bytes] = None,
+                            headers: Optional[Iterable[str]] = None,
+                            payload: Any = None,
+                            elapsed: Optional[float] = None,
+                            dropped: bool = False) -> 'Response':
+        """Read an aio.ClientResponse, releasing its connection
+
+        Args:
+            response (Union[aio.ClientResponse, Response]): Returned as is if already a Response
+            body (Optional[bytes]): Already read body
+            headers (Optional[Iterable[str]]): Header names to keep (case-insensitive); Default: all
+            payload (Any): Decoded body
+            elapsed (Optional[float]):
+            dropped (bool): `body` was discarded once decoded into `payload`
+
+        Returns:
+            response (Response)"""
+        if isinstance(response, Response):
+            return response
+
+        if body is None:
+            body = await response.read()
+
+        response.release()
+
+        hdrs = response.headers
+        if headers is not None:
+            keep = {h.lower() for h in headers}
+            hdrs = [(k, v) for k, v in hdrs.items() if k.lower() in keep or k.lower().startswith(('x-ratelimit', 'ratelimit'))]
+
+        return cls(method=response.method,
+                   url=response.url,
+                   status=response.status,
+                   headers=hdrs,
+                   body=body,
+                   reason=response.reason,
+                   version=response.version,
+                   payload=payload,
+                   elapsed=elapsed,
+                   dropped=dropped)
+
+    def get_encoding(self) -> str:
+        if charset := CHARSET_RE.search(self.headers.get('Content-Type', '')):
+            return charset.group(1)
+
+        return 'utf-8'
+
+    @property
+    def content_length(self) -> Optional[int]:
+        """Content-Length header (the size on the wire), as aio.ClientResponse.content_length"""
+        try:
+            return int(self.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return None
+
+    @property
+    def content(self) -> BodyReader:
+        """The body as a stream; see BodyReader"""
+        if self._content is None:
+            self._content = BodyReader(self.read_body())
+
+        return self._content
+
+    @property
+    def links(self) -> Dict[str, Dict[str, Any]]:
+        """RFC 5988 Link header; {rel: {'url': URL, 'rel': rel, ...}}"""
+        links = {}
+        for value in self.headers.getall('Link', []):
+            for url, params in LINK_RE.findall(value):
+                link = {k.strip(): v.strip().strip('"') for k, _, v in (p.partition('=') for p in params.split(';')) if k}
+                link['url'] = self.url.join(URL(url))
+                links[link.get('rel', str(link['url']))] = link
+
+        return links
+
+    def read_body(self) -> bytes:
+        """
+        Raises:
+            RuntimeError: The body was dropped after preload
+
+        Returns:
+            body (bytes)"""
+        if self.dropped:
+            raise RuntimeError(f'{self!r}: body dropped after preload; use .payload or .json()')
+
+        return self.body
+
+    async def read(self) -> bytes:
+        return self.read_body()
+
+    async def text(self, encoding: Optional[str] = None, errors: str = 'strict') -> str:
+        return self.read_body().decode(encoding or self.get_encoding(), errors)
+
+    async def json(self, *, encoding: Optional[str] = None,
+                   loads: Callable[[str], Any] = json.loads,
+                   content_type: Optional[str] = 'application/json') -> Any:
+        """Content-Type is not enforced; content_type is accepted for aio.ClientResponse compatibility."""
+        if self.payload is not None and not self.body:
+            return self.payload
+
+        if not self.body.strip():
+            return None
+
+        return loads(await self.text(encoding=encoding))
+
+    def raise_for_status(self) -> None:
+        """As aio.ClientResponse.raise_for_status
+
+        Raises:
+            aio.ClientResponseError: status >= 400"""
+        if self.status >= 400:
+            raise aio.ClientResponseError(aio.RequestInfo(self.url, self.method, CIMultiDictProxy(CIMultiDict()), self.url),
+                                          (),
+                                          status=self.status,
+                                          message=self.reason or '',
+                                          headers=self.headers)
+
+    def release(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -18,8 +18,10 @@
 You should have received a copy of the SSPL along with this program.
 If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
 import logging
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import List
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -49,5 +51,166 @@ def cleanup(self, sort_order: str = 'asc', keep_request_id: bool = False):
         del success
 
 
+@dataclass
+class CompactResults:
+    """Results from aio.ClientRequest(s); compact storage
+
+    Records are stored as decoded (un-copied); request_id is tracked out-of-band as one entry per batch
+    (start offset) rather than per record. `success` builds the familiar list of dicts (with request_id)
+    on demand; iterate the results to get (request_id, record) pairs without copying."""
+    data: List[dict] = field(default_factory=list)
+    failure: List[dict] = field(default_factory=list)
+    offsets: List[int] = field(default_factory=list)
+    request_ids: List[str] = field(default_factory=list)
+    records: List[dict] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[Tuple[Optional[str], dict]]:
+        bounds = self.offsets[1:] + [len(self)]
+        if not self.request_ids:
+            yield from ((None, self.record(i)) for i in range(len(self)))
+            return
+
+        for rid, start, end in zip(self.request_ids, self.offsets, bounds):
+            for i in range(start, end):
+                yield rid, self.record(i)
+
+    def add(self, records: List[dict], request_id: str) -> None:
+        """Add a batch of records sharing a request_id
+
+        Args:
+            records (List[dict]):
+            request_id (str):"""
+        if not records:
+            return
+
+        if not self.request_ids or self.request_ids[-1] != request_id:
+            self.offsets.append(len(self))
+            self.request_ids.append(request_id)
+
+        self._extend(records)
+
+    def _extend(self, records: List[dict]) -> None:
+        self.records.extend(records)
+
+    def record(self, index: int) -> dict:
+        return self.records[index]
+
+    def request_id(self, index: int) -> Optional[str]:
+        if not self.request_ids:
+            return None
+
+        return self.request_ids[bisect_right(self.offsets, index) - 1]
+
+    @property
+    def success(self) -> List[dict]:
+        """Dict view; copies each record to add request_id"""
+        return [{**rec, 'request_id': rid} if rid else rec for rid, rec in self]
+
+    @property
+    def dict(self) -> dict:
+        return {'success': self.success, 'failure': self.failure}
+
+    def cleanup(self, sort_order: str = 'asc', keep_request_id: bool = False):
+        """Remove empty (None) keys and sort the keys of each record, in place"""
+        if not keep_request_id:
+            self.offsets, self.request_ids = [], []
+
+        reverse = True if sort_order.lower() == 'desc' else False
+        self.records = [dict(sorted({k: v for k, v in rec.items() if v is not None}.items(), reverse=reverse))
+                        for rec in self.records]
+
+    def sort(self, key: Optional[Union[str, Callable[[dict], Any]]] = None, reverse: bool = False) -> None:
+        """Sort records by a field (or key function), keeping their request_ids
+
+        Args:
+            key (Optional[Union[str, Callable[[dict], Any]]]):
+            reverse (bool):"""
+        get = (lambda i: self.record(i)[key]) if isinstance(key, str) else \
+            (lambda i: key(self.record(i))) if key else self.record
+        order = sorted(range(len(self)), key=get, reverse=reverse)
+        rids = [self.request_id(i) for i in order] if self.request_ids else []
+
+        self._reorder(order)
+        self.offsets, self.request_ids = [], []
+        for i, rid in enumerate(rids):
+            if not self.request_ids or self.request_ids[-1] != rid:
+                self.offsets.append(i)
+                self.request_ids.append(rid)
+
+    def _reorder(self, order: List[int]) -> None:
+        self.records = [self.records[i] for i in order]
+
+
+PACKED: Dict[str, type] = {'q': int, 'd': float}  # array typecode -> the only type stored in it
+
+
+@dataclass
+class ColumnarResults(CompactResults):
+    """Results from aio.ClientRequest(s); columnar storage
+
+    For homogeneous records; each key is stored as a column. int and float columns are packed into
+    array.array (8 bytes/value); a column falls back to a list when a value is not of exactly that type
+    (e.g. None, str, bool, an int in a float column) or does not fit (ints beyond 64 bits).
+    Keys first seen part-way through are back-filled with None."""
+    columns: Dict[str, Union[array, list]] = field(default_factory=dict)
+    length: int = 0
+    drop_none: bool = False
+
+    def __len__(self) -> int:
+        return self.length
+
+    def _extend(self, records: List[dict]) -> None:
+        for rec in records:
+            for k, v in rec.items():
+                if (col := self.columns.get(k)) is None:
+                    if type(v) is int and -2 ** 63 <= v < 2 ** 63 and not self.length:
+                        col = array('q')
+                    elif type(v) is float and not self.length:
+                        col = array('d')
+                    else:
+                        col = [None] * self.length
+                    self.columns[k] = col
+
+                if type(col) is array and type(v) is not PACKED[col.typecode]:  # e.g. bool, or int in a float column
+                    self.columns[k] = col = list(col)
+
+                try:
+                    col.append(v)
+                except OverflowError:
+                    self.columns[k] = col = list(col)
+                    col.append(v)
+
+            self.length += 1
+            for k, col in self.columns.items():
+                if len(col) < self.length:
+                    try:
+                        col.append(None)
+                    except TypeError:
+                        self.columns[k] = col = list(col)
+                        col.append(None)
+
+    def record(self, index: int) -> dict:
+        if self.drop_none:
+            return {k: v for k, col in self.columns.items() if (v := col[index]) is not None}
+
+        return {k: col[index] for k, col in self.columns.items()}
+
+    def cleanup(self, sort_order: str = 'asc', keep_request_id: bool = False):
+        """Drop empty (None) values from the dict view and sort the keys"""
+        if not keep_request_id:
+            self.offsets, self.request_ids = [], []
+
+        self.drop_none = True
+        self.columns = dict(sorted(self.columns.items(), reverse=True if sort_order.lower() == 'desc' else False))
+
+    def _reorder(self, order: List[int]) -> None:
+        for k, col in self.columns.items():
+            self.columns[k] = array(col.typecode, (col[i] for i in order)) if isinstance(col, array) \
+                else [col[i] for i in order]
+
+
 if __name__ == '__main__':
     print(__doc__)
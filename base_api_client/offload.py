@@ -0,0 +1,194 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Offload
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, List, Optional, Union
+
+import rapidjson
+
+from .streaming import loads_document
+
+logger = logging.getLogger(__name__)
+
+
+def cleanup_records(records: List[dict]) -> List[dict]:
+    """Remove empty (None) keys and sort the keys of each record
+
+    Args:
+        records (List[dict]):
+
+    Returns:
+        records (List[dict])"""
+    return [dict(sorted({k: v for k, v in rec.items() if v is not None}.items())) for rec in records]
+
+
+class Offload(object):
+    """Offload
+
+    Moves CPU-bound work on large bodies off the event loop so it keeps servicing network I/O.
+
+    JSON bodies of at least `threshold` bytes are decoded in a pool:
+        thread:  Decoded one record at a time (see streaming.loads_document). rapidjson holds the GIL for a whole
+                 document, so a thread only helps if it yields between records; costs ~1.5x the CPU of a single
+                 loads() but the loop stalls for at most one record (plus GC) instead of the whole body.
+        process: rapidjson.loads in a spawned worker. Takes the parse off this core, but unpickling the result
+                 costs about as much as parsing it and holds the GIL; only worth it with spare cores.
+
+    Cleanup (None key removal, key sorting) of at least `records` records always runs in a thread.
+
+    Args:
+        threshold (int): Bytes
+        records (int): Records
+        executor (str): thread | process
+        workers (Optional[int]): Pool size; None for the executor's default"""
+
+    def __init__(self, threshold: int = 1024 * 1024,
+                 records: int = 10000,
+                 executor: str = 'thread',
+                 workers: Optional[int] = None):
+        if executor not in ('thread', 'process'):
+            logger.error(f'Offload Executor: {executor}, not currently handled.')
+            raise NotImplementedError
+
+        self.threshold: int = threshold
+        self.records: int = records
+        self.executor: str = executor
+        self.workers: Optional[int] = workers
+        self._pool: Union[Executor, None] = None
+        self._threads: Union[ThreadPoolExecutor, None] = None
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Optional['Offload']:
+        """
+        Args:
+            cfg (dict):
+
+        Returns:
+            offload (Optional[Offload]): None if not enabled"""
+        try:
+            cfg = cfg['Offload']
+        except (KeyError, TypeError):
+            return None
+
+        try:
+            if not cfg['Enabled']:
+                return None
+        except KeyError:
+            return None
+
+        try:
+            threshold = int(cfg['Threshold'])
+        except (KeyError, TypeError):
+            threshold = 1024 * 1024
+
+        try:
+            records = int(cfg['Cleanup_Records'])
+        except (KeyError, TypeError):
+            records = 10000
+
+        try:
+            executor = (cfg['Executor'] or 'thread').lower()
+        except (KeyError, AttributeError):
+            executor = 'thread'
+
+        try:
+            workers = int(cfg['Workers']) or None
+        except (KeyError, TypeError):
+            workers = None
+
+        return cls(threshold=threshold, records=records, executor=executor, workers=workers)
+
+    @property
+    def pool(self) -> Executor:
+        """Decode pool; created on first use"""
+        if not self._pool:
+            if self.executor == 'process':
+                from concurrent.futures import ProcessPoolExecutor
+                from multiprocessing import get_context
+
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context('spawn'))
+                self._threads = None
+            else:
+                self._pool = self._threads = ThreadPoolExecutor(max_workers=self.workers,
+                                                                thread_name_prefix='base-api-client-offload')
+
+        return self._pool
+
+    @property
+    def threads(self) -> ThreadPoolExecutor:
+        """Cleanup pool; shares the decode pool in thread mode"""
+        if not self._threads:
+            if self.executor == 'thread':
+                return self.pool
+
+            self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='base-api-client-offload')
+
+        return self._threads
+
+    async def decode(self, body: bytes, data_key: Optional[str] = None) -> Any:
+        """
+        Args:
+            body (bytes): JSON; UTF-8
+            data_key (Optional[str]): Array decoded one record at a time (thread)
+
+        Returns:
+            document (Any)"""
+        loop = asyncio.get_running_loop()
+
+        if self.executor == 'process':
+            return await loop.run_in_executor(self.pool, rapidjson.loads, body)
+
+        return await loop.run_in_executor(self.pool, loads_document, body, data_key)
+
+    async def cleanup(self, records: List[dict]) -> List[dict]:
+        """See cleanup_records; in a thread if there are at least self.records
+
+        Args:
+            records (List[dict]):
+
+        Returns:
+            records (List[dict])"""
+        if len(records) < self.records:
+            return cleanup_records(records)
+
+        return await asyncio.get_running_loop().run_in_executor(self.threads, cleanup_records, records)
+
+    async def run(self, func, *args) -> Any:
+        """Run func(*args) in the cleanup pool
+
+        Args:
+            func (Callable):
+            *args:
+
+        Returns:
+            result (Any)"""
+        return await asyncio.get_running_loop().run_in_executor(self.threads, func, *args)
+
+    def close(self) -> None:
+        """Shut down the pools without waiting for queued work"""
+        for pool in {id(p): p for p in (self._pool, self._threads) if p}.values():
+            pool.shutdown(wait=False)
+
+        self._pool = self._threads = None
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Rate Limit
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import logging
+from collections import deque
+from email.utils import parsedate_to_datetime
+from fnmatch import fnmatch
+from time import monotonic, time
+from typing import Deque, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket(object):
+    """Token Bucket
+
+    Callers queue (FIFO) for a token and a single pacer releases them at exactly `rate` (after an initial
+    `burst`), without polling. The bucket can be paused (Retry-After / exhausted quota) and re-rated from
+    rate-limit response headers; both take effect for callers already queued.
+
+    Args:
+        rate (Optional[float]): Tokens (requests) per second; None disables pacing until headers provide one
+        burst (Optional[float]): Bucket capacity; Default: max(1, rate)"""
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None):
+        self.rate: Optional[float] = rate or None
+        self.capacity: float = float(burst or max(1.0, rate or 1.0))
+        self.tokens: float = self.capacity
+        self.updated: float = monotonic()
+        self.paused_until: float = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._pacer: Optional[asyncio.Task] = None
+        self._changed: Optional[asyncio.Event] = None
+
+    def _refill(self, now: float) -> None:
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _take(self) -> float:
+        """Take a token if one is available
+
+        Returns:
+            wait (float): 0 if a token was taken, else seconds until one should be"""
+        now = monotonic()
+        self._refill(now)
+
+        if now < self.paused_until:
+            return self.paused_until - now
+
+        if not self.rate:
+            return 0.0
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        if not self._waiters and self._take() == 0:
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+
+        if self._pacer is None or self._pacer.done():
+            self._changed = asyncio.Event()
+            self._pacer = asyncio.create_task(self._pace())
+
+        await fut
+
+    async def _pace(self) -> None:
+        while self._waiters:
+            if self._waiters[0].done():  # Cancelled
+                self._waiters.popleft()
+            elif (wait := self._take()) == 0:
+                self._waiters.popleft().set_result(None)
+            else:
+                self._changed.clear()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _notify(self) -> None:
+        if self._changed:
+            self._changed.set()
+
+    def pause(self, seconds: float) -> None:
+        """Stop issuing tokens for `seconds`"""
+        now = monotonic()
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+        self.paused_until = max(self.paused_until, now + seconds)
+        self._notify()
+
+    def update(self, status: int, headers: Mapping[str, str]) -> None:
+        """Adjust the bucket from rate-limit response headers
+
+        Honors Retry-After (on 429/503), X-RateLimit-Remaining/Reset and RateLimit-Remaining/Reset.
+
+        Args:
+            status (int): HTTP Status
+            headers (Mapping[str, str]):"""
+        if status in (429, 503) and (retry_after := parse_retry_after(headers.get('Retry-After'))) is not None:
+            logger.warning(f'Rate limited; pausing for {retry_after:.2f} seconds.')
+            self.pause(retry_after)
+            return
+
+        remaining = headers.get('X-RateLimit-Remaining', headers.get('RateLimit-Remaining'))
+        reset = parse_reset(headers.get('X-RateLimit-Reset', headers.get('RateLimit-Reset')))
+
+        try:
+            remaining = float(remaining)
+        except (TypeError, ValueError):
+            remaining = None
+
+        if remaining is None:
+            if status == 429:
+                self.pause(reset if reset is not None else 1 / (self.rate or 1))
+            return
+
+        if remaining < 1:
+            self.pause(reset if reset is not None else 1.0)
+        else:
+            if reset:
+                self._refill(monotonic())
+                self.rate = remaining / reset
+            self.tokens = min(self.tokens, remaining)
+            self._notify()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date)
+
+    Args:
+        value (Optional[str]):
+
+    Returns:
+        seconds (Optional[float])"""
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parse a RateLimit-Reset header (delta-seconds or epoch-seconds)
+
+    Args:
+        value (Optional[str]):
+
+    Returns:
+        seconds (Optional[float])"""
+    try:
+        reset = float(value)
+    except (TypeError, ValueError):
+        return None
+
+    if reset > 1e9:  # Epoch
+        reset -= time()
+
+    return max(0.0, reset)
+
+
+class RateLimiter(object):
+    """Rate Limiter
+
+    A TokenBucket per host, or per host + endpoint pattern when one matches the request path.
+
+    Args:
+        rate (Optional[float]): Requests per second per host; None paces from response headers only
+        burst (Optional[float]):
+        endpoints (Optional[Dict[str, dict]]): {fnmatch pattern: {'Rate': float, 'Burst': float}}
+        retries (int): Number of times a 429 is retried (after honoring Retry-After) before it is returned"""
+
+    def __init__(self, rate: Optional[float] = None,
+                 burst: Optional[float] = None,
+                 endpoints: Optional[Dict[str, dict]] = None,
+                 retries: int = 3):
+        self.rate: Optional[float] = rate
+        self.burst: Optional[float] = burst
+        self.endpoints: List[Tuple[str, Optional[float], Optional[float]]] = \
+            [(k, v.get('Rate'), v.get('Burst')) for k, v in (endpoints or {}).items()]
+        self.retries: int = retries
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Optional['RateLimiter']:
+        """
+        Args:
+            cfg (dict):
+
+        Returns:
+            rate_limiter (Optional[RateLimiter]): None if not configured"""
+        try:
+            cfg = cfg['RateLimit']
+        except (KeyError, TypeError):
+            return None
+
+        try:
+            rate = float(cfg['Rate']) or None
+        except (KeyError, TypeError):
+            rate = None
+
+        try:
+            burst = float(cfg['Burst']) or None
+        except (KeyError, TypeError):
+            burst = None
+
+        try:
+            endpoints = cfg['Endpoints']
+        except (KeyError, TypeError):
+            endpoints = None
+
+        try:
+            retries = int(cfg['Retry'])
+        except (KeyError, TypeError):
+            retries = 3
+
+        return cls(rate=rate, burst=burst, endpoints=endpoints, retries=retries)
+
+    def bucket(self, url: str) -> TokenBucket:
+        """
+        Args:
+            url (str):
+
+        Returns:
+            bucket (TokenBucket)"""
+        parts = urlsplit(url)
+        key, rate, burst = parts.netloc, self.rate, self.burst
+
+        for pattern, ep_rate, ep_burst in self.endpoints:
+            if fnmatch(parts.path, pattern):
+                key, rate, burst = f'{parts.netloc}{pattern}', ep_rate, ep_burst
+                break
+
+        try:
+            return self.buckets[key]
+        except KeyError:
+            self.buckets[key] = bucket = TokenBucket(rate=rate, burst=burst)
+            return bucket
+
+    async def acquire(self, url: str) -> None:
+        await self.bucket(url).acquire()
+
+    def update(self, url: str, status: int, headers: Mapping[str, str]) -> None:
+        self.bucket(url).update(status, headers)
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Flight Recorder
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import logging
+import random
+from collections import deque
+from os.path import realpath
+from time import monotonic, time
+from typing import Deque, List, Optional
+
+import rapidjson
+
+logger = logging.getLogger(__name__)
+
+
+class FlightRecorder(object):
+    """Flight Recorder
+
+    Keeps summaries of the last `size` request attempts (time, method, URL, status, elapsed, error, body sample)
+    in a ring buffer. Failed attempts (exceptions, status >= 400) are always kept; others with probability
+    `sample`. Bodies are only sampled when already in memory (preload, errors). dump() returns or writes the
+    buffer on demand; with `path`, a snapshot is also written there after a failure, at most every `interval`
+    seconds, in the default executor (`pending` is the latest write; errors are logged).
+
+    Args:
+        size (int): Attempts kept
+        sample (float): Fraction of successful attempts kept; 0-1
+        body_bytes (int): Body sample length
+        path (Optional[str]): JSON Lines file written on failure
+        interval (float): Minimum seconds between failure dumps"""
+
+    def __init__(self, size: int = 1000,
+                 sample: float = 1.0,
+                 body_bytes: int = 256,
+                 path: Optional[str] = None,
+                 interval: float = 60.0):
+        self.records: Deque[dict] = deque(maxlen=size)
+        self.sample: float = sample
+        self.body_bytes: int = body_bytes
+        self.path: Optional[str] = path
+        self.interval: float = interval
+        self.dumped: float = float('-inf')
+        self.pending: Optional[asyncio.Future] = None
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Optional['FlightRecorder']:
+        """
+        Args:
+            cfg (dict):
+
+        Returns:
+            recorder (Optional[FlightRecorder]): None if not enabled"""
+        try:
+            cfg = cfg['FlightRecorder']
+        except (KeyError, TypeError):
+            return None
+
+        try:
+            if not cfg['Enabled']:
+                return None
+        except KeyError:
+            return None
+
+        try:
+            size = int(cfg['Size'])
+        except (KeyError, TypeError):
+            size = 1000
+
+        try:
+            sample = float(cfg['Sample'])
+        except (KeyError, TypeError):
+            sample = 1.0
+
+        try:
+            body_bytes = int(cfg['Body_Bytes'])
+        except (KeyError, TypeError):
+            body_bytes = 256
+
+        try:
+            path = cfg['Path'] or None
+        except KeyError:
+            path = None
+
+        try:
+            interval = float(cfg['Dump_Interval'])
+        except (KeyError, TypeError):
+            interval = 60.0
+
+        return cls(size=size, sample=sample, body_bytes=body_bytes, path=path, interval=interval)
+
+    def record(self, method: str, url: str,
+               status: Optional[int] = None,
+               elapsed: Optional[float] = None,
+               error: Optional[BaseException] = None,
+               body: Optional[bytes] = None) -> None:
+        """
+        Args:
+            method (str):
+            url (str):
+            status (Optional[int]): None if no response was received
+            elapsed (Optional[float]): Seconds
+            error (Optional[BaseException]):
+            body (Optional[bytes]): Truncated to body_bytes"""
+        failed = error is not None or (status or 0) >= 400
+        if not failed and self.sample < 1 and random.random() >= self.sample:
+            return
+
+        self.records.append({'time':    time(),
+                             'method':  method.upper(),
+                             'url':     str(url),
+                             'status':  status,
+                             'elapsed': elapsed,
+                             'error':   repr(error) if error is not None else None,
+                             'body':    body[:self.body_bytes].decode('utf-8', errors='replace') if body else None})
+
+        if failed and self.path and monotonic() - self.dumped >= self.interval:
+            self.dumped = monotonic()
+            records = list(self.records)  # Snapshot on the loop thread; the deque keeps changing
+            try:
+                self.pending = asyncio.get_running_loop().run_in_executor(None, self.write, records, self.path)
+                self.pending.add_done_callback(self.written)
+            except RuntimeError:  # No running loop
+                self.write(records, self.path)
+
+    def dump(self, path: Optional[str] = None) -> List[dict]:
+        """
+        Args:
+            path (Optional[str]): Also write the records here as JSON Lines (overwriting)
+
+        Returns:
+            records (List[dict]): Oldest first"""
+        records = list(self.records)
+
+        if path:
+            self.write(records, path)
+
+        return records
+
+    @staticmethod
+    def write(records: List[dict], path: str) -> None:
+        """
+        Args:
+            records (List[dict]):
+            path (str): JSON Lines (overwriting)"""
+        with open(realpath(path), 'w', encoding='utf-8') as f:
+            f.writelines(f'{rapidjson.dumps(r, ensure_ascii=False)}\n' for r in records)
+        logger.info(f'Flight recorder: {len(records)} records written to {path}')
+
+    def written(self, future: asyncio.Future) -> None:
+        """Logs a failed failure dump
+
+        Args:
+            future (asyncio.Future):"""
+        if not future.cancelled() and (e := future.exception()):
+            logger.error(f'Flight recorder: dump to {self.path} failed; {e!r}')
+
+
+if __name__ == '__main__':
+    print(__doc__)
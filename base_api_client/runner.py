@@ -0,0 +1,134 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Runner
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count
+from typing import Any, Awaitable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+EXECUTORS: Dict[asyncio.AbstractEventLoop, ThreadPoolExecutor] = {}  # Default executors for run() to shut down
+
+
+def new_event_loop(use_uvloop: bool = True) -> asyncio.AbstractEventLoop:
+    """uvloop's event loop if requested and installed (pip install base-api-client[uvloop]); otherwise asyncio's
+
+    Args:
+        use_uvloop (bool):
+
+    Returns:
+        loop (asyncio.AbstractEventLoop)"""
+    if use_uvloop:
+        try:
+            import uvloop
+
+            return uvloop.new_event_loop()
+        except ImportError:
+            logger.debug('uvloop is not installed; using the asyncio event loop')
+
+    return asyncio.new_event_loop()
+
+
+def executor_workers(concurrency: int) -> int:
+    """Default executor size for a client making `concurrency` parallel requests
+
+    File I/O (aiofiles), threaded DNS resolution and digests run in the default executor; asyncio sizes it
+    min(32, cpu_count + 4), which queues them behind each other when more requests than that are in flight.
+
+    Args:
+        concurrency (int): Configured (maximum) parallel requests
+
+    Returns:
+        workers (int)"""
+    return max(concurrency, min(32, (cpu_count() or 1) + 4))
+
+
+def set_default_executor(workers: int, loop: Optional[asyncio.AbstractEventLoop] = None) -> ThreadPoolExecutor:
+    """Size the default executor of `loop` (Default: the running loop); run() shuts it down on exit
+
+    Lets main size the executor once it knows its concurrency (e.g. after creating a client).
+
+    Args:
+        workers (int): Threads; see executor_workers
+        loop (Optional[asyncio.AbstractEventLoop]):
+
+    Returns:
+        executor (ThreadPoolExecutor)"""
+    loop = loop or asyncio.get_running_loop()
+    EXECUTORS[loop] = executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='base-api-client')
+    loop.set_default_executor(executor)
+
+    return executor
+
+
+def cancel_tasks(loop: asyncio.AbstractEventLoop) -> None:
+    """Cancel tasks still pending when main returns, and wait for them; as asyncio.run does"""
+    if not (tasks := asyncio.all_tasks(loop)):
+        return
+
+    for task in tasks:
+        task.cancel()
+
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+    for task in tasks:
+        if not task.cancelled() and task.exception() is not None:
+            loop.call_exception_handler({'message':   'Unhandled exception during run() shutdown',
+                                         'exception': task.exception(),
+                                         'task':      task})
+
+
+def run(main: Awaitable, use_uvloop: bool = True, workers: Optional[int] = None, debug: bool = False) -> Any:
+    """asyncio.run, on uvloop when available, with a sized default executor
+
+    Args:
+        main (Awaitable):
+        use_uvloop (bool): Fall back to asyncio's event loop when uvloop isn't installed
+        workers (Optional[int]): Default executor threads; None keeps asyncio's default (see executor_workers)
+        debug (bool): Event loop debug mode
+
+    Returns:
+        result (Any): main's"""
+    loop = new_event_loop(use_uvloop)
+
+    try:
+        asyncio.set_event_loop(loop)
+        loop.set_debug(debug)
+        if workers:
+            set_default_executor(workers, loop)
+
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            cancel_tasks(loop)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            executor = EXECUTORS.pop(loop, None)  # Set here or by main; see set_default_executor
+            if hasattr(loop, 'shutdown_default_executor'):  # Python 3.9+
+                loop.run_until_complete(loop.shutdown_default_executor())
+            elif executor:
+                executor.shutdown(wait=True)
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Sharding
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import logging
+from copy import deepcopy
+from itertools import islice
+from os import getpid
+from typing import Iterable, Iterator, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# Per worker process; see init_worker
+_client = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def chunked(iterable: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def worker_config(cfg: Optional[dict], concurrency: int, processes: int) -> dict:
+    """Split the parent's limits between `processes` workers
+
+    Options.SEM (or SEM_Min/SEM_Max when adaptive), Connection.Limit/Limit_Per_Host, RateLimit.Rate/Burst and each
+    RateLimit.Endpoints Rate/Burst are divided so the pool as a whole keeps to the configured totals. `cfg` should
+    already have environment overrides applied (BaseApiClient.cfg); workers don't re-apply them, see init_worker.
+
+    Args:
+        cfg (Optional[dict]): The parent client's configuration
+        concurrency (int): The parent client's concurrency
+        processes (int):
+
+    Returns:
+        cfg (dict)"""
+    cfg = deepcopy(cfg or {})
+
+    def share(section: Optional[dict], key: str, integer: bool = True) -> None:
+        try:
+            value = float(section[key])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        if value:
+            section[key] = max(1, -(-int(value) // processes)) if integer else value / processes
+
+    if not isinstance(cfg.get('Options'), dict):
+        cfg['Options'] = {}
+    cfg['Options'].setdefault('SEM', concurrency)
+
+    for key in ('SEM', 'SEM_Min', 'SEM_Max'):
+        share(cfg['Options'], key)
+
+    for key in ('Limit', 'Limit_Per_Host'):
+        share(cfg.get('Connection'), key)
+
+    rate_limit = cfg.get('RateLimit')
+    for section in [rate_limit, *(rate_limit.get('Endpoints') or {}).values()] if isinstance(rate_limit, dict) else []:
+        share(section, 'Rate', integer=False)
+        share(section, 'Burst', integer=False)
+
+    return cfg
+
+
+def init_worker(cls: Type, cfg: dict) -> None:
+    """ProcessPoolExecutor initializer; one client and event loop per worker process, reused for every chunk
+
+    Environment overrides were resolved by the parent before the limits were split; re-applying them here would
+    replace each worker's share with the full value."""
+    global _client, _loop
+
+    cls.ENV_OVERRIDES = False
+
+    try:
+        if cfg['Transport']['Mode'].lower() == 'record':  # One archive per worker
+            cfg['Transport']['Path'] = f'{cfg["Transport"]["Path"]}.{getpid()}'
+    except (KeyError, AttributeError):
+        pass
+
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+
+    async def create():
+        return cls(cfg=cfg)
+
+    _client = _loop.run_until_complete(create())
+
+    from multiprocessing.util import Finalize
+
+    Finalize(None, close_worker, exitpriority=10)
+
+
+def close_worker() -> None:
+    _loop.run_until_complete(_client.__aexit__(None, None, None))
+    _loop.close()
+
+
+def run_chunk(requests: List[dict], data_key: Optional[str], cleanup: bool) -> Tuple[List[dict], List[dict]]:
+    """Run a chunk of requests on this worker's client
+
+    Args:
+        requests (List[dict]): Keyword arguments for BaseApiClient.request
+        data_key (Optional[str]):
+        cleanup (bool):
+
+    Returns:
+        (Tuple[List[dict], List[dict]]): (success, failure)"""
+    failure = []
+
+    async def run() -> List[dict]:
+        return [rec async for rec in _client.request_many(requests, data_key=data_key, cleanup=cleanup, failure=failure)]
+
+    return _loop.run_until_complete(run()), failure
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Streaming
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import codecs
+import logging
+from json import JSONDecodeError, JSONDecoder
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Optional, Tuple, Union
+
+import rapidjson
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE = ' \t\n\r'
+
+
+class JsonStream(object):
+    """Incremental JSON reader over an async stream of bytes
+
+    Values are decoded with JSONDecoder.raw_decode from a rolling buffer; only the value being decoded
+    (plus the unread part of the current chunk) is held in memory.
+
+    Args:
+        chunks (AsyncIterable[bytes]): e.g. aio.ClientResponse.content.iter_chunked(65536)
+        encoding (str):"""
+
+    def __init__(self, chunks: AsyncIterable[bytes], encoding: str = 'utf-8'):
+        self.chunks: AsyncIterator[bytes] = chunks.__aiter__()
+        self.decoder: codecs.IncrementalDecoder = codecs.getincrementaldecoder(encoding)()
+        self.raw_decode = JSONDecoder().raw_decode
+        self.buf: str = ''
+        self.pos: int = 0
+        self.eof: bool = False
+
+    async def fill(self, size: int = 0) -> bool:
+        """Read until at least `size` characters are buffered past pos (or one chunk if 0)
+
+        Returns:
+            (bool): False at EOF"""
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        target = max(size, len(self.buf) + 1)
+
+        while len(self.buf) < target:
+            try:
+                chunk = await self.chunks.__anext__()
+            except StopAsyncIteration:
+                self.buf += self.decoder.decode(b'', final=True)
+                self.eof = True
+                return False
+
+            self.buf += self.decoder.decode(chunk)
+
+        return True
+
+    async def peek(self) -> str:
+        """Skip whitespace
+
+        Returns:
+            char (str): Next character; '' at EOF"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+
+            if not await self.fill():
+                return ''
+
+    async def value(self) -> Any:
+        """Decode the next value"""
+        await self.peek()
+
+        while True:
+            try:
+                value, end = self.raw_decode(self.buf, self.pos)
+                if end < len(self.buf) or self.eof:  # A number may continue in the next chunk
+                    self.pos = end
+                    return value
+            except JSONDecodeError:
+                if self.eof:
+                    raise
+
+            await self.fill(size=(len(self.buf) - self.pos) * 2)  # Double the read-ahead; keeps retries O(n)
+
+    async def expect(self, char: str) -> None:
+        if (c := await self.peek()) != char:
+            raise JSONDecodeError(f'Expecting {char!r}, found {c!r}', self.buf, self.pos)
+
+        self.pos += 1
+
+    async def array(self) -> AsyncIterator[Any]:
+        """Yield the elements of the array at the current position"""
+        await self.expect('[')
+
+        if await self.peek() == ']':
+            self.pos += 1
+            return
+
+        while True:
+            yield await self.value()
+
+            if await self.peek() == ']':
+                self.pos += 1
+                return
+
+            await self.expect(',')
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes],
+                          data_key: Optional[str] = None,
+                          encoding: str = 'utf-8') -> AsyncIterator[Any]:
+    """Incrementally decode the records of a JSON document
+
+    Yields the elements of the top-level array, or of the array under `data_key` in a top-level object,
+    one at a time. Other members of the object are decoded and discarded; if no such array exists the
+    whole document is yielded once (as BaseApiClient.parse_result would use it).
+
+    Args:
+        chunks (AsyncIterable[bytes]):
+        data_key (Optional[str]):
+        encoding (str):
+
+    Returns:
+        record (AsyncIterator[Any])"""
+    stream = JsonStream(chunks, encoding=encoding)
+
+    if (c := await stream.peek()) == '[':
+        async for value in stream.array():
+            yield value
+        return
+    elif c != '{':
+        yield await stream.value()
+        return
+
+    document = {}
+    streamed = False
+    await stream.expect('{')
+
+    while (c := await stream.peek()) != '}':
+        if c == ',':
+            stream.pos += 1
+            continue
+
+        key = await stream.value()
+        await stream.expect(':')
+
+        if key == data_key and not streamed and await stream.peek() == '[':
+            streamed = True
+            async for value in stream.array():
+                yield value
+        else:
+            document[key] = await stream.value()
+
+    if not streamed:
+        yield document
+
+
+def loads_document(data: Union[bytes, str], data_key: Optional[str] = None, encoding: str = 'utf-8') -> Any:
+    """Decode a JSON document one record at a time
+
+    Same result as loads(data), but the elements of the top-level array (or of the array under `data_key` in a
+    top-level object) are decoded one per call, so a thread running this releases the GIL between records instead
+    of holding it for the whole body.
+
+    Args:
+        data (Union[bytes, str]):
+        data_key (Optional[str]):
+        encoding (str):
+
+    Returns:
+        document (Any)"""
+    s = data.decode(encoding) if isinstance(data, (bytes, bytearray)) else data
+    raw_decode = JSONDecoder().raw_decode
+    n = len(s)
+
+    def skip(pos: int) -> int:
+        while pos < n and s[pos] in WHITESPACE:
+            pos += 1
+        return pos
+
+    def expect(pos: int, char: str) -> int:
+        if (pos := skip(pos)) >= n or s[pos] != char:
+            raise JSONDecodeError(f'Expecting {char!r}', s, pos)
+        return pos + 1
+
+    def array(pos: int) -> Tuple[list, int]:
+        records = []
+        pos = skip(pos + 1)
+        if pos < n and s[pos] == ']':
+            return records, pos + 1
+
+        while True:
+            record, pos = raw_decode(s, skip(pos))
+            records.append(record)
+            if (pos := skip(pos)) < n and s[pos] == ']':
+                return records, pos + 1
+            pos = expect(pos, ',')
+
+    pos = skip(0)
+    if pos < n and s[pos] == '[':
+        document, pos = array(pos)
+    elif pos < n and s[pos] == '{':
+        document = {}
+        pos = skip(pos + 1)
+        while pos < n and s[pos] != '}':
+            key, pos = raw_decode(s, pos)
+            pos = skip(expect(pos, ':'))
+            if key == data_key and pos < n and s[pos] == '[':
+                document[key], pos = array(pos)
+            else:
+                document[key], pos = raw_decode(s, pos)
+            if (pos := skip(pos)) < n and s[pos] == ',':
+                pos = skip(pos + 1)
+        pos = expect(pos, '}')
+    else:
+        document, pos = raw_decode(s, pos)
+
+    if skip(pos) != n:
+        raise JSONDecodeError('Extra data', s, pos)
+
+    return document
+
+
+async def iter_ndjson(chunks: AsyncIterable[bytes], loads: Callable[[bytes], Any] = rapidjson.loads) -> AsyncIterator[Any]:
+    """Decode newline delimited JSON (NDJSON / JSON Lines) one line at a time
+
+    Args:
+        chunks (AsyncIterable[bytes]):
+        loads (Callable[[bytes], Any]):
+
+    Returns:
+        record (AsyncIterator[Any])"""
+    buf = bytearray()
+    scan = 0
+
+    async for chunk in chunks:
+        buf.extend(chunk)
+        start = 0
+
+        while (end := buf.find(b'\n', scan)) != -1:
+            if line := buf[start:end].strip():
+                yield loads(bytes(line))
+            start = scan = end + 1
+
+        del buf[:start]
+        scan = len(buf)
+
+    if line := buf.strip():
+        yield loads(bytes(line))
+
+
+if __name__ == '__main__':
+    print(__doc__)
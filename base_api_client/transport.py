@@ -0,0 +1,224 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Transport
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import logging
+import zlib
+from os.path import exists, realpath
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING, Union
+
+import aiohttp as aio
+import rapidjson
+from yarl import URL
+
+from .models import Response
+from .utils import open_async
+
+if TYPE_CHECKING:
+    from multidict import MultiDict
+
+logger = logging.getLogger(__name__)
+
+Entry = Tuple[dict, bytes]
+
+
+def entry_key(method: str, url: Union[str, URL], params: Optional[Union[List[tuple], dict, 'MultiDict']] = None) -> str:
+    """METHOD URL with params merged and the query sorted"""
+    url = URL(str(url))
+    if params:
+        url = url.update_query(params)
+
+    return f'{method.upper()} {url.with_query(sorted(url.query.items()))}'
+
+
+class Transport(object):
+    """Record/Replay Transport
+
+    record: every response received by BaseApiClient.send (incl. errors and 429s) is read and appended to
+            `path` along with its status, headers and latency.
+    replay: responses are served from `path` without touching the network; requests are matched by method, URL
+            and (sorted) query, then by method and path, cycling through the recordings for each. Each response
+            is delayed by its recorded latency * `latency`; 0 replays at line rate.
+
+    The archive is a zlib (gzip) stream of entries, each a JSON meta line followed by the raw body, sync-flushed per
+    entry so it stays readable if the process dies; runs append further gzip members.
+
+    Args:
+        mode (str): record | replay
+        path (str): Archive file
+        latency (float): Replay: multiple of the recorded latency to wait"""
+
+    def __init__(self, mode: str, path: str, latency: float = 0.0):
+        self.mode: str = mode.lower()
+        self.path: str = realpath(path)
+        self.latency: float = latency
+        self.entries: Optional[Dict[str, List[Entry]]] = None
+        self.cursors: Dict[str, int] = {}
+        self.compressor: Optional['zlib._Compress'] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+        if self.mode not in ('record', 'replay'):
+            logger.error(f'Transport-Mode: {self.mode}, not currently handled.')
+            raise NotImplementedError
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        if self._lock is None:  # Created on first use; bound to the running loop
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Optional['Transport']:
+        """
+        Args:
+            cfg (dict):
+
+        Returns:
+            transport (Optional[Transport]): None for live traffic"""
+        try:
+            cfg = cfg['Transport']
+        except (KeyError, TypeError):
+            return None
+
+        try:
+            mode = cfg['Mode'].lower()
+        except (KeyError, AttributeError):
+            return None
+
+        if mode in ('', 'live'):
+            return None
+
+        try:
+            latency = float(cfg['Latency'])
+        except (KeyError, TypeError):
+            latency = 0.0
+
+        return cls(mode=mode, path=cfg['Path'], latency=latency)
+
+    @staticmethod
+    def read(path: str) -> Dict[str, List[Entry]]:
+        """
+        Args:
+            path (str): Archive file
+
+        Returns:
+            entries (Dict[str, List[Entry]]): {key: [(meta, body), ...]}; also indexed by METHOD URL-without-query"""
+        data = bytearray()
+        with open(realpath(path), 'rb') as f:
+            pending = f.read()
+
+        while pending:  # One gzip member per recording run
+            decompressor = zlib.decompressobj(wbits=31)
+            data += decompressor.decompress(pending)
+            pending = decompressor.unused_data
+
+        entries: Dict[str, List[Entry]] = {}
+        pos = 0
+        while (end := data.find(b'\n', pos)) != -1:
+            meta = rapidjson.loads(data[pos:end].decode('utf-8'))
+            if end + 1 + meta['length'] > len(data):  # Truncated by an interrupted recording
+                break
+
+            entry = (meta, bytes(data[end + 1:end + 1 + meta['length']]))
+            pos = end + 1 + meta['length']
+            entries.setdefault(meta['key'], []).append(entry)
+            entries.setdefault(meta['key'].partition('?')[0], []).append(entry)
+
+        return entries
+
+    async def record(self, method: str, url: str,
+                     params: Optional[Union[List[tuple], dict, 'MultiDict']],
+                     response: aio.ClientResponse,
+                     elapsed: float) -> Response:
+        """Read and archive a response
+
+        Args:
+            method (str):
+            url (str):
+            params (Optional[Union[List[tuple], dct, MultiDict]]):
+            response (aio.ClientResponse):
+            elapsed (float): Seconds from send to headers
+
+        Returns:
+            response (Response)"""
+        response = await Response.from_response(response)
+        meta = {'key':     entry_key(method, url, params),
+                'url':     str(response.url),
+                'status':  response.status,
+                'reason':  response.reason,
+                'headers': list(response.headers.items()),
+                'elapsed': elapsed,
+                'length':  len(response.body)}
+
+        async with self.lock:
+            if not self.compressor:
+                self.compressor = zlib.compressobj(wbits=31)
+
+            data = self.compressor.compress(rapidjson.dumps(meta, ensure_ascii=False).encode('utf-8') + b'\n' + response.body)
+            data += self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+            async with open_async(self.path, 'ab') as f:
+                await f.write(data)
+
+        return response
+
+    async def replay(self, method: str, url: str, params: Optional[Union[List[tuple], dict, 'MultiDict']] = None) -> Response:
+        """
+        Args:
+            method (str):
+            url (str):
+            params (Optional[Union[List[tuple], dct, MultiDict]]):
+
+        Raises:
+            KeyError: Nothing recorded for this method and path
+
+        Returns:
+            response (Response)"""
+        if self.entries is None:
+            async with self.lock:
+                if self.entries is None:
+                    self.entries = await asyncio.get_running_loop().run_in_executor(None, self.read, self.path) \
+                        if exists(self.path) else {}
+
+        key = entry_key(method, url, params)
+        if not (entries := self.entries.get(key) or self.entries.get(key.partition('?')[0])):
+            logger.error(f'Transport: no recording for {key} in {self.path}')
+            raise KeyError(key)
+
+        index = self.cursors.get(key, 0)
+        self.cursors[key] = index + 1
+        meta, body = entries[index % len(entries)]
+
+        if self.latency:
+            await asyncio.sleep(meta['elapsed'] * self.latency)
+
+        return Response(method=method, url=meta['url'], status=meta['status'], headers=meta['headers'], body=body,
+                        reason=meta['reason'], elapsed=meta['elapsed'])
+
+    async def close(self) -> None:
+        """End the gzip member being recorded"""
+        async with self.lock:
+            if self.compressor:
+                async with open_async(self.path, 'ab') as f:
+                    await f.write(self.compressor.flush())
+                self.compressor = None
+
+
+if __name__ == '__main__':
+    print(__doc__)
@@ -17,7 +17,11 @@
 
 You should have received a copy of the SSPL along with this program.
 If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
-from typing import Any, NoReturn, Optional, Union
+import mmap
+import os
+from contextlib import contextmanager
+from os.path import realpath
+from typing import Any, Iterator, NoReturn, Optional, Union
 
 from base_api_client.models import Results
 
@@ -50,5 +54,45 @@ def tprint(results: Results, requests: Optional[Any] = None, top: Optional[Union
             print(*requests, sep='\n')
 
 
+def open_async(file_path: str, mode: str = 'rb'):
+    """aiofiles.open; aiofiles is only imported by code that touches the disk
+
+    Args:
+        file_path (str):
+        mode (str):
+
+    Returns:
+        file (aiofiles.threadpool.AiofilesContextManager)"""
+    import aiofiles
+
+    return aiofiles.open(file_path, mode)
+
+
+@contextmanager
+def mmap_file(file_path: str) -> Iterator[memoryview]:
+    """Memory-map a file (read-only) as a zero-copy body; slices of the view are zero-copy too.
+
+    Args:
+        file_path (str):
+
+    Returns:
+        view (Iterator[memoryview])"""
+    with open(realpath(file_path), 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:  # Empty files can't be mapped
+            yield memoryview(b'')
+            return
+
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm)
+        try:
+            yield view
+        finally:
+            try:
+                view.release()
+                mm.close()
+            except BufferError:  # A slice is still referenced; closed when collected
+                pass
+
+
 if __name__ == '__main__':
     print(__doc__)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Benchmarks
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import argparse
+import asyncio
+import gc
+import multiprocessing
+import platform
+import socket
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+from datetime import datetime, timezone
+from os import makedirs
+from os.path import dirname, join, realpath
+from typing import Any, Awaitable, Callable, Dict
+
+import aiohttp as aio
+import rapidjson
+
+from base_api_client import BaseApiClient, bprint, CompactResults, Pagination, Record, Results
+from benchmarks.server import serve
+
+RESULTS_DIR = join(dirname(realpath(__file__)), 'results')
+
+
+def version() -> str:
+    try:
+        from importlib.metadata import version as dist_version
+        return dist_version('base-api-client')
+    except Exception:  # Not installed; running from a checkout
+        return 'dev'
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def wait_for(url: str, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with aio.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(url, params={'limit': 1}):
+                    return
+            except aio.ClientConnectionError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.05)
+
+
+async def measure(count: int, unit: str,
+                  setup: Callable[[], Awaitable[Any]],
+                  run: Callable[[Any], Awaitable[Any]],
+                  memory: bool = True) -> Dict[str, Any]:
+    """Time run(setup()) and, in a second pass under tracemalloc, its peak allocation
+
+    Args:
+        count (int): Items (requests, records) processed by run
+        unit (str):
+        setup (Callable[[], Awaitable[Any]]): Builds run's input; not measured
+        run (Callable[[Any], Awaitable[Any]]):
+        memory (bool): Measure peak memory (second pass)
+
+    Returns:
+        stage (Dict[str, Any])"""
+    data = await setup()
+    gc.collect()
+    wall, cpu = time.perf_counter(), time.process_time()
+    await run(data)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    del data
+
+    peak = None
+    if memory:
+        data = await setup()
+        gc.collect()
+        tracemalloc.start()
+        await run(data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del data
+
+    return {'count':           count,
+            'unit':            unit,
+            'seconds':         wall,
+            'per_second':      count / wall if wall else None,
+            'cpu_seconds':     cpu,
+            'cpu_us_per_item': cpu / count * 1e6 if count else None,
+            'peak_bytes':      peak}
+
+
+async def bench(args: argparse.Namespace, base: str) -> Dict[str, Dict[str, Any]]:
+    cfg = {'Options': {'SEM': args.concurrency}}
+    if args.throttle_rate:
+        cfg['RateLimit'] = {'Retry': 3}
+
+    end_point = f'{base}/records.{args.content_type}'
+    data_key = 'docs' if args.content_type == 'json' else None
+    params = {'limit': args.records}
+    total = min(args.requests * args.records, args.total)  # Records served by the request stages
+    stages = {}
+
+    async with BaseApiClient(cfg=cfg) as bac:
+        async def requests() -> list:
+            return await asyncio.gather(*[bac.request('get', end_point, params={**params, 'offset': i * args.records})
+                                          for i in range(args.requests)])
+
+        async def nothing() -> None:
+            return None
+
+        async def release(results: list) -> None:
+            for result in results:
+                result['response'].release()
+
+        async def request(_) -> None:
+            await release(await requests())
+
+        stages['request'] = await measure(args.requests, 'requests', nothing, request, args.memory)
+
+        async def process_results(results: list) -> None:
+            await bac.process_results(Results(data=results), data_key=data_key)
+
+        async def process_results_compact(results: list) -> None:
+            await bac.process_results(CompactResults(data=results), data_key=data_key)
+
+        stages['process_results'] = await measure(total, 'records', requests, process_results, args.memory)
+        stages['process_results_compact'] = await measure(total, 'records', requests, process_results_compact, args.memory)
+
+        processed = await bac.process_results(Results(data=await requests()), data_key=data_key)
+        records = processed.success
+
+        async def success() -> Results:
+            return Results(data=[], success=deepcopy(records))
+
+        async def cleanup(results: Results) -> None:
+            results.cleanup()
+
+        stages['results_cleanup'] = await measure(len(records), 'records', success, cleanup, args.memory)
+
+        async def loaded() -> list:
+            out = []
+            for rec in records:
+                r = Record()
+                r.load(**rec)
+                out.append(r)
+            return out
+
+        async def record_dict(recs: list) -> None:
+            for r in recs:
+                r.dict()
+
+        stages['record_dict'] = await measure(len(records), 'records', loaded, record_dict, args.memory)
+
+        if args.content_type == 'json':
+            pagination = Pagination(limit=args.records, total_key='numFound')
+
+            async def paginate(_) -> None:
+                async for _ in bac.paginate(end_point, pagination=pagination, data_key='docs'):
+                    pass
+
+            stages['paginate'] = await measure(args.total, 'records', nothing, paginate, args.memory)
+
+    return stages
+
+
+def compare(current: dict, previous: dict) -> None:
+    bprint(f'Compare: {previous["label"]} -> {current["label"]}')
+    print(f'{"stage":<26}{"per second":>16}{"CPU us/item":>16}{"peak bytes":>16}')
+    for name, stage in current['stages'].items():
+        if not (old := previous['stages'].get(name)):
+            continue
+
+        def delta(key: str) -> str:
+            if stage.get(key) is None or not old.get(key):
+                return '-'
+            return f'{(stage[key] - old[key]) / old[key] * 100:+.1f}%'
+
+        print(f'{name:<26}{delta("per_second"):>16}{delta("cpu_us_per_item"):>16}{delta("peak_bytes"):>16}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Offline throughput benchmarks against a local stand-in API.')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per request/process stage')
+    parser.add_argument('--records', type=int, default=100, help='Records per response (page size)')
+    parser.add_argument('--fields', type=int, default=8, help='Extra string fields per record')
+    parser.add_argument('--total', type=int, default=20_000, help='Records available to paginate')
+    parser.add_argument('--content-type', choices=('json', 'ndjson', 'csv'), default='json')
+    parser.add_argument('--concurrency', type=int, default=BaseApiClient.SEM, help='Options.SEM')
+    parser.add_argument('--latency', type=float, default=0.005, help='Server latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.005, help='Additional uniform random latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of 500 responses (retried with backoff)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of 429 responses (Retry-After: 0)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='Skip the tracemalloc pass')
+    parser.add_argument('--label', default=None, help='Name for this run; Default: installed version')
+    parser.add_argument('--output', default=None, help='Result file; Default: benchmarks/results/<label>.json')
+    parser.add_argument('--compare', default=None, help='Previous result file to compare against')
+    args = parser.parse_args()
+    args.label = args.label or version()
+
+    port = free_port()
+    server = multiprocessing.get_context('spawn').Process(target=serve,
+                                                          kwargs={'port':          port,
+                                                                  'latency':       args.latency,
+                                                                  'jitter':        args.jitter,
+                                                                  'records':       args.records,
+                                                                  'fields':        args.fields,
+                                                                  'total':         args.total,
+                                                                  'error_rate':    args.error_rate,
+                                                                  'throttle_rate': args.throttle_rate,
+                                                                  'seed':          args.seed},
+                                                          daemon=True)
+    server.start()
+
+    async def run() -> Dict[str, Dict[str, Any]]:
+        await wait_for(f'http://127.0.0.1:{port}/records')
+        return await bench(args, f'http://127.0.0.1:{port}')
+
+    try:
+        stages = asyncio.run(run())
+    finally:
+        server.terminate()
+        server.join()
+
+    result = {'label':     args.label,
+              'timestamp': datetime.now(timezone.utc).isoformat(),
+              'python':    sys.version.split()[0],
+              'aiohttp':   aio.__version__,
+              'platform':  platform.platform(),
+              'params':    {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+              'stages':    stages}
+
+    bprint(f'Benchmarks: {args.label}')
+    print(f'{"stage":<26}{"count":>8}{"seconds":>10}{"per second":>14}{"CPU us/item":>14}{"peak bytes":>14}')
+    for name, stage in stages.items():
+        print(f'{name:<26}{stage["count"]:>8}{stage["seconds"]:>10.3f}{stage["per_second"] or 0:>14.1f}'
+              f'{stage["cpu_us_per_item"] or 0:>14.1f}{stage["peak_bytes"] or "-":>14}')
+
+    output = args.output or join(RESULTS_DIR, f'{args.label}.json')
+    makedirs(dirname(realpath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        f.write(rapidjson.dumps(result, indent=2))
+    print(f'\nSaved: {output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(result, rapidjson.loads(f.read()))
+
+
+if __name__ == '__main__':
+    main()
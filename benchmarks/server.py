@@ -0,0 +1,162 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Benchmark Server
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import argparse
+import asyncio
+import csv
+import io
+import logging
+import random
+from typing import Dict, List, Optional, Tuple
+
+import rapidjson
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+def make_records(offset: int, limit: int, fields: int = 8) -> List[dict]:
+    """Deterministic records shaped like a typical REST API search result
+
+    Args:
+        offset (int):
+        limit (int):
+        fields (int): Extra string fields per record
+
+    Returns:
+        records (List[dict])"""
+    return [{'id':     i,
+             'key':    f'/works/OL{i}W',
+             'title':  f'Title {i}',
+             'year':   1900 + i % 120,
+             'score':  i * 0.5,
+             'tags':   ['fiction', 'classic'],
+             'author': {'name': f'Author {i % 50}', 'key': f'/authors/OL{i % 50}A'},
+             'empty':  None,
+             **{f'field_{k}': 'x' * 16 for k in range(fields)}} for i in range(offset, offset + limit)]
+
+
+def make_app(latency: float = 0.0,
+             jitter: float = 0.0,
+             records: int = 100,
+             fields: int = 8,
+             total: int = 10_000,
+             error_rate: float = 0.0,
+             throttle_rate: float = 0.0,
+             seed: Optional[int] = None) -> web.Application:
+    """Stand-in API
+
+    GET /records[.json|.ndjson|.csv]?offset=&limit=
+        json:   {'docs': [...], 'numFound': total, 'next': offset + limit | None}
+        ndjson: one record per line; csv: flat columns (nested values JSON encoded)
+    Every response is delayed by latency + uniform(0, jitter) seconds; error_rate of them are 500s and throttle_rate
+    are 429s (Retry-After: 0). Bodies are cached per page so the server costs little CPU.
+
+    Args:
+        latency (float): Seconds
+        jitter (float): Seconds
+        records (int): Default page size
+        fields (int): Extra string fields per record
+        total (int): Records available for pagination
+        error_rate (float): 0-1
+        throttle_rate (float): 0-1
+        seed (Optional[int]): For repeatable error/throttle/latency sequences
+
+    Returns:
+        app (web.Application)"""
+    rnd = random.Random(seed)
+    bodies: Dict[Tuple[str, int, int], bytes] = {}
+
+    def body(fmt: str, offset: int, limit: int) -> bytes:
+        try:
+            return bodies[(fmt, offset, limit)]
+        except KeyError:
+            pass
+
+        docs = make_records(offset, max(0, min(limit, total - offset)), fields)
+        if fmt == 'ndjson':
+            data = ''.join(f'{rapidjson.dumps(d)}\n' for d in docs)
+        elif fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=list(make_records(0, 1, fields)[0]))
+            writer.writeheader()
+            writer.writerows({k: rapidjson.dumps(v) if isinstance(v, (dict, list)) else v for k, v in d.items()} for d in docs)
+            data = buffer.getvalue()
+        else:
+            data = rapidjson.dumps({'docs': docs, 'numFound': total, 'next': offset + limit if offset + limit < total else None})
+
+        bodies[(fmt, offset, limit)] = encoded = data.encode('utf-8')
+        return encoded
+
+    async def handler(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency + rnd.uniform(0, jitter))
+
+        roll = rnd.random()
+        if roll < error_rate:
+            return web.json_response({'error': 'Internal Server Error'}, status=500)
+        if roll < error_rate + throttle_rate:
+            return web.json_response({'error': 'Too Many Requests'}, status=429, headers={'Retry-After': '0'})
+
+        fmt = request.match_info.get('fmt') or 'json'
+        offset = int(request.query.get('offset', 0))
+        limit = int(request.query.get('limit', records))
+        content_type = {'json': 'application/json', 'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}[fmt]
+
+        return web.Response(body=body(fmt, offset, limit), content_type=content_type, charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/records', handler)
+    app.router.add_get(r'/records.{fmt:json|ndjson|csv}', handler)
+
+    return app
+
+
+def serve(host: str = '127.0.0.1', port: int = 8080, **kwargs) -> None:
+    """Run the stand-in API until interrupted; kwargs as make_app"""
+    web.run_app(make_app(**kwargs), host=host, port=port, print=None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--records', type=int, default=100)
+    parser.add_argument('--fields', type=int, default=8)
+    parser.add_argument('--total', type=int, default=10_000)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    serve(host=args.host,
+          port=args.port,
+          latency=args.latency,
+          jitter=args.jitter,
+          records=args.records,
+          fields=args.fields,
+          total=args.total,
+          error_rate=args.error_rate,
+          throttle_rate=args.throttle_rate,
+          seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
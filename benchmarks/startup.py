@@ -0,0 +1,123 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Startup Benchmarks
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import argparse
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from os import makedirs
+from os.path import dirname, join, realpath
+from typing import Any, Dict, List
+
+import rapidjson
+
+from benchmarks.bench import RESULTS_DIR, version
+
+# Run in a fresh interpreter per sample; nothing is imported before the clock starts.
+CHILD = '''
+import sys, time
+ts = time.perf_counter()
+from base_api_client import BaseApiClient
+imported = time.perf_counter()
+bac = BaseApiClient(cfg={'Options': {'SEM': 15}})
+constructed = time.perf_counter()
+
+import asyncio
+
+async def first_use():
+    ts = time.perf_counter()
+    async with bac:
+        bac.session
+        return time.perf_counter() - ts
+
+session = asyncio.run(first_use())
+
+import json
+print(json.dumps({'import':    imported - ts,
+            'construct': constructed - imported,
+            'session':   session,
+            'modules':   len(sys.modules),
+            'deferred':  sorted(m for m in ('aiofiles', 'toml', 'multiprocessing', 'concurrent.futures.process')
+                                if m in sys.modules)}))
+'''
+
+STAGES = ('import', 'construct', 'session')
+
+
+def sample() -> Dict[str, Any]:
+    out = subprocess.run([sys.executable, '-c', CHILD], capture_output=True, text=True, check=True,
+                         cwd=dirname(dirname(realpath(__file__))))
+    return rapidjson.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(runs: int) -> Dict[str, Any]:
+    """
+    Args:
+        runs (int): Fresh interpreters
+
+    Returns:
+        result (Dict[str, Any]): Median/min seconds per stage"""
+    samples: List[Dict[str, Any]] = [sample() for _ in range(runs)]
+
+    stages = {name: {'median': statistics.median(s[name] for s in samples),
+                     'min':    min(s[name] for s in samples)} for name in STAGES}
+
+    return {'stages': stages, 'modules': samples[-1]['modules'], 'loaded': samples[-1]['deferred']}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Import, construction and first-session time in fresh interpreters.')
+    parser.add_argument('--runs', type=int, default=20, help='Fresh interpreters to sample')
+    parser.add_argument('--label', default=None, help='Name for this run; Default: installed version')
+    parser.add_argument('--output', default=None, help='Result file; Default: benchmarks/results/startup-<label>.json')
+    parser.add_argument('--compare', default=None, help='Previous result file to compare against')
+    args = parser.parse_args()
+    args.label = args.label or version()
+
+    result = {'label':     args.label,
+              'timestamp': datetime.now(timezone.utc).isoformat(),
+              'python':    sys.version.split()[0],
+              'runs':      args.runs,
+              **measure(args.runs)}
+
+    print(f'Startup: {args.label} ({args.runs} runs, {result["modules"]} modules)')
+    print(f'{"stage":<14}{"median ms":>12}{"min ms":>12}')
+    for name, stage in result['stages'].items():
+        print(f'{name:<14}{stage["median"] * 1e3:>12.2f}{stage["min"] * 1e3:>12.2f}')
+    print(f'Optional modules loaded: {", ".join(result["loaded"]) or "none"}')
+
+    output = args.output or join(RESULTS_DIR, f'startup-{args.label}.json')
+    makedirs(dirname(realpath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        f.write(rapidjson.dumps(result, indent=2))
+    print(f'\nSaved: {output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = rapidjson.loads(f.read())
+
+        print(f'\nCompare: {previous["label"]} -> {args.label}')
+        for name, stage in result['stages'].items():
+            if old := previous['stages'].get(name, {}).get('median'):
+                print(f'{name:<14}{(stage["median"] - old) / old * 100:>+12.1f}%')
+
+
+if __name__ == '__main__':
+    main()
@@ -48,6 +48,10 @@ def main() -> NoReturn:
                        'Topic :: Internet :: WWW/HTTP'],
           description='Base API Client Library',
           entry_points={'console_scripts': []},
+          extras_require={'brotli':  ['brotli'],
+                          'msgpack': ['msgpack'],
+                          'uvloop':  ['uvloop'],
+                          'zstd':    ["backports.zstd; python_version < '3.14'"]},
           include_package_data=True,
           install_requires=['aiodns',
                             'aiofiles',
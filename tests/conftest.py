@@ -0,0 +1,64 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Fixtures
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+from contextlib import asynccontextmanager, AsyncExitStack
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+
+@asynccontextmanager
+async def local_server(routes: Iterable[web.RouteDef], app_kwargs: Optional[dict] = None, **kwargs) -> AsyncIterator[str]:
+    """Local aiohttp Server
+
+    Args:
+        routes (Iterable[web.RouteDef]): e.g. [web.get('/item', item)]
+        app_kwargs (Optional[dict]): Passed to web.Application
+        **kwargs: Passed to web.AppRunner
+
+    Returns:
+        url (AsyncIterator[str]): Base URL; e.g. http://127.0.0.1:8080"""
+    app = web.Application(**(app_kwargs or {}))
+    app.add_routes(routes)
+    runner = web.AppRunner(app, **kwargs)
+    await runner.setup()
+
+    try:
+        await web.TCPSite(runner, '127.0.0.1', 0).start()
+        yield f'http://127.0.0.1:{runner.addresses[0][1]}'
+    finally:
+        await runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def serve() -> AsyncIterator[Callable[..., Awaitable[str]]]:
+    """`url = await serve(routes, app_kwargs=None, **kwargs)`; see local_server. Servers stop after the test."""
+    async with AsyncExitStack() as stack:
+        async def start(routes: Iterable[web.RouteDef], app_kwargs: Optional[dict] = None, **kwargs) -> str:
+            return await stack.enter_async_context(local_server(routes, app_kwargs, **kwargs))
+
+        yield start
+
+
+@pytest.fixture
+def server() -> Callable:
+    """local_server, for tests that run their own event loop; `async with server(routes) as url:`"""
+    return local_server
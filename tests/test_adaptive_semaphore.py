@@ -0,0 +1,70 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Adaptive Semaphore
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import time
+
+import pytest
+
+from base_api_client import bprint
+from base_api_client.concurrency import AdaptiveSemaphore
+
+
+@pytest.mark.asyncio
+async def test_adaptive_semaphore():
+    ts = time.perf_counter()
+    bprint('Test: Adaptive Semaphore')
+
+    sem = AdaptiveSemaphore(initial=2, minimum=1, maximum=4)
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        async with sem:
+            peak = max(peak, sem.in_flight)
+            await asyncio.sleep(0.01)
+            sem.update(0.01, 200)
+
+    await asyncio.gather(*[work() for _ in range(50)])
+
+    assert sem.limit == 4
+    assert peak <= 4
+    assert sem.in_flight == 0
+
+    sem.update(0.01, 429)
+    assert sem.limit == 3
+
+    sem.update(0.01, timeout=True)  # Within the same round-trip; ignored
+    assert sem.limit == 3
+
+    for _ in range(10):
+        await asyncio.sleep(0.011)
+        sem.update(0.01, 503)
+    assert sem.limit == 1
+
+    sem = AdaptiveSemaphore(initial=10, maximum=10)
+    for _ in range(20):
+        sem.update(0.01, 200)
+    assert sem.limit == 10
+
+    sem.update(0.2, 200)  # Latency spike
+    assert sem.limit < 10
+
+    print('Limit:', sem.limit)
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
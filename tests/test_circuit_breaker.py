@@ -0,0 +1,110 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Circuit Breaker
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import time
+from typing import List, Tuple
+
+import pytest
+from aiohttp import ClientError, web
+
+from base_api_client import BaseApiClient, bprint, CircuitOpenError
+from base_api_client.breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN, RetryBudget
+
+
+def handlers() -> Tuple[List[web.RouteDef], dict]:
+    state = {'status': 500, 'hits': 0}
+
+    async def status(request: web.Request) -> web.Response:
+        state['hits'] += 1
+        await asyncio.sleep(0.01)
+        return web.json_response({'status': state['status']}, status=state['status'])
+
+    return [web.get('/status', status)], state
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker(serve):
+    ts = time.perf_counter()
+    bprint('Test: Circuit Breaker')
+
+    breaker = CircuitBreaker(failures=2, recovery=0.1, probes=1)
+    breaker.failure()
+    assert breaker.allow() and breaker.state == CLOSED
+    breaker.failure()
+    assert not breaker.allow() and breaker.state == OPEN
+    await asyncio.sleep(0.15)
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # One probe at a time
+    breaker.failure()
+    assert breaker.state == OPEN
+    await asyncio.sleep(0.15)
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == CLOSED
+
+    budget = RetryBudget(ratio=0.5, minimum=1, window=60)
+    assert budget.withdraw() and not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw() and not budget.withdraw() and budget.exhausted == 2
+
+    routes, state = handlers()
+    url = f'{await serve(routes)}/status'
+    cfg = {'CircuitBreaker': {'Enabled': True, 'Failures': 2, 'Recovery': 0.2},
+           'RetryBudget':    {'Enabled': True, 'Ratio': 0, 'Minimum': 0}}
+
+    async with BaseApiClient(cfg=cfg) as bac:
+        for _ in range(2):
+            with pytest.raises(ClientError):
+                await bac.request('get', url)
+        assert state['hits'] == 2 and bac.retry_budget.exhausted == 2
+
+        with pytest.raises(CircuitOpenError):
+            await bac.request('get', url)
+        assert state['hits'] == 2
+
+        state['status'] = 200
+        await asyncio.sleep(0.25)
+        result = await bac.request('get', url)
+        assert result['response'].status == 200 and bac.breakers.breaker(url).state == CLOSED
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_queued(serve):
+    ts = time.perf_counter()
+    bprint('Test: Circuit Breaker, Queued Requests')
+
+    routes, state = handlers()
+    url = f'{await serve(routes)}/status'
+    state['status'] = 503
+    cfg = {'Options':        {'SEM': 2},
+           'CircuitBreaker': {'Enabled': True, 'Failures': 2, 'Recovery': 60},
+           'RetryBudget':    {'Enabled': True, 'Ratio': 0, 'Minimum': 0}}
+
+    async with BaseApiClient(cfg=cfg) as bac:
+        results = await asyncio.gather(*[bac.request('get', url) for _ in range(40)], return_exceptions=True)
+
+        assert bac.breakers.breaker(url).state == OPEN
+        assert state['hits'] <= 2 + 1  # Failures, plus at most one request already in flight
+        assert sum(isinstance(r, CircuitOpenError) for r in results) >= 40 - state['hits']
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Coalesce
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint, tprint
+from base_api_client.models import Results
+
+
+@pytest.mark.asyncio
+async def test_coalesce():
+    ts = time.perf_counter()
+    bprint('Test: Coalesce')
+
+    async with BaseApiClient(cfg={'Options': {'Coalesce': True}}) as bac:
+        tasks = [asyncio.create_task(bac.request(method='get',
+                                                 end_point='http://openlibrary.org/search/lists.json',
+                                                 params={'limit':  5,
+                                                         'q':      'book',
+                                                         'offset': 0})) for _ in range(5)]
+        results = Results(data=await asyncio.gather(*tasks))
+
+        assert len({id(r['response']) for r in results.data}) == 1
+        assert len({r['request_id'] for r in results.data}) == 5
+        assert not bac.inflight
+
+        processed_results = await bac.process_results(results, data_key='docs')
+        assert not processed_results.failure
+        tprint(processed_results, top=5)
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_coalesce_local(serve):
+    ts = time.perf_counter()
+    bprint('Test: Coalesce, Local Server')
+
+    hits = []
+
+    async def docs(request: web.Request) -> web.Response:
+        hits.append(request.query['q'])
+        await asyncio.sleep(0.1)  # Keep the first request in flight while the others arrive
+        return web.json_response({'docs': [{'q': request.query['q'], 'i': i} for i in range(3)]})
+
+    routes = [web.get('/docs', docs)]
+    url = f'{await serve(routes)}/docs'
+
+    async with BaseApiClient(cfg={'Options': {'Coalesce': True}}) as bac:
+        tasks = [asyncio.create_task(bac.request('get', url, params={'q': 'book'})) for _ in range(10)]
+        tasks.append(asyncio.create_task(bac.request('get', url, params={'q': 'other'})))
+        results = Results(data=await asyncio.gather(*tasks))
+
+        assert sorted(hits) == ['book', 'other']
+        assert len({r['request_id'] for r in results.data}) == 11
+        assert not bac.inflight
+
+        processed_results = await bac.process_results(results, data_key='docs')
+        assert not processed_results.failure and len(processed_results.success) == 33
+
+        await asyncio.gather(*[bac.request('get', url, params={'q': 'book'}, preload=True) for _ in range(10)])
+        assert hits.count('book') == 2
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Compact Results
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import time
+from array import array
+
+import pytest
+
+from base_api_client import bprint, ColumnarResults, CompactResults
+
+
+@pytest.mark.asyncio
+async def test_compact_results():
+    ts = time.perf_counter()
+    bprint('Test: Compact Results')
+
+    batches = {'a': [{'id': 3, 'score': 1.5, 'name': 'c'}, {'id': 1, 'score': 0.5, 'name': None}],
+               'b': [{'id': 2, 'score': 2.5, 'name': 'b', 'extra': True}]}
+    expected = [{**{k: v for k, v in rec.items() if v is not None}, 'request_id': rid}
+                for rid, recs in batches.items() for rec in recs]
+
+    for cls in (CompactResults, ColumnarResults):
+        results = cls()
+        for rid, recs in batches.items():
+            results.add(recs, rid)
+
+        assert len(results) == 3
+        assert results.request_ids == ['a', 'b']
+        assert results.request_id(1) == 'a'
+        assert [{k: v for k, v in r.items() if v is not None} for r in results.success] == expected
+
+        results.sort(key='id', reverse=True)
+        assert [(rid, rec['id']) for rid, rec in results] == [('a', 3), ('b', 2), ('a', 1)]
+
+        results.cleanup()
+        assert results.success[-1] == {'id': 1, 'score': 0.5}
+
+    results = ColumnarResults()
+    results.add([{'id': i, 'score': i / 2} for i in range(1000)], 'a')
+    assert isinstance(results.columns['id'], array)
+    assert isinstance(results.columns['score'], array)
+
+    results.add([{'id': None, 'score': 'n/a'}], 'b')
+    assert type(results.columns['id']) is list
+    assert results.record(1000) == {'id': None, 'score': 'n/a'}
+
+    records = [{'id': 1, 'flag': True, 'score': 1.5, 'big': 2 ** 53 + 1},
+               {'id': True, 'flag': 1, 'score': 2, 'big': 2 ** 70},
+               {'id': 3, 'flag': False, 'score': 2.5, 'big': -1}]
+    results = ColumnarResults()
+    results.add(records, 'c')
+    for i, rec in enumerate(records):
+        assert [(k, type(v)) for k, v in results.record(i).items()] == [(k, type(v)) for k, v in rec.items()]
+        assert results.record(i) == rec
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
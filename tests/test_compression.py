@@ -0,0 +1,95 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Compression
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import gzip
+import time
+from typing import List, Tuple
+
+import pytest
+import rapidjson
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint
+from base_api_client.compression import accept_encoding, Compression
+
+
+def handlers() -> Tuple[List[web.RouteDef], list]:
+    received = []
+
+    async def echo(request: web.Request) -> web.Response:
+        body = await request.read()
+        received.append((request.headers.get('Content-Encoding'), request.headers.get('Accept-Encoding'), body))
+        if request.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+
+        response = web.Response(body=body, content_type='application/json')
+        response.enable_compression(web.ContentCoding.gzip)
+        return response
+
+    return [web.post('/echo', echo)], received
+
+
+@pytest.mark.asyncio
+async def test_compression(serve):
+    ts = time.perf_counter()
+    bprint('Test: Compression')
+
+    assert Compression.from_config({}) is None
+    assert Compression.from_config({'Compression': {'Enabled': True, 'Level': -1}}).level is None
+    assert accept_encoding().endswith('gzip, deflate')
+    with pytest.raises(NotImplementedError):
+        Compression(encoding='lzma')
+
+    compression = Compression(encoding='deflate', threshold=100)
+    assert compression.compress(b'x' * 99) is None
+    assert compression.compress('x' * 1000) and compression.ratio < 0.1
+
+    routes, received = handlers()
+    url = f'{await serve(routes, auto_decompress=False)}/echo'  # See the request body as sent
+    docs = [{'key': f'/works/OL{i}W', 'title': 'A Title', 'year': 1900 + i} for i in range(500)]
+
+    async with BaseApiClient(cfg={'Compression': {'Enabled': True, 'Threshold': 1024}}) as bac:
+        result = await bac.request('post', url, json={'docs': docs[:1]}, preload=True)
+        encoding, accept, body = received.pop()
+        assert encoding is None and accept == bac.compression.accept and rapidjson.loads(body) == {'docs': docs[:1]}
+        assert result['response'].payload == {'docs': docs[:1]}
+
+        result = await bac.request('post', url, json={'docs': docs}, preload=True)
+        encoding, _, body = received.pop()
+        assert encoding == 'gzip' and rapidjson.loads(gzip.decompress(body)) == {'docs': docs}
+        assert result['response'].payload == {'docs': docs}
+
+        stats = bac.compression.stats
+        assert stats['requests'] == 2 and stats['compressed'] == 1 and bac.compression.ratio < 0.5
+        assert stats['responses'] == 2 and bac.compression.response_ratio < 0.5
+
+    cfg = {'Compression': {'Enabled': True, 'Compress_Requests': False, 'Threshold': 1024}}
+    async with BaseApiClient(cfg=cfg) as bac:
+        result = await bac.request('post', url, json={'docs': docs}, preload=True)
+        encoding, accept, body = received.pop()
+        assert encoding is None and accept == bac.compression.accept and rapidjson.loads(body) == {'docs': docs}
+        assert result['response'].payload == {'docs': docs} and bac.compression.stats['requests'] == 0
+
+    cfg = {'Compression': {'Enabled': True, 'Negotiate_Responses': False, 'Accept_Encoding': 'zstd', 'Threshold': 1024}}
+    async with BaseApiClient(cfg=cfg) as bac:
+        await bac.request('post', url, json={'docs': docs}, preload=True)
+        encoding, accept, _ = received.pop()
+        assert encoding == 'gzip' and accept != 'zstd'
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Connection Config
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import time
+
+import pytest
+
+from base_api_client import BaseApiClient, bprint
+
+
+@pytest.mark.asyncio
+async def test_connection_config():
+    ts = time.perf_counter()
+    bprint('Test: Connection Config')
+
+    cfg = {'Connection': {'Limit':             50,
+                          'Limit_Per_Host':    10,
+                          'Force_Close':       True,
+                          'TTL_DNS_Cache':     300,
+                          'Timeout_Total':     60,
+                          'Timeout_Connect':   5,
+                          'Timeout_Sock_Read': 0}}
+
+    async with BaseApiClient(cfg=cfg) as bac:
+        assert bac.session.connector.limit == 50
+        assert bac.session.connector.limit_per_host == 10
+        assert bac.session.connector.force_close
+        assert bac.session.timeout.total == 60
+        assert bac.session.timeout.connect == 5
+        assert bac.session.timeout.sock_read is None
+
+    async with BaseApiClient() as bac:
+        assert bac.session.connector.limit == 100
+        assert bac.session.timeout.total == 300
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
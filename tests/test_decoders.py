@@ -0,0 +1,66 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Decoders
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import time
+
+import pytest
+
+from base_api_client import BaseApiClient, bprint, Response
+from base_api_client.decoders import decode_csv, decode_json, decode_ndjson, decode_text_plain, DECODERS, find_decoder
+
+
+def response(content_type: str, body: bytes) -> Response:
+    return Response(method='get', url='http://openlibrary.org/', status=200, headers={'Content-Type': content_type}.items(),
+                    body=body)
+
+
+@pytest.mark.asyncio
+async def test_decoders():
+    ts = time.perf_counter()
+    bprint('Test: Decoders')
+
+    assert find_decoder(DECODERS, 'application/json; charset=utf-8') is decode_json
+    assert find_decoder(DECODERS, 'application/vnd.api+json') is decode_json
+    assert find_decoder(DECODERS, 'application/x-ndjson') is decode_ndjson
+    assert find_decoder(DECODERS, 'text/plain; charset=utf-8') is decode_text_plain
+    assert find_decoder(DECODERS, 'application/xml') is None
+
+    assert await decode_ndjson(response('application/x-ndjson', b'{"a": 1}\n\n{"a": 2}\n')) == [{'a': 1}, {'a': 2}]
+    assert await decode_csv(response('text/csv', b'id,name\n1,"multi\nline"\n2,b\n')) == \
+           [{'id': '1', 'name': 'multi\nline'}, {'id': '2', 'name': 'b'}]
+
+    async with BaseApiClient() as bac:
+        with pytest.raises(NotImplementedError):
+            await bac.decode_response(response('application/xml', b'<docs/>'))
+
+        async def decode_xml(resp):
+            return {'text_xml': await resp.text()}
+
+        bac.register_decoder('application/xml', decode_xml)
+        assert await bac.decode_response(response('application/xml', b'<docs/>')) == {'text_xml': '<docs/>'}
+        assert 'application/xml' not in BaseApiClient.DECODERS
+
+    try:
+        import msgpack
+        body = msgpack.packb({'docs': [1, 2]})
+        assert await find_decoder(DECODERS, 'application/msgpack')(response('application/msgpack', body)) == {'docs': [1, 2]}
+    except ImportError:
+        pass
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
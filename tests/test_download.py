@@ -0,0 +1,89 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Download
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import hashlib
+import time
+from os.path import exists
+from typing import List, Tuple
+
+import pytest
+from aiohttp import ClientPayloadError, web
+
+from base_api_client import BaseApiClient, bprint
+
+
+def handlers(file_path: str) -> Tuple[List[web.RouteDef], list]:
+    ranges = []
+
+    async def file(request: web.Request) -> web.StreamResponse:
+        ranges.append(request.headers.get('Range'))
+        return web.FileResponse(file_path, chunk_size=64 * 1024)
+
+    async def flaky(request: web.Request) -> web.StreamResponse:
+        ranges.append(request.headers.get('Range'))
+        if request.headers.get('Range'):
+            return web.FileResponse(file_path)
+
+        data = open(file_path, 'rb').read()
+        response = web.StreamResponse(headers={'Content-Length': str(len(data))})
+        await response.prepare(request)
+        await response.write(data[:len(data) // 3])
+        request.transport.close()  # Drop the connection mid-body
+        return response
+
+    return [web.get('/file', file), web.get('/flaky', flaky)], ranges
+
+
+@pytest.mark.asyncio
+async def test_download(tmp_path, serve):
+    ts = time.perf_counter()
+    bprint('Test: Download')
+
+    src = tmp_path / 'src.bin'
+    content = bytes(range(256)) * 20_000
+    src.write_bytes(content)
+    sha256 = f'sha256:{hashlib.sha256(content).hexdigest()}'
+
+    routes, ranges = handlers(str(src))
+    base = await serve(routes)
+    dest = tmp_path / 'dest.bin'
+
+    async with BaseApiClient(cfg={'Options': {'Download_Chunk_Size': 256 * 1024}}) as bac:
+        result = await bac.download(f'{base}/file', str(dest), checksum=sha256)
+        assert dest.read_bytes() == content and not exists(f'{dest}.part')
+        assert result['bytes'] == len(content) and result['segments'] == 1 and ranges.pop() is None
+
+        (tmp_path / 'dest.bin.part').write_bytes(content[:1_000_000])
+        result = await bac.download(f'{base}/file', str(dest))
+        assert dest.read_bytes() == content and result['resumed'] == 1_000_000
+        assert ranges.pop() == 'bytes=1000000-'
+
+        result = await bac.download(f'{base}/file', str(dest), segments=4, checksum=sha256)
+        assert dest.read_bytes() == content and result['segments'] == 4
+        assert len(ranges) == 5 and all(r.startswith('bytes=') for r in ranges[1:])
+        ranges.clear()
+
+        result = await bac.download(f'{base}/flaky', str(dest), checksum=sha256)
+        assert dest.read_bytes() == content and ranges[0] is None and ranges[1].startswith('bytes=')
+
+        with pytest.raises(ClientPayloadError):
+            await bac.download(f'{base}/file', str(dest), checksum='sha256:00')
+        assert not exists(f'{dest}.part')
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Flight Recorder
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import time
+from typing import List, Tuple
+
+import pytest
+import rapidjson
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint
+from base_api_client.recorder import FlightRecorder
+
+
+def handlers() -> Tuple[List[web.RouteDef], dict]:
+    state = {'fail': 1}
+
+    async def item(request: web.Request) -> web.Response:
+        if state['fail']:
+            state['fail'] -= 1
+            return web.Response(text='upstream exploded' * 100, status=502)
+        return web.json_response({'ok': True})
+
+    return [web.get('/item', item)], state
+
+
+@pytest.mark.asyncio
+async def test_flight_recorder(tmp_path, caplog, serve):
+    ts = time.perf_counter()
+    bprint('Test: Flight Recorder')
+
+    recorder = FlightRecorder(size=3, sample=0)
+    for i in range(5):
+        recorder.record('get', f'http://example.com/{i}', 200, 0.1)
+    recorder.record('get', 'http://example.com/error', error=ConnectionResetError())
+    assert [r['url'] for r in recorder.dump()] == ['http://example.com/error']
+
+    for i in range(5):
+        recorder.record('post', f'http://example.com/{i}', 500, 0.1, body=b'x' * 1000)
+    assert len(recorder.dump()) == 3 and len(recorder.dump()[-1]['body']) == 256
+
+    routes, state = handlers()
+    url = f'{await serve(routes)}/item'
+    path = tmp_path / 'flight.jsonl'
+    cfg = {'FlightRecorder': {'Enabled': True, 'Body_Bytes': 17, 'Path': str(path)}}
+
+    async with BaseApiClient(cfg=cfg) as bac:
+        for _ in range(3):
+            result = await bac.request('get', url, preload=True)
+            assert result['response'].payload == {'ok': True}
+
+        records = bac.recorder.dump()
+        assert [r['status'] for r in records] == [502, 200, 200, 200]
+        assert records[0]['body'] == 'upstream exploded' and records[1]['body'] == '{"ok": true}'
+        assert all(r['method'] == 'GET' and r['url'] == url and r['elapsed'] > 0 for r in records)
+
+        await bac.recorder.pending  # Failure dump runs in the default executor
+        dumped = [rapidjson.loads(line) for line in path.read_text().splitlines()]
+        assert [r['status'] for r in dumped] == [502]
+
+    state['fail'] = 1
+    cfg['FlightRecorder']['Path'] = str(tmp_path)  # A directory; the dump fails
+    async with BaseApiClient(cfg=cfg) as bac:
+        await bac.request('get', url, preload=True)
+        await asyncio.wait({bac.recorder.pending})
+        assert f'dump to {tmp_path} failed' in caplog.text
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
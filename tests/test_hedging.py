@@ -0,0 +1,108 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Hedging
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import time
+from typing import List, Tuple
+
+import pytest
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint
+from base_api_client.hedging import LatencyWindow
+
+
+def handlers() -> Tuple[List[web.RouteDef], dict]:
+    state = {'stall': 0, 'hits': 0, 'cancelled': 0, 'delay': 0}
+
+    async def item(request: web.Request) -> web.Response:
+        state['hits'] += 1
+        if state['stall']:
+            state['stall'] -= 1
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:  # The client dropped the losing request
+                state['cancelled'] += 1
+                raise
+        await asyncio.sleep(state['delay'])
+        return web.json_response({'ok': True})
+
+    return [web.get('/item', item)], state
+
+
+@pytest.mark.asyncio
+async def test_hedging(serve):
+    ts = time.perf_counter()
+    bprint('Test: Hedging')
+
+    window = LatencyWindow(size=100)
+    assert window.percentile(99) is None
+    for i in range(1, 201):
+        window.add(i)
+    assert len(window) == 100 and window.percentile(50) == 150 and window.percentile(100) == 200
+
+    routes, state = handlers()
+    url = f'{await serve(routes, handler_cancellation=True)}/item'
+    cfg = {'Hedging': {'Enabled': True, 'Percentile': 90, 'Max_Ratio': 0.05, 'Min_Samples': 5}}
+
+    async with BaseApiClient(cfg=cfg) as bac:
+        for _ in range(10):
+            (await bac.request('get', url))['response'].release()
+        assert bac.hedger.stats['hedged'] == 0
+
+        state['stall'] = 1
+        t = time.perf_counter()
+        result = await bac.request('get', url, preload=True)
+        assert time.perf_counter() - t < 2 and result['response'].payload == {'ok': True}
+        assert bac.hedger.stats['hedged'] == 1 and bac.hedger.stats['hedge_wins'] == 1
+        await asyncio.sleep(0.1)
+        assert state['cancelled'] == 1
+
+        state['stall'] = 1  # Over the 5% cap; waits for the stalled request
+        t = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(bac.request('get', url), timeout=1)
+        assert bac.hedger.stats['capped'] == 1 and bac.hedger.stats['hedged'] == 1
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_hedging_queued(serve):
+    ts = time.perf_counter()
+    bprint('Test: Hedging; Queued Requests')
+
+    routes, state = handlers()
+    url = f'{await serve(routes, handler_cancellation=True)}/item'
+    state['delay'] = 0.1
+    cfg = {'Options': {'SEM': 1}, 'Hedging': {'Enabled': True, 'Percentile': 90, 'Max_Ratio': 1, 'Min_Samples': 5}}
+
+    async with BaseApiClient(cfg=cfg) as bac:
+        for _ in range(5):
+            (await bac.request('get', url))['response'].release()
+
+        # ~50ms on the wire, well under the ~100ms hedge delay, but each waits up to 4 x 50ms for the one slot
+        state['delay'] = 0.05
+        for result in await asyncio.gather(*[bac.request('get', url) for _ in range(5)]):
+            result['response'].release()
+
+        assert bac.hedger.stats['requests'] == 10 and bac.hedger.stats['hedged'] == 0
+        assert max(bac.hedger.window_for(url).samples) < 0.15
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
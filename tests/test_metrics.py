@@ -0,0 +1,72 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Metrics
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import time
+from typing import List, Tuple
+
+import pytest
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint
+from base_api_client.metrics import Histogram
+
+
+def handlers() -> Tuple[List[web.RouteDef], dict]:
+    state = {'fail': 1}
+
+    async def item(request: web.Request) -> web.Response:
+        if state['fail']:
+            state['fail'] -= 1
+            raise web.HTTPServiceUnavailable()
+        return web.json_response({'ok': True})
+
+    return [web.get('/item', item)], state
+
+
+@pytest.mark.asyncio
+async def test_metrics(serve):
+    ts = time.perf_counter()
+    bprint('Test: Metrics')
+
+    histogram = Histogram(buckets=(0.1, 0.2, 0.5, 1.0))
+    for value in (0.05, 0.15, 0.15, 0.3, 2.0):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 0, 1] and histogram.count == 5
+    assert 0.1 <= histogram.percentile(50) <= 0.2
+    assert histogram.percentile(100) == 2.0 and Histogram().percentile(50) is None
+
+    routes, _ = handlers()
+    url = f'{await serve(routes)}/item'
+
+    async with BaseApiClient(cfg={'Metrics': {'Enabled': True}}) as bac:
+        for _ in range(5):
+            result = await bac.request('get', url, preload=True)
+            assert result['response'].payload == {'ok': True}
+
+        summary = bac.metrics.summary()[url.split('://', 1)[1]]
+        assert summary['retries'] == {'count': 1}
+        assert summary['request']['count'] == 6 and summary['semaphore']['count'] == 6
+        assert summary['connect']['count'] >= 1 and summary['body']['count'] == 5 and summary['decode']['count'] == 5
+        assert 0 < summary['ttfb']['p50'] <= summary['ttfb']['p99'] <= summary['ttfb']['max']
+
+        exported = bac.metrics.openmetrics()
+        assert exported.startswith('# TYPE base_api_client_phase_seconds histogram\n') and exported.endswith('# EOF\n')
+        assert 'phase="ttfb",le="+Inf"} 6' in exported and 'base_api_client_retries_total{endpoint=' in exported
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
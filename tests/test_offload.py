@@ -0,0 +1,83 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Offload
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import time
+from typing import List
+
+import pytest
+import rapidjson
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint
+from base_api_client.models import CompactResults, Results
+from base_api_client.offload import Offload
+from base_api_client.streaming import loads_document
+
+
+def handlers() -> List[web.RouteDef]:
+    async def records(request: web.Request) -> web.Response:
+        offset = int(request.query.get('offset', 0))
+        return web.json_response({'total': 30,
+                                  'docs':  [{'id': i, 'name': f'record {i}', 'empty': None} for i in range(offset, offset + 10)]})
+
+    return [web.get('/records', records)]
+
+
+@pytest.mark.asyncio
+async def test_offload(serve):
+    ts = time.perf_counter()
+    bprint('Test: Offload')
+
+    doc = {'total': 2, 'docs': [{'a': [1, 2.5, None], 'b': 'ü'}, {}], 'meta': {'next': None}}
+    body = rapidjson.dumps(doc, ensure_ascii=False).encode()
+    assert loads_document(body, 'docs') == rapidjson.loads(body) == doc
+    assert loads_document(b' [ 1 , {"a" : [ ] } ] ') == [1, {'a': []}]
+    with pytest.raises(ValueError):
+        loads_document(b'[1, 2')
+
+    assert Offload.from_config({'Offload': {'Enabled': False}}) is None
+    with pytest.raises(NotImplementedError):
+        Offload(executor='fiber')
+
+    url = f'{await serve(handlers())}/records'
+
+    def strip(records: list) -> list:
+        return [{k: v for k, v in rec.items() if k != 'request_id'} for rec in records]
+
+    async def run(bac: BaseApiClient, results: Results) -> Results:
+        results.data = [await bac.request('get', url, params={'offset': o}) for o in range(0, 30, 10)]
+        return await bac.process_results(results, data_key='docs', cleanup=True)
+
+    async with BaseApiClient() as bac:
+        expected = strip((await run(bac, Results(data=[]))).success)
+
+    for executor in ('thread', 'process'):
+        cfg = {'Offload': {'Enabled': True, 'Threshold': 100, 'Cleanup_Records': 10, 'Executor': executor}}
+        async with BaseApiClient(cfg=cfg) as bac:
+            assert strip((await run(bac, Results(data=[]))).success) == expected
+            assert bac.offload._pool is not None and bac.offload._threads is not None
+
+            compact = await run(bac, CompactResults(data=[]))
+            assert strip([rec for _, rec in compact]) == expected
+
+        assert bac.offload._pool is None
+
+    assert 'empty' not in expected[0] and len(expected) == 30
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Paginate
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import time
+from typing import List, Tuple
+
+import pytest
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint, Pagination
+
+TOTAL = 23
+
+
+def handlers() -> Tuple[List[web.RouteDef], dict]:
+    state = {'hits': [], 'active': 0, 'peak': 0}
+
+    async def page(request: web.Request) -> web.Response:
+        state['active'] += 1
+        state['peak'] = max(state['peak'], state['active'])
+        try:
+            await asyncio.sleep(0.05)
+            limit = int(request.query['limit'])
+            offset = int(request.query.get('offset') or request.query.get('cursor') or 0)
+            state['hits'].append(offset)
+            pad = 'x' * int(request.query.get('pad', 0))  # Large pages keep unread connections acquired
+            docs = [{'id': i, 'pad': pad} for i in range(offset, min(offset + limit, TOTAL))]
+            body = {'docs': docs}
+
+            if request.query.get('total'):
+                body['meta'] = {'total': TOTAL}
+
+            if offset + limit < TOTAL:
+                body['next'] = str(offset + limit)
+                headers = {'Link': f'<{request.url.with_query({**request.query, "offset": offset + limit})}>; rel="next"'}
+            else:
+                headers = {}
+
+            return web.json_response(body, headers=headers)
+        finally:
+            state['active'] -= 1
+
+    return [web.get('/page', page)], state
+
+
+@pytest.mark.asyncio
+async def test_paginate():
+    ts = time.perf_counter()
+    bprint('Test: Paginate')
+
+    async with BaseApiClient() as bac:
+        failure = []
+        records = [rec async for rec in bac.paginate(end_point='http://openlibrary.org/search/lists.json',
+                                                     pagination=Pagination(limit=5, max_pages=3),
+                                                     data_key='docs',
+                                                     params={'q': 'book'},
+                                                     failure=failure)]
+
+        assert 0 < len(records) <= 15
+        assert not failure
+        print(*records[:5], sep='\n')
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_paginate_strategies(serve):
+    ts = time.perf_counter()
+    bprint('Test: Paginate, Strategies')
+
+    routes, state = handlers()
+    url = f'{await serve(routes)}/page'
+
+    async with BaseApiClient() as bac:
+        # Offset with a known total; the remaining pages are fanned out after the first
+        failure = []
+        records = [rec async for rec in bac.paginate(url, Pagination(limit=5, total_key='meta.total'), 'docs',
+                                                     params={'total': 1}, failure=failure)]
+        assert sorted(r['id'] for r in records) == list(range(TOTAL)) and not failure
+        assert state['hits'][0] == 0 and sorted(state['hits']) == [0, 5, 10, 15, 20] and state['peak'] > 1
+
+        # Offset without a total; walks until a short page, prefetch pages in flight
+        state.update(hits=[], peak=0)
+        records = [rec async for rec in bac.paginate(url, Pagination(limit=5, prefetch=2), 'docs')]
+        assert [r['id'] for r in records] == list(range(TOTAL))
+        assert sorted(state['hits']) == [0, 5, 10, 15, 20] and state['peak'] == 2
+
+        state.update(hits=[], peak=0)
+        records = [rec async for rec in bac.paginate(url, Pagination(limit=5, max_pages=2), 'docs')]
+        assert [r['id'] for r in records] == list(range(10)) and sorted(state['hits']) == [0, 5]
+
+        # Cursor
+        state.update(hits=[], peak=0)
+        records = [rec async for rec in bac.paginate(url, Pagination('cursor', limit=5), 'docs')]
+        assert [r['id'] for r in records] == list(range(TOTAL)) and state['hits'] == [0, 5, 10, 15, 20]
+
+        # Link
+        state.update(hits=[], peak=0)
+        records = [rec async for rec in bac.paginate(url, Pagination('link', limit=5), 'docs')]
+        assert [r['id'] for r in records] == list(range(TOTAL)) and state['hits'] == [0, 5, 10, 15, 20]
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_paginate_early_exit(serve):
+    ts = time.perf_counter()
+    bprint('Test: Paginate, Early Exit')
+
+    routes, state = handlers()
+    url = f'{await serve(routes)}/page'
+
+    async with BaseApiClient() as bac:
+        for pagination, params in ((Pagination(limit=5, total_key='meta.total'), {'total': 1}),
+                                   (Pagination(limit=5, prefetch=2), {}),
+                                   (Pagination('cursor', limit=5), {}),
+                                   (Pagination('link', limit=5), {})):
+            state['hits'] = []
+            records = bac.paginate(url, pagination, 'docs', params={**params, 'pad': 1_000_000})
+            assert (await records.__anext__())['id'] == 0
+
+            await asyncio.sleep(0.2)  # Let pages in flight complete unconsumed
+            await records.aclose()
+            if not pagination.total_key:  # Otherwise every page is already requested
+                assert len(state['hits']) < 5, pagination.strategy
+            assert not bac.session.connector._acquired, pagination.strategy
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
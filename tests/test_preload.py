@@ -0,0 +1,99 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Preload
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint, Response, tprint
+from base_api_client.models import Results
+
+
+@pytest.mark.asyncio
+async def test_preload():
+    ts = time.perf_counter()
+    bprint('Test: Preload')
+
+    async with BaseApiClient(cfg={'Options': {'Preload': True}}) as bac:
+        tasks = [asyncio.create_task(bac.request(method='get',
+                                                 end_point='http://openlibrary.org/search/lists.json',
+                                                 params={'limit':  5,
+                                                         'q':      'book',
+                                                         'offset': 0}))]
+        results = Results(data=await asyncio.gather(*tasks))
+
+        response = results.data[0]['response']
+        assert type(response) is Response
+        assert response.payload is not None
+        assert response.elapsed > 0
+
+        processed_results = await bac.process_results(results, data_key='docs')
+        assert processed_results.success
+        assert not processed_results.failure
+        tprint(processed_results, top=5)
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_preload_releases(serve):
+    ts = time.perf_counter()
+    bprint('Test: Preload, Connection Release')
+
+    docs = [{'i': i, 'pad': 'x' * 100} for i in range(50_000)]  # Large enough to stay acquired while unread
+
+    async def json_docs(request: web.Request) -> web.Response:
+        return web.json_response({'docs': docs})
+
+    async def text(request: web.Request) -> web.Response:
+        return web.Response(text='x' * 5_000_000, status=int(request.query.get('status', 200)))
+
+    url = await serve([web.get('/docs', json_docs), web.get('/text', text)])
+
+    async with BaseApiClient(cfg={'Options': {'Preload': True}}) as bac:
+        connector = bac.session.connector
+
+        result = await bac.request('get', f'{url}/docs', preload=False)
+        assert connector._acquired  # Unread, not preloaded
+        result['response'].release()
+        assert not connector._acquired
+
+        for end_point, params in (('/docs', None), ('/text', None), ('/text', {'status': 404})):
+            result = await bac.request('get', f'{url}{end_point}', params=params)
+            assert type(result['response']) is Response and (result['response'].body or result['response'].payload)
+            assert not connector._acquired, end_point
+
+        results = await asyncio.gather(*[bac.request('get', f'{url}/docs') for _ in range(4)])
+        assert not connector._acquired
+        assert all(len(r['response'].payload['docs']) == len(docs) for r in results)
+
+        response = results[0]['response']  # Not cached, so only the payload was kept
+        assert response.dropped and (await response.json())['docs'] == docs
+        with pytest.raises(RuntimeError):
+            await response.read()
+        with pytest.raises(RuntimeError):
+            await response.text()
+
+    async with BaseApiClient(cfg={'Options': {'Preload': True}, 'ResponseCache': {'Enabled': True}}) as bac:
+        response = (await bac.request('get', f'{url}/text'))['response']
+        assert not response.dropped and await response.text() == 'x' * 5_000_000
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Rate Limit
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import time
+
+import pytest
+
+from base_api_client import bprint
+from base_api_client.ratelimit import parse_reset, parse_retry_after, RateLimiter, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_rate_limit():
+    ts = time.perf_counter()
+    bprint('Test: Rate Limit')
+
+    bucket = TokenBucket(rate=20, burst=1)
+    t = time.perf_counter()
+    await asyncio.gather(*[bucket.acquire() for _ in range(11)])
+    assert 0.45 <= time.perf_counter() - t < 0.75
+
+    bucket.update(429, {'Retry-After': '0.3'})
+    t = time.perf_counter()
+    await bucket.acquire()
+    assert time.perf_counter() - t >= 0.25
+
+    bucket.update(200, {'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': '2'})
+    assert bucket.rate == 5
+
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+    assert parse_retry_after('120') == 120
+    assert parse_reset(str(time.time() + 30)) == pytest.approx(30, abs=1)
+
+    limiter = RateLimiter(rate=10, endpoints={'/search/*': {'Rate': 1}})
+    assert limiter.bucket('http://openlibrary.org/search/lists.json').rate == 1
+    assert limiter.bucket('http://openlibrary.org/authors/OL1A.json').rate == 10
+    assert len(limiter.buckets) == 2
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
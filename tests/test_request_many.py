@@ -0,0 +1,128 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Request Many
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import time
+from typing import Iterator, List, Tuple
+
+import pytest
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint
+
+
+def handlers() -> Tuple[List[web.RouteDef], dict]:
+    state = {'active': 0, 'peak': 0}
+
+    async def item(request: web.Request) -> web.Response:
+        state['active'] += 1
+        state['peak'] = max(state['peak'], state['active'])
+        try:
+            await asyncio.sleep(0.02)
+            return web.json_response({'docs': [{'i': int(request.query['i'])}]})
+        finally:
+            state['active'] -= 1
+
+    return [web.get('/item', item)], state
+
+
+def specs(url: str, n: int, pulled: list) -> Iterator[dict]:
+    for i in range(n):
+        pulled.append(i)
+        yield {'method': 'get', 'end_point': url, 'params': {'i': i}}
+
+
+def leftover() -> list:
+    """feed/work tasks still alive"""
+    return [t for t in asyncio.all_tasks() if t.get_coro().__qualname__.startswith('BaseApiClient.request_many')]
+
+
+@pytest.mark.asyncio
+async def test_request_many():
+    ts = time.perf_counter()
+    bprint('Test: Request Many')
+
+    async with BaseApiClient() as bac:
+        requests = ({'method':    'get',
+                     'end_point': 'http://openlibrary.org/search/lists.json',
+                     'params':    {'limit': 5, 'q': 'book', 'offset': offset}} for offset in range(0, 20, 5))
+        failure = []
+        records = [rec async for rec in bac.request_many(requests, data_key='docs', failure=failure, workers=2)]
+
+        assert records
+        assert not failure
+        assert len({rec['request_id'] for rec in records}) <= 4
+        print(*records[:5], sep='\n')
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_request_many_bounded(serve):
+    ts = time.perf_counter()
+    bprint('Test: Request Many, Bounded')
+
+    routes, state = handlers()
+    url = f'{await serve(routes)}/item'
+
+    async with BaseApiClient(cfg={'Options': {'SEM': 4}}) as bac:
+        for workers in (3, None):
+            state['peak'], pulled = 0, []
+            records = bac.request_many(specs(url, 40, pulled), data_key='docs', workers=workers)
+            first = await records.__anext__()
+            assert len(pulled) <= 3 * (workers or 4) + 1  # Consumed lazily
+
+            rest = [rec async for rec in records]
+            assert sorted(r['i'] for r in [first, *rest]) == list(range(40))
+            assert state['peak'] == (workers or 4), workers
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_request_many_early_exit(serve):
+    ts = time.perf_counter()
+    bprint('Test: Request Many, Early Exit')
+
+    routes, _ = handlers()
+    url = f'{await serve(routes)}/item'
+
+    async with BaseApiClient() as bac:
+        pulled = []
+        records = bac.request_many(specs(url, 1000, pulled), data_key='docs', workers=3)
+        assert 'i' in await records.__anext__()
+        await asyncio.sleep(0.1)  # Let the bounded queues fill up
+        await records.aclose()
+        assert not leftover() and len(pulled) < 20
+        assert not bac.session.connector._acquired
+
+        requests = [*specs(url, 10, []), {'method': 'trace', 'end_point': url}, *specs(url, 10, [])]
+        with pytest.raises(NotImplementedError):
+            _ = [rec async for rec in bac.request_many(requests, data_key='docs', workers=3)]
+        assert not leftover()
+
+        def failing() -> Iterator[dict]:
+            yield from specs(url, 5, [])
+            raise ValueError('bad spec')
+
+        with pytest.raises(ValueError):
+            _ = [rec async for rec in bac.request_many(failing(), data_key='docs', workers=3)]
+        assert not leftover()
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Response Cache
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import time
+from typing import List, Tuple
+
+import pytest
+from aiohttp import web
+from multidict import CIMultiDict
+
+from base_api_client import BaseApiClient, bprint
+from base_api_client.cache import CacheEntry, DiskCache, expiration, MemoryCache, NOT_STORABLE, ResponseCache
+
+
+@pytest.mark.asyncio
+async def test_response_cache(tmp_path):
+    ts = time.perf_counter()
+    bprint('Test: Response Cache')
+
+    assert expiration({'Cache-Control': 'no-store'}) == NOT_STORABLE
+    assert expiration({'Vary': 'Accept, *', 'Cache-Control': 'max-age=60'}) == NOT_STORABLE
+    assert expiration(CIMultiDict([('Vary', 'Accept'), ('Vary', '*'), ('Cache-Control', 'max-age=60')])) == NOT_STORABLE
+    assert expiration({'Cache-Control': 'no-cache', 'ETag': '"a"'}) is None
+    assert expiration({'Cache-Control': 'public, max-age=60', 'Age': '10'}) == pytest.approx(time.time() + 50, abs=1)
+    assert expiration({'Expires': 'Wed, 21 Oct 2015 07:28:00 GMT', 'Date': 'Wed, 21 Oct 2015 07:27:00 GMT'}) == \
+           pytest.approx(time.time() + 60, abs=1)
+
+    entry = CacheEntry(url='http://openlibrary.org/search/lists.json',
+                       status=200,
+                       headers=[('Content-Type', 'application/json'), ('ETag', '"v1"')],
+                       body=b'{"docs": [{"name": "book"}]}',
+                       expires=None)
+    assert not entry.fresh
+    assert entry.validators == {'If-None-Match': '"v1"'}
+
+    memory = MemoryCache(max_bytes=entry.size * 2)
+    for key in ('a', 'b', 'c'):
+        await memory.set(key, entry)
+    assert await memory.get('a') is None
+    assert memory.evictions == 1
+    assert memory.size == entry.size * 2
+
+    cache = ResponseCache(memory=MemoryCache(), disk=DiskCache(str(tmp_path)))
+    key = cache.key('get', entry.url)
+    await cache.set(key, entry)
+
+    cache = ResponseCache(disk=DiskCache(str(tmp_path)))
+    cached = await cache.get(key)
+    assert cached == entry
+    assert await cache.hit(cached).json() == {'docs': [{'name': 'book'}]}
+    assert cache.stats['hits'] == 1
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+def handlers() -> Tuple[List[web.RouteDef], dict]:
+    state = {'hits': 0}
+
+    async def item(request: web.Request) -> web.Response:
+        state['hits'] += 1
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304, headers={'ETag': '"v1"', 'Cache-Control': 'no-cache, private', 'X-Checked': '1',
+                                                     'Content-Type': 'text/plain', 'Content-Language': 'fr'})
+
+        return web.json_response({'tenant': request.headers.get('X-Tenant')},
+                                 headers={'ETag': '"v1"', 'Cache-Control': 'no-cache', 'Vary': 'X-Tenant'})
+
+    return [web.get('/item', item)], state
+
+
+@pytest.mark.asyncio
+async def test_response_cache_revalidate_vary(serve):
+    ts = time.perf_counter()
+    bprint('Test: Response Cache; Revalidation, Vary')
+
+    routes, state = handlers()
+    url = f'{await serve(routes)}/item'
+
+    async def get(bac: BaseApiClient, tenant: str) -> dict:
+        result = await bac.request('get', url, headers={'X-Tenant': tenant})
+        return await result['response'].json()
+
+    async with BaseApiClient(cfg={'ResponseCache': {'Enabled': True}}) as bac:
+        memory = bac.cache.memory
+
+        assert await get(bac, 'a') == {'tenant': 'a'}
+        for _ in range(3):  # 304s; the entry's headers grow, but only once
+            assert await get(bac, 'a') == {'tenant': 'a'}
+            assert memory.size == sum(e.size for e in memory.entries.values())
+        assert bac.cache.stats['revalidated'] == 3
+
+        entry = next(iter(memory.entries.values()))  # Content-* still describe the stored body
+        headers = CIMultiDict(entry.headers)
+        assert headers['Content-Type'].startswith('application/json') and 'Content-Language' not in headers
+        assert headers['X-Checked'] == '1' and headers['Cache-Control'] == 'no-cache, private'
+
+        assert await get(bac, 'b') == {'tenant': 'b'}  # Another variant; not served a's response
+        assert await get(bac, 'a') == {'tenant': 'a'}
+        assert memory.size == sum(e.size for e in memory.entries.values())
+        assert state['hits'] == 6
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
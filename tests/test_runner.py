@@ -0,0 +1,82 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Runner
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import importlib.util
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint, runner
+from base_api_client.runner import executor_workers
+
+
+def test_run_coroutine():
+    ts = time.perf_counter()
+    bprint('Test: Run Coroutine')
+
+    pending = []
+
+    async def main() -> tuple:
+        loop = asyncio.get_running_loop()
+        pending.append(asyncio.create_task(asyncio.sleep(3600)))
+        return type(loop).__module__, loop._default_executor._max_workers
+
+    module, workers = BaseApiClient.run(main())
+    assert module.startswith('uvloop' if importlib.util.find_spec('uvloop') else 'asyncio')
+    assert workers == executor_workers(BaseApiClient.SEM) >= BaseApiClient.SEM
+    assert pending[0].cancelled()
+
+    module, _ = BaseApiClient.run(main(), use_uvloop=False)
+    assert module.startswith('asyncio')
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+def test_run_client(server, monkeypatch):
+    ts = time.perf_counter()
+    bprint('Test: Run Client')
+
+    async def main(bac: BaseApiClient) -> tuple:
+        async def records(request: web.Request) -> web.Response:
+            return web.json_response({'docs': [{'id': 1}]})
+
+        async with server([web.get('/records', records)]) as url:
+            result = await bac.request('get', f'{url}/records')
+            success, _ = await bac.process_result(result, data_key='docs')
+
+        return success, asyncio.get_running_loop()._default_executor, bac
+
+    success, executor, bac = BaseApiClient.run(main, cfg={'Options': {'SEM': 64}})
+    assert [r['id'] for r in success] == [1]
+    assert executor._max_workers == 64 and executor._shutdown
+    assert bac.session.closed
+
+    for cls in (asyncio.BaseEventLoop, asyncio.AbstractEventLoop):  # As on Python 3.8
+        monkeypatch.delattr(cls, 'shutdown_default_executor')
+    waited = []
+    shutdown = ThreadPoolExecutor.shutdown
+    monkeypatch.setattr(ThreadPoolExecutor, 'shutdown',
+                        lambda self, wait=True, **kwargs: waited.append((self, wait)) or shutdown(self, wait, **kwargs))
+
+    _, executor, _ = BaseApiClient.run(main, cfg={'Options': {'SEM': 64}}, use_uvloop=False)
+    assert (executor, True) in waited and not runner.EXECUTORS  # Joined, not just closed with the loop
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Sharding
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import time
+from typing import List
+
+import pytest
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint
+from base_api_client.sharding import chunked, worker_config
+
+
+def handlers() -> List[web.RouteDef]:
+    async def records(request: web.Request) -> web.Response:
+        page = int(request.query['page'])
+        if page % 10 == 9:
+            return web.json_response({'error': 'Not Found'}, status=404)
+        return web.json_response({'docs': [{'id': page * 10 + i, 'empty': None} for i in range(10)]})
+
+    return [web.get('/records', records)]
+
+
+@pytest.mark.asyncio
+async def test_sharding(serve):
+    ts = time.perf_counter()
+    bprint('Test: Sharding')
+
+    assert [len(c) for c in chunked(range(25), 10)] == [10, 10, 5]
+
+    cfg = worker_config({'Options': {'SEM_Max': 60}, 'RateLimit': {'Rate': 10}, 'Connection': {'Limit': 0}}, 15, 4)
+    assert cfg['Options'] == {'SEM': 4, 'SEM_Max': 15} and cfg['RateLimit']['Rate'] == 2.5 and cfg['Connection']['Limit'] == 0
+
+    cfg = worker_config({'RateLimit': {'Endpoints': {'/search*': {'Rate': 4, 'Burst': 2}, '/slow': {'Rate': 1}}}}, 15, 4)
+    assert cfg['RateLimit']['Endpoints'] == {'/search*': {'Rate': 1, 'Burst': 0.5}, '/slow': {'Rate': 0.25}}
+
+    url = f'{await serve(handlers())}/records'
+
+    async with BaseApiClient() as bac:
+        requests = ({'method': 'get', 'end_point': url, 'params': {'page': p}} for p in range(100))
+        results = await bac.shard(requests, data_key='docs', cleanup=True, processes=2, chunk_size=15)
+
+        assert sorted(r['id'] for r in results.success) == [p * 10 + i for p in range(100) if p % 10 != 9 for i in range(10)]
+        assert all('empty' not in r and 'request_id' in r for r in results.success)
+        assert len(results.failure) == 10
+
+        batches = [b async for b in bac.stream_shards([{'method': 'get', 'end_point': url, 'params': {'page': 1}}] * 4,
+                                                      data_key='docs', processes=2, chunk_size=1)]
+        assert len(batches) == 4 and all(len(b) == 10 for b in batches)
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+def test_worker_environment(monkeypatch):
+    ts = time.perf_counter()
+    bprint('Test: Sharding; Environment Overrides')
+
+    class Worker(BaseApiClient):
+        ENV_OVERRIDES = False  # As set by init_worker
+
+    monkeypatch.setenv('Options_SEM', '100')
+    monkeypatch.setenv('RateLimit_Rate', '50')
+
+    parent = BaseApiClient(cfg={'Options': {'SEM': 10}, 'RateLimit': {'Rate': 5}})
+    assert parent.concurrency == 100 and parent.rate_limiter.rate == 50
+
+    worker = Worker(cfg=worker_config(parent.cfg, parent.concurrency, 2))
+    assert worker.concurrency == 50 and worker.rate_limiter.rate == 25
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Startup
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import subprocess
+import sys
+import time
+
+from base_api_client import BaseApiClient, bprint
+
+
+def test_deferred_imports():
+    ts = time.perf_counter()
+    bprint('Test: Deferred Imports')
+
+    code = "import sys, base_api_client; print(sorted(m for m in ('aiofiles', 'toml', 'multiprocessing') if m in sys.modules))"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == '[]'
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+def test_deferred_session():
+    ts = time.perf_counter()
+    bprint('Test: Deferred Session')
+
+    bac = BaseApiClient(cfg={'Connection': {'Limit': 7}, 'Options': {'CookieJar_Unsafe': True}})  # No running loop
+    assert bac._session is None
+
+    async def first_use() -> None:
+        async with bac:
+            assert bac.session is bac.session
+            assert bac.session.connector.limit == 7
+            assert bac.session.cookie_jar._unsafe
+
+        assert bac.session.closed
+
+    asyncio.run(first_use())
+
+    async def unused() -> None:
+        async with BaseApiClient() as b:
+            pass
+
+        assert b._session is None
+
+    asyncio.run(unused())
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
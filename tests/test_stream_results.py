@@ -0,0 +1,72 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Stream Results
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint
+
+
+@pytest.mark.asyncio
+async def test_stream_results():
+    ts = time.perf_counter()
+    bprint('Test: Stream Results')
+
+    async with BaseApiClient() as bac:
+        tasks = [bac.request(method='get',
+                             end_point='http://openlibrary.org/search/lists.json',
+                             params={'limit':  5,
+                                     'q':      'book',
+                                     'offset': offset}) for offset in range(0, 15, 5)]
+        failure = []
+        records = [rec async for rec in bac.stream_results(tasks, data_key='docs', failure=failure)]
+
+        assert records
+        assert not failure
+        assert all('request_id' in rec for rec in records)
+        print(*records[:5], sep='\n')
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_stream_results_early_exit(serve):
+    ts = time.perf_counter()
+    bprint('Test: Stream Results, Early Exit')
+
+    async def docs(request: web.Request) -> web.Response:
+        # Large enough that an unread body keeps its connection acquired
+        return web.json_response({'docs': [{'page': request.query['page'], 'i': i} for i in range(100_000)]})
+
+    routes = [web.get('/docs', docs)]
+    url = f'{await serve(routes)}/docs'
+
+    async with BaseApiClient() as bac:
+        tasks = [bac.request('get', url, params={'page': page}) for page in range(5)]
+        records = bac.stream_results(tasks, data_key='docs')
+        assert 'page' in await records.__anext__()
+
+        await asyncio.sleep(0.2)  # Let the remaining requests complete unconsumed
+        await records.aclose()
+        assert not bac.session.connector._acquired
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
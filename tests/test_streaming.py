@@ -0,0 +1,56 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Streaming
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import time
+
+import pytest
+import rapidjson
+
+from base_api_client import bprint
+from base_api_client.streaming import iter_json_array
+
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+@pytest.mark.asyncio
+async def test_streaming():
+    ts = time.perf_counter()
+    bprint('Test: Streaming')
+
+    docs = [{'key': f'/works/OL{i}W', 'title': 'Ünïcödé', 'year': 1900 + i, 'tags': ['a', None]} for i in range(250)]
+    docs += [12345678901234567890, 'text', [], {}]
+    document = {'meta': {'ids': list(range(1000))}, 'docs': docs, 'numFound': len(docs)}
+
+    for size in (1, 7, 4096):
+        data = rapidjson.dumps(document, ensure_ascii=False).encode('utf-8')
+        assert [rec async for rec in iter_json_array(chunked(data, size), data_key='docs')] == docs
+
+        data = rapidjson.dumps(docs).encode('utf-8')
+        assert [rec async for rec in iter_json_array(chunked(data, size))] == docs
+
+    data = b'{"numFound": 0, "docs": {}}'
+    assert [rec async for rec in iter_json_array(chunked(data, 3), data_key='docs')] == [{'numFound': 0, 'docs': {}}]
+
+    with pytest.raises(ValueError):
+        _ = [rec async for rec in iter_json_array(chunked(b'{"docs": [1, 2', 3), data_key='docs')]
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Transport
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import gzip
+import time
+from typing import List, Tuple
+
+import pytest
+import rapidjson
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint, Response
+from base_api_client.models import Results
+from base_api_client.transport import entry_key, Transport
+
+
+def handlers() -> Tuple[List[web.RouteDef], list]:
+    hits = []
+
+    async def records(request: web.Request) -> web.Response:
+        hits.append(request.path_qs)
+        offset = int(request.query.get('offset', 0))
+        if offset >= 30:
+            return web.json_response({'error': 'Not Found'}, status=404)
+        return web.json_response({'docs': [{'id': i} for i in range(offset, offset + 10)]})
+
+    return [web.get('/records', records)], hits
+
+
+@pytest.mark.asyncio
+async def test_transport(tmp_path, serve):
+    ts = time.perf_counter()
+    bprint('Test: Transport')
+
+    assert entry_key('get', 'http://h/p?b=2', {'a': 1}) == 'GET http://h/p?a=1&b=2'
+    assert Transport.from_config({'Transport': {'Mode': 'live'}}) is None
+    with pytest.raises(NotImplementedError):
+        Transport('stream', str(tmp_path / 'x'))
+
+    routes, hits = handlers()
+    url = f'{await serve(routes)}/records'
+    path = tmp_path / 'responses.gz'
+
+    async def run(bac: BaseApiClient) -> Results:
+        results = Results(data=[await bac.request('get', url, params={'offset': o}) for o in range(0, 40, 10)])
+        return await bac.process_results(results, data_key='docs')
+
+    async with BaseApiClient(cfg={'Transport': {'Mode': 'record', 'Path': str(path)}}) as bac:
+        recorded = await run(bac)
+
+    assert len(recorded.success) == 30 and len(recorded.failure) == 1
+    assert len(Transport.read(str(path))[f'GET {url}']) == 4 and len(hits) == 4
+
+    async with BaseApiClient(cfg={'Transport': {'Mode': 'replay', 'Path': str(path)}}) as bac:
+        replayed = await run(bac)
+        assert [r['id'] for r in replayed.success] == [r['id'] for r in recorded.success]
+        assert len(replayed.failure) == 1
+
+        result = await bac.request('get', url, params={'offset': 10}, preload=True)
+        assert type(result['response']) is Response and result['response'].payload['docs'][0]['id'] == 10
+
+        result = await bac.request('get', url, params={'offset': 99})  # Unrecorded query; falls back to the path
+        assert result['response'].status in (200, 404)
+
+        with pytest.raises(KeyError):
+            await bac.request('get', f'{url}/missing')
+    assert len(hits) == 4  # Replay never reaches the server
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_transport_compression_download(tmp_path, serve):
+    ts = time.perf_counter()
+    bprint('Test: Transport; Compression, Preload, Download')
+
+    data = rapidjson.dumps({'docs': [{'id': i, 'name': 'x' * 50} for i in range(100)]}).encode()
+    blob = bytes(range(256)) * 4096
+    hits = []
+
+    async def records(request: web.Request) -> web.Response:
+        hits.append(request.path)
+        return web.Response(body=gzip.compress(data), headers={'Content-Encoding': 'gzip', 'Content-Type': 'application/json'})
+
+    async def file(request: web.Request) -> web.Response:
+        hits.append(request.path)
+        return web.Response(body=blob, content_type='application/octet-stream')
+
+    base = await serve([web.get('/records', records), web.get('/file.bin', file)])
+    path = tmp_path / 'responses.gz'
+
+    async def run(mode: str) -> BaseApiClient:
+        cfg = {'Transport': {'Mode': mode, 'Path': str(path)}, 'Compression': {'Enabled': True}}
+        async with BaseApiClient(cfg=cfg) as bac:
+            result = await bac.request('get', f'{base}/records', preload=True)
+            assert result['response'].payload == rapidjson.loads(data)
+
+            dest = tmp_path / f'{mode}.bin'
+            download = await bac.download(f'{base}/file.bin', str(dest))
+            assert download['bytes'] == len(blob) and dest.read_bytes() == blob
+
+        return bac
+
+    recorded = await run('record')
+
+    assert recorded.compression.stats['responses'] == 1
+    assert recorded.compression.stats['response_bytes'] == len(data)
+
+    await run('replay')
+    assert len(hits) == 2  # Replay never reaches the server
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3.8
+"""Base API Client: Test Upload
+Copyright © 2019-2020 Jerod Gawne <https://github.com/jerodg/>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the Server Side Public License (SSPL) as
+published by MongoDB, Inc., either version 1 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+SSPL for more details.
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+You should have received a copy of the SSPL along with this program.
+If not, see <https://www.mongodb.com/licensing/server-side-public-license>."""
+import hashlib
+import time
+from typing import List, Tuple
+
+import pytest
+from aiohttp import web
+
+from base_api_client import BaseApiClient, bprint
+from base_api_client.utils import mmap_file
+
+APP = {'client_max_size': 16 * 1024 ** 2}
+
+
+def handlers() -> Tuple[List[web.RouteDef], dict]:
+    received = {'fail': []}
+
+    async def put(request: web.Request) -> web.Response:
+        data = await request.read()
+        if received['fail']:  # Fail the attempt after reading (part of) the body
+            return web.Response(status=received['fail'].pop(), headers={'Retry-After': '0'})
+        received[request.query.get('partNumber', 0)] = data
+        return web.Response(headers={'ETag': hashlib.md5(data).hexdigest()})
+
+    async def post(request: web.Request) -> web.Response:
+        form = await request.post()
+        if received['fail']:
+            return web.Response(status=received['fail'].pop(), headers={'Retry-After': '0'})
+        received['form'] = form['file'].file.read()
+        return web.json_response({'ok': True})
+
+    return [web.put('/upload', put), web.post('/upload', post)], received
+
+
+@pytest.mark.asyncio
+async def test_upload(tmp_path, serve):
+    ts = time.perf_counter()
+    bprint('Test: Upload')
+
+    file_path = tmp_path / 'upload.bin'
+    content = bytes(range(256)) * 4099
+    file_path.write_bytes(content)
+
+    with mmap_file(str(file_path)) as view:
+        assert bytes(view[:256]) == content[:256]
+        assert len(view) == len(content)
+
+    routes, received = handlers()
+    url = f'{await serve(routes, app_kwargs=APP)}/upload'
+
+    async with BaseApiClient(cfg={'Options': {'Upload_Chunk_Size': 4096}}) as bac:
+        result = await bac.upload(url, str(file_path))
+        assert result['response'].status == 200
+        assert result['bytes'] == len(content) and result['bytes_per_sec'] > 0
+        assert received.pop(0) == content
+
+        await bac.upload(url, str(file_path), use_mmap=False)
+        assert received.pop(0) == content
+
+        await bac.upload(url, str(file_path), method='post', field='file')
+        assert received.pop('form') == content
+
+        committed = []
+
+        async def commit(parts):
+            committed.extend(parts)
+            return len(parts)
+
+        result = await bac.upload(url, str(file_path), part_size=100_000, commit=commit)
+        assert result['commit'] == 11 and [p['part'] for p in committed] == list(range(1, 12))
+        assert b''.join(received[str(p['part'])] for p in committed) == content
+        assert all(p['etag'] == hashlib.md5(received[str(p['part'])]).hexdigest() for p in committed)
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_retry(tmp_path, serve):
+    ts = time.perf_counter()
+    bprint('Test: Upload; Streamed Body Retried')
+
+    file_path = tmp_path / 'upload.bin'
+    content = bytes(range(256)) * 1024
+    file_path.write_bytes(content)
+
+    routes, received = handlers()
+    url = f'{await serve(routes, app_kwargs=APP)}/upload'
+
+    async with BaseApiClient(cfg={'Options': {'Upload_Chunk_Size': 4096}, 'RateLimit': {'Retry': 3}}) as bac:
+        received['fail'] = [500]  # Retried with backoff
+        result = await bac.upload(url, str(file_path), use_mmap=False)
+        assert result['response'].status == 200 and received.pop(0) == content
+
+        received['fail'] = [429]  # Replayed after Retry-After
+        result = await bac.upload(url, str(file_path), method='post', field='file', use_mmap=False)
+        assert result['response'].status == 200 and received.pop('form') == content
+
+        received['fail'] = [500]  # request(file=...) streams the file as a form field
+        result = await bac.request('post', url, data={'name': 'upload.bin'}, file=str(file_path))
+        assert result['response'].status == 200 and received.pop('form') == content
+
+    bprint(f'-> Completed in {(time.perf_counter() - ts):f} seconds.')